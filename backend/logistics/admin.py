@@ -3,8 +3,9 @@ from django.utils.html import format_html
 from .models import (
     Fleet, MasterPricingRule, 
     CustomerProfile, MitraArmada, ArmadaKendaraan, 
-    Order, OrderCharge, Promo
+    Order, OrderCharge, Promo, GazetteerPlace
 )
+from .order_export import export_response
 
 # =================================================================
 # 1. KONFIGURASI TAMPILAN WARNA (HELPER)
@@ -93,13 +94,14 @@ class OrderChargeInline(admin.TabularInline):
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('id_short', 'customer', 'driver', 'rute_perjalanan', 'final_total_price', 'status_colored')
     list_filter = ('status', 'service_type', 'created_at')
-    search_fields = ('id', 'origin_city', 'dest_city')
-    readonly_fields = ('final_total_price', 'total_distance_km')
+    search_fields = ('tracking_code', 'id', 'origin_city', 'dest_city')
+    readonly_fields = ('addons_price', 'reimbursement_total', 'final_total_price', 'total_distance_km')
     
     inlines = [OrderChargeInline]
+    actions = ['export_csv', 'export_xlsx']
 
     def id_short(self, obj):
-        return str(obj.id)[:8]
+        return obj.tracking_code
     id_short.short_description = "Order ID"
 
     def rute_perjalanan(self, obj):
@@ -110,6 +112,15 @@ class OrderAdmin(admin.ModelAdmin):
         return format_html('<span style="color: {};">{}</span>', color, obj.get_status_display())
     status_colored.short_description = "Status"
 
+    # Export finance (streaming, memori tetap); "pilih semua" = seluruh hasil filter
+    def export_csv(self, request, queryset):
+        return export_response(request, queryset, 'csv')
+    export_csv.short_description = "Export order + charge terpilih (CSV)"
+
+    def export_xlsx(self, request, queryset):
+        return export_response(request, queryset, 'xlsx')
+    export_xlsx.short_description = "Export order + charge terpilih (XLSX)"
+
 @admin.register(OrderCharge)
 class OrderChargeAdmin(admin.ModelAdmin):
     list_display = ('charge_name', 'amount', 'order', 'is_verified')
@@ -120,3 +131,9 @@ class OrderChargeAdmin(admin.ModelAdmin):
 class PromoAdmin(admin.ModelAdmin):
     list_display = ('title', 'promo_code', 'valid_until', 'is_active')
     list_filter = ('is_active',)
+
+@admin.register(GazetteerPlace)
+class GazetteerPlaceAdmin(admin.ModelAdmin):
+    list_display = ('name', 'kind', 'region', 'popularity', 'updated_at')
+    list_filter = ('kind',)
+    search_fields = ('name', 'region')
@@ -5,3 +5,5 @@ class LogisticsConfig(AppConfig):
     name = 'logistics'
     verbose_name = 'Manajemen Logistik Kita' # Nama yang muncul di Admin Panel
 
+    def ready(self):
+        from . import signals  # noqa: F401 (mendaftarkan receiver)
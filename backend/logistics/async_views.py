@@ -0,0 +1,201 @@
+# backend/logistics/async_views.py
+
+"""
+View async (native ASGI) untuk endpoint yang I/O-bound ke TomTom.
+
+Di bawah uvicorn/daphne, request yang sedang menunggu TomTom tidak memblokir
+thread worker, sehingga satu worker bisa menahan ratusan quote sekaligus.
+Logika harga & format respons sama persis dengan versi DRF di views.py.
+Di bawah WSGI view ini tetap jalan, tapi tanpa keuntungan konkurensi.
+
+Stream status order (SSE) HANYA untuk ASGI: tiap koneksi yang diam cukup satu
+coroutine yang menunggu queue broker (order_events.py), bukan satu thread.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from decimal import Decimal
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+import asyncio
+import json
+import logging
+
+from .estimator import estimate_routes
+from .geocode_cache import acached_search
+from .order_events import customer_topic, get_broker, tracking_topic
+from .pricing_snapshot import pricing_snapshot
+from .routing import aget_route
+from .tomtom import get_async_client, CircuitOpenError
+from .tracking import get_tracking, normalize_tracking_code
+from .views import build_simulasi_result
+
+logger = logging.getLogger(__name__)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncSimulasiHargaView(View):
+    """
+    Endpoint: /api/simulasi-harga/async/
+    Padanan async SimulasiHargaView (body JSON yang sama).
+    """
+
+    async def post(self, request):
+        try:
+            data = json.loads(request.body or b"{}")
+            o_lat = round(Decimal(data.get("origin_lat")), 4)
+            o_lng = round(Decimal(data.get("origin_lng")), 4)
+            d_lat = round(Decimal(data.get("dest_lat")), 4)
+            d_lng = round(Decimal(data.get("dest_lng")), 4)
+            fleet_id = data.get("fleet_id")
+            input_weight = float(data.get("weight") or 0)
+            input_volume = float(data.get("volume") or 0)
+        except (TypeError, ValueError, AttributeError, ArithmeticError):
+            return JsonResponse({"error": "Data koordinat/input tidak valid"}, status=400)
+
+        snapshot = await pricing_snapshot.aget()
+        entry = snapshot.get(fleet_id)
+        if entry is None:
+            return JsonResponse({"error": "Data Armada atau Rule Harga tidak ditemukan"}, status=500)
+        fleet, _ = entry
+
+        key = (o_lat, o_lng, d_lat, d_lng)
+        route_data, is_cached = await aget_route(key, travel_mode=fleet.tomtom_travel_mode)
+        is_estimated = False
+        if not route_data:
+            # Kalibrasi estimator bisa menyentuh cache/DB: jalankan di thread
+            estimated = await sync_to_async(estimate_routes)([key], fleet.tomtom_travel_mode)
+            route_data = estimated.get(key)
+            is_estimated = route_data is not None
+        if not route_data:
+            return JsonResponse({"error": "Gagal menghitung rute (Cek API Key/Jarak)"}, status=500)
+
+        return JsonResponse(build_simulasi_result(
+            fleet, snapshot.tariff(fleet.id), route_data, is_cached, input_weight, input_volume, is_estimated,
+            lane=key,
+        ))
+
+
+class AsyncGeocodeLocationView(View):
+    """
+    Endpoint: /api/geocode/async/
+    Padanan async GeocodeLocationView.
+    """
+
+    async def get(self, request):
+        query = request.GET.get("q", "")
+        if len(query) < 3:
+            return JsonResponse([], safe=False)
+
+        try:
+            results = await acached_search(get_async_client(), query, limit=5)
+        except CircuitOpenError:
+            results = []
+        except Exception as e:
+            logger.error(f"TomTom Search Error: {e}")
+            results = []
+        return JsonResponse(results, safe=False)
+
+
+# ===========================================================
+# STREAM STATUS ORDER (SSE)
+# ===========================================================
+
+def sse_message(data, event="status"):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def tracking_snapshot(raw_code):
+    """(topik, body lacak resi terkini) untuk kode resi mentah, atau None jika resi tidak ada."""
+    code = normalize_tracking_code(raw_code or "")
+    entry = await sync_to_async(get_tracking)(code) if code else None
+    if not entry:
+        return None
+    return tracking_topic(entry["body"]["tracking_code"]), entry["body"]
+
+
+def snapshot_loader(raw_code):
+    """Coroutine function body lacak resi terkini (dipanggil SETELAH subscribe), None jika order sudah hilang."""
+    async def snapshot():
+        found = await tracking_snapshot(raw_code)
+        return found[1] if found else None
+    return snapshot
+
+
+def _jwt_user(raw_token):
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+async def jwt_user(raw_token):
+    """User pemilik access token JWT, atau None."""
+    return await sync_to_async(_jwt_user)(raw_token) if raw_token else None
+
+
+def bearer_token(request):
+    # EventSource di browser tidak bisa mengirim header: ?token= juga diterima
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header[7:]
+    return request.GET.get("token")
+
+
+async def event_stream(topics, snapshot=None):
+    heartbeat = getattr(settings, 'ORDER_EVENTS_HEARTBEAT', 20)
+    async with get_broker().listen(topics) as subscription:
+        yield "retry: 5000\n\n"
+        if snapshot is not None:
+            # Subscribe dulu baru kirim snapshot: transisi di antara keduanya tidak terlewat
+            body = await snapshot()
+            if body is not None:
+                yield sse_message(body, event="snapshot")
+        while True:
+            try:
+                event = await subscription.get(heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"  # Jaga koneksi tetap hidup melewati proxy
+                continue
+            yield sse_message(event)
+
+
+def sse_response(stream):
+    response = StreamingHttpResponse(stream, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Nginx: jangan buffer stream
+    return response
+
+
+class OrderTrackingStreamView(View):
+    """
+    Endpoint: /api/tracking/stream/?id=<kode resi>
+    Event "snapshot" (format PublicTrackingView) lalu "status" tiap transisi.
+    """
+
+    async def get(self, request):
+        raw_code = request.GET.get("id")
+        found = await tracking_snapshot(raw_code)
+        if found is None:
+            return JsonResponse({"error": "Resi tidak ditemukan"}, status=404)
+        topic, _ = found
+        return sse_response(event_stream([topic], snapshot_loader(raw_code)))
+
+
+class CustomerOrderStreamView(View):
+    """
+    Endpoint: /api/orders/stream/ (Authorization: Bearer <access> atau ?token=)
+    Event "status" untuk setiap transisi order milik customer.
+    """
+
+    async def get(self, request):
+        user = await jwt_user(bearer_token(request))
+        if user is None:
+            return JsonResponse({"error": "Token tidak valid"}, status=401)
+        return sse_response(event_stream([customer_topic(user.id)]))
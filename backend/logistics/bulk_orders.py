@@ -0,0 +1,264 @@
+# backend/logistics/bulk_orders.py
+
+"""
+Upload order massal (CSV / XLSX) untuk shipper korporat (BulkOrderUploadView).
+
+- File dibaca streaming baris per baris (csv.reader / openpyxl read_only) dan
+  diproses per chunk BULK_ORDER_CHUNK_SIZE baris: memori tetap berapa pun
+  ukuran file.
+- Semua baris dihargai dari SATU snapshot master data (pricing_snapshot) lewat
+  pricing.order_prices() per chunk (NumPy), rumus sama dengan OrderViewSet.
+- Insert per chunk: assign_tracking_codes + bulk_create dalam satu transaksi
+  pendek; chunk yang gagal tidak membatalkan chunk sebelumnya.
+- Hasil per baris di-yield begitu chunk selesai (NDJSON di view), diakhiri
+  satu ringkasan {"summary": ...}.
+"""
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from decimal import Decimal
+import csv
+import itertools
+import logging
+import zipfile
+
+from .models import Order
+from .pricing import order_prices, stack_tariffs
+from .pricing_snapshot import pricing_snapshot
+from .tracking import invalidate_tracking
+
+try:
+    import openpyxl  # Hanya dibutuhkan untuk upload .xlsx
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = (
+    'origin_city', 'origin_address', 'dest_city', 'dest_address',
+    'item_description', 'total_distance_km', 'vehicle_type_id',
+)
+OPTIONAL_COLUMNS = (
+    'origin_lat', 'origin_lng', 'dest_lat', 'dest_lng',
+    'service_type', 'is_doc_return', 'is_labor_needed',
+    'reference',  # Nomor referensi shipper, hanya dikembalikan di hasil
+)
+TEXT_LIMITS = {'origin_city': 100, 'dest_city': 100, 'origin_address': None, 'dest_address': None, 'item_description': None}
+COORDINATES = {'origin_lat': 90, 'origin_lng': 180, 'dest_lat': 90, 'dest_lng': 180}
+BOOLEANS = ('is_doc_return', 'is_labor_needed')
+TRUE_VALUES = {'1', 'true', 'ya', 'y', 'yes'}
+FALSE_VALUES = {'', '0', 'false', 'tidak', 'n', 'no'}
+SERVICE_TYPES = {code for code, _ in Order.SERVICE_TYPE_CHOICES}
+
+
+class BulkUploadError(ValueError):
+    """File tidak bisa diproses sama sekali (format / header salah)."""
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Angka bulat dari XLSX: 3.0 -> "3"
+    return str(value).strip()
+
+
+# =================================================================
+# 1. BACA FILE (STREAMING)
+# =================================================================
+
+def _csv_rows(upload):
+    lines = (line.decode('utf-8-sig', errors='replace') for line in upload)
+    first = next(lines, '')
+    # Excel berlocale Indonesia menyimpan CSV dengan pemisah titik koma
+    delimiter = ';' if first.count(';') > first.count(',') else ','
+    yield from csv.reader(itertools.chain([first], lines), delimiter=delimiter)
+
+
+def _xlsx_rows(upload):
+    if openpyxl is None:
+        raise BulkUploadError("Upload .xlsx butuh paket 'openpyxl' (pip install openpyxl)")
+    try:
+        workbook = openpyxl.load_workbook(upload, read_only=True, data_only=True)
+    except (InvalidFileException, zipfile.BadZipFile, KeyError, OSError):
+        raise BulkUploadError("File .xlsx tidak valid")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(upload):
+    """
+    Iterator (nomor baris file, dict kolom -> teks) dari file upload .csv / .xlsx.
+    Header dicek di sini (raise BulkUploadError), baris kosong dilewati.
+    """
+    name = (upload.name or '').lower()
+    if name.endswith('.csv'):
+        rows = _csv_rows(upload)
+    elif name.endswith('.xlsx'):
+        rows = _xlsx_rows(upload)
+    else:
+        raise BulkUploadError("Format file harus .csv atau .xlsx")
+
+    header = [_text(column).lower() for column in next(rows, None) or ()]
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise BulkUploadError(f"Kolom wajib tidak ada: {', '.join(missing)}")
+    known = set(REQUIRED_COLUMNS + OPTIONAL_COLUMNS)
+    wanted = [(i, column) for i, column in enumerate(header) if column in known]
+
+    def records():
+        for line, values in enumerate(rows, start=2):
+            record = dict.fromkeys(OPTIONAL_COLUMNS, '')
+            record.update((column, _text(values[i]) if i < len(values) else '') for i, column in wanted)
+            if any(record.values()):
+                yield line, record
+
+    return records()
+
+
+# =================================================================
+# 2. VALIDASI & IMPORT PER CHUNK
+# =================================================================
+
+def parse_record(record, snapshot):
+    """Satu baris -> (field Order + 'fleet_id', {kolom: pesan error})."""
+    fields, errors = {}, {}
+    for column, limit in TEXT_LIMITS.items():
+        value = record[column]
+        if not value:
+            errors[column] = "Wajib diisi."
+        elif limit and len(value) > limit:
+            errors[column] = f"Maksimal {limit} karakter."
+        else:
+            fields[column] = value
+
+    try:
+        distance = float(record['total_distance_km'])
+        if not 0 < distance < 10000:
+            raise ValueError
+        fields['total_distance_km'] = distance
+    except (ValueError, OverflowError):
+        errors['total_distance_km'] = "Harus angka km lebih dari 0."
+
+    try:
+        fleet_id = int(float(record['vehicle_type_id']))
+    except (ValueError, OverflowError):
+        fleet_id = None
+    if snapshot.tariff(fleet_id) is None:
+        errors['vehicle_type_id'] = "Armada tidak ditemukan / belum punya tarif."
+    else:
+        fields['fleet_id'] = fleet_id
+
+    for column, bound in COORDINATES.items():
+        if record[column]:
+            try:
+                value = float(record[column])
+                if not -bound <= value <= bound:
+                    raise ValueError
+                fields[column] = value
+            except (ValueError, OverflowError):
+                errors[column] = "Koordinat tidak valid."
+
+    service_type = record['service_type'].upper() or 'STANDARD'
+    if service_type in SERVICE_TYPES:
+        fields['service_type'] = service_type
+    else:
+        errors['service_type'] = f"Pilihan: {', '.join(sorted(SERVICE_TYPES))}."
+
+    for column in BOOLEANS:
+        value = record[column].lower()
+        if value in TRUE_VALUES or value in FALSE_VALUES:
+            fields[column] = value in TRUE_VALUES
+        else:
+            errors[column] = "Isi ya/tidak."
+    return fields, errors
+
+
+def _result(line, record, **data):
+    result = {"row": line, "ok": "errors" not in data, **data}
+    if record['reference']:
+        result["reference"] = record['reference']
+    return result
+
+
+def _import_chunk(chunk, customer, corporate, snapshot):
+    results, valid = [], []
+    for line, record in chunk:
+        fields, errors = parse_record(record, snapshot)
+        if errors:
+            results.append(_result(line, record, errors=errors))
+        else:
+            valid.append((line, record, fields))
+    if not valid:
+        return results
+
+    tariffs = stack_tariffs([snapshot.tariff(fields['fleet_id']) for _, _, fields in valid])
+    prices, _ = order_prices(
+        [fields['total_distance_km'] for _, _, fields in valid], tariffs,
+        [fields['service_type'] == 'EXPRESS' for _, _, fields in valid], [corporate] * len(valid),
+    )
+    orders = []
+    for (_, _, fields), price in zip(valid, prices.tolist()):
+        fields.pop('fleet_id')
+        price = Decimal(price)
+        orders.append(Order(customer=customer, base_price=price, final_total_price=price, status='PENDING', **fields))
+
+    try:
+        with transaction.atomic():
+            Order.assign_tracking_codes(orders)
+            Order.objects.bulk_create(orders)
+            # bulk_create tanpa signal: hapus cache "resi tidak ditemukan" untuk kode baru ini
+            transaction.on_commit(lambda: invalidate_tracking(*orders))
+    except DatabaseError as e:
+        logger.error(f"Upload order massal: chunk {valid[0][0]}-{valid[-1][0]} gagal disimpan: {e}")
+        results.extend(_result(line, record, errors={"row": "Gagal disimpan, coba upload ulang baris ini."})
+                       for line, record, _ in valid)
+    else:
+        results.extend(
+            _result(line, record, id=str(order.id), tracking_code=order.tracking_code, price=int(order.base_price))
+            for (line, record, _), order in zip(valid, orders)
+        )
+    results.sort(key=lambda result: result["row"])
+    return results
+
+
+def import_orders(records, customer, corporate=False):
+    """
+    Generator hasil per baris dari read_rows(): {"row", "ok", "id", "tracking_code",
+    "price"} atau {"row", "ok": False, "errors"}; terakhir {"summary": {...}}.
+    """
+    snapshot = pricing_snapshot.get()  # Satu snapshot untuk seluruh file
+    chunk_size = getattr(settings, 'BULK_ORDER_CHUNK_SIZE', 500)
+    max_rows = getattr(settings, 'BULK_ORDER_MAX_ROWS', 5000)
+    records = iter(records)
+    rows = created = 0
+    unreadable_after = None  # Jumlah baris terbaca saat file rusak di tengah jalan
+    while unreadable_after is None:
+        chunk = []
+        try:
+            chunk.extend(itertools.islice(records, min(chunk_size, max_rows - rows)))
+        except Exception as e:  # csv.Error, XLSX rusak di tengah file, dst.: baris yang sudah terbaca tetap diproses
+            logger.warning(f"Upload order massal: file berhenti terbaca setelah {rows + len(chunk)} baris: {e}")
+            unreadable_after = rows + len(chunk)
+        if not chunk:
+            break
+        rows += len(chunk)
+        try:
+            results = _import_chunk(chunk, customer, corporate, snapshot)
+        except Exception:
+            # Stream NDJSON sudah berjalan (200): error tak terduga dilaporkan per baris, chunk berikutnya lanjut
+            logger.exception(f"Upload order massal: chunk baris {chunk[0][0]}-{chunk[-1][0]} gagal diproses")
+            results = [_result(line, record, errors={"row": "Gagal diproses, coba upload ulang baris ini."})
+                       for line, record in chunk]
+        for result in results:
+            created += result["ok"]
+            yield result
+    if unreadable_after is not None:
+        yield {"row": None, "ok": False, "errors": {"file": f"File tidak bisa dibaca setelah {unreadable_after} baris data."}}
+    truncated = None if unreadable_after is not None else next(records, None)
+    if truncated is not None:
+        yield {"row": truncated[0], "ok": False, "errors": {"file": f"Melebihi batas {max_rows} baris, sisa file tidak diproses."}}
+    yield {"summary": {"rows": rows, "created": created, "failed": rows - created, "truncated": truncated is not None}}
@@ -0,0 +1,319 @@
+# backend/logistics/dispatch.py
+
+"""
+Mesin dispatch: k kendaraan terbaik untuk sebuah order.
+
+Index spasial kendaraan tersedia per proses (VehicleGrid):
+- Bucket per armada (Fleet.id), lalu per grid cell CELL_DEG. Fleet membawa
+  fleet_type & kapasitas (max_weight_kg_limit / max_volume_cbm_limit), jadi
+  filter jenis & kapasitas memilih bucket, bukan memeriksa tiap kendaraan.
+- Query: cell asal, lalu ring cell di sekelilingnya, sampai kandidat ke-k
+  terbukti lebih dekat dari semua cell yang belum diperiksa. Jarak dihitung
+  vektor (haversine NumPy) hanya untuk kendaraan di cell yang disentuh.
+- Live: posisi / kendaraan bisa dipindah, ditambah, dihapus tanpa rebuild.
+
+Sumber data (DispatchIndex): ArmadaKendaraan is_available, mitra VERIFIED &
+bukan blacklist, tanpa order berjalan, dengan DriverPosition yang masih segar.
+Index dibangun ulang tiap DISPATCH_INDEX_REFRESH detik atau saat versi di
+shared cache naik (perubahan kendaraan / mitra / armada, lihat signals.py).
+Di antaranya, flush GPS & penugasan order di proses ini memperbarui index langsung.
+
+Peringkat: jarak garis lurus, lalu kapasitas terkecil yang cukup (truk besar
+tidak dipakai untuk muatan kecil jika ada yang sama dekat).
+"""
+
+from collections import namedtuple
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+import math
+import threading
+import time
+
+import numpy as np
+
+from .geo import haversine_km_array
+from .models import ArmadaKendaraan, Fleet, Order, ORDER_OPEN_STATUSES
+
+CELL_DEG = 0.05  # ~5,5 km
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LNG = 111.320
+VERSION_KEY = "dispatch:index:version"
+
+FleetSpec = namedtuple('FleetSpec', ['fleet_type', 'weight_kg', 'volume_cbm'])
+Candidate = namedtuple('Candidate', ['vehicle_id', 'driver_id', 'fleet_id', 'nopol', 'lat', 'lng', 'distance_km'])
+
+
+def cell_of(lat, lng):
+    return math.floor(lat / CELL_DEG), math.floor(lng / CELL_DEG)
+
+
+def ring(row, col, radius):
+    """Cell pada jarak Chebyshev tepat `radius` dari (row, col)."""
+    if radius == 0:
+        return [(row, col)]
+    cells = [(row - radius, col + dc) for dc in range(-radius, radius + 1)]
+    cells += [(row + radius, col + dc) for dc in range(-radius, radius + 1)]
+    cells += [(row + dr, col - radius) for dr in range(-radius + 1, radius)]
+    cells += [(row + dr, col + radius) for dr in range(-radius + 1, radius)]
+    return cells
+
+
+class VehicleGrid:
+    """Index kendaraan (mutable, thread-safe). Atribut per slot disimpan di array NumPy."""
+
+    def __init__(self, fleets, size_hint=1024):
+        self.fleets = dict(fleets)  # fleet_id -> FleetSpec
+        self._lock = threading.Lock()
+        size = max(16, size_hint)
+        self.lat = np.zeros(size)
+        self.lng = np.zeros(size)
+        self.weight = np.zeros(size)
+        self.fleet_ids = np.zeros(size, dtype=np.int64)
+        self._vehicles = [None] * size  # slot -> (vehicle_id, driver_id, nopol)
+        self._slots = {}  # vehicle_id -> slot
+        self._driver_slots = {}  # driver_id -> {slot}
+        self._cell = {}  # slot -> (fleet_id, cell)
+        self._buckets = {}  # fleet_id -> {cell: {slot}}
+        self._counts = dict.fromkeys(self.fleets, 0)  # fleet_id -> jumlah kendaraan
+        self._free = list(range(size - 1, -1, -1))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _grow(self):
+        old = len(self.lat)
+        for name in ('lat', 'lng', 'weight', 'fleet_ids'):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros(old, dtype=array.dtype))))
+        self._vehicles.extend([None] * old)
+        self._free.extend(range(2 * old - 1, old - 1, -1))
+
+    def _place(self, slot, fleet_id, lat, lng):
+        key = (fleet_id, cell_of(lat, lng))
+        current = self._cell.get(slot)
+        if current != key:
+            if current is not None:
+                self._unbucket(slot, current)
+            self._buckets.setdefault(fleet_id, {}).setdefault(key[1], set()).add(slot)
+            self._counts[fleet_id] += 1
+            self._cell[slot] = key
+        self.lat[slot], self.lng[slot] = lat, lng
+
+    def _unbucket(self, slot, key):
+        fleet_id, cell = key
+        bucket = self._buckets[fleet_id][cell]
+        bucket.discard(slot)
+        self._counts[fleet_id] -= 1
+        if not bucket:
+            del self._buckets[fleet_id][cell]
+
+    # --- Perubahan live ---
+    def add(self, vehicle_id, driver_id, fleet_id, lat, lng, nopol=""):
+        with self._lock:
+            if fleet_id not in self.fleets:
+                return False
+            slot = self._slots.get(vehicle_id)
+            if slot is None:
+                if not self._free:
+                    self._grow()
+                slot = self._free.pop()
+                self._slots[vehicle_id] = slot
+            else:
+                self._driver_slots[self._vehicles[slot][1]].discard(slot)
+                if self.fleet_ids[slot] != fleet_id:
+                    self._unbucket(slot, self._cell.pop(slot))
+            self._vehicles[slot] = (vehicle_id, driver_id, nopol)
+            self._driver_slots.setdefault(driver_id, set()).add(slot)
+            self.fleet_ids[slot] = fleet_id
+            self.weight[slot] = self.fleets[fleet_id].weight_kg
+            self._place(slot, fleet_id, lat, lng)
+            return True
+
+    def remove(self, vehicle_id):
+        with self._lock:
+            slot = self._slots.pop(vehicle_id, None)
+            if slot is None:
+                return False
+            self._release(slot)
+            return True
+
+    def remove_driver(self, driver_id):
+        """Semua kendaraan driver keluar dari index (mis. driver baru mendapat order)."""
+        with self._lock:
+            slots = self._driver_slots.pop(driver_id, set())
+            for slot in slots:
+                del self._slots[self._vehicles[slot][0]]
+                self._release(slot, keep_driver=True)
+            return len(slots)
+
+    def _release(self, slot, keep_driver=False):
+        self._unbucket(slot, self._cell.pop(slot))
+        if not keep_driver:
+            driver_slots = self._driver_slots.get(self._vehicles[slot][1])
+            if driver_slots is not None:
+                driver_slots.discard(slot)
+                if not driver_slots:
+                    del self._driver_slots[self._vehicles[slot][1]]
+        self._vehicles[slot] = None
+        self._free.append(slot)
+
+    def move_driver(self, driver_id, lat, lng):
+        with self._lock:
+            slots = self._driver_slots.get(driver_id, ())
+            for slot in slots:
+                self._place(slot, int(self.fleet_ids[slot]), lat, lng)
+            return len(slots)
+
+    # --- Query ---
+    def eligible_fleets(self, fleet_type=None, fleet_id=None, weight_kg=0, volume_cbm=0):
+        return [
+            fid for fid, spec in self.fleets.items()
+            if (fleet_id is None or fid == fleet_id)
+            and (fleet_type is None or spec.fleet_type == fleet_type)
+            and spec.weight_kg >= weight_kg and spec.volume_cbm >= volume_cbm
+        ]
+
+    def nearest(self, lat, lng, k=5, fleet_ids=None, max_km=100.0):
+        """k Candidate terdekat dari armada `fleet_ids` (None = semua) dalam radius max_km."""
+        if fleet_ids is None:
+            fleet_ids = list(self.fleets)
+        row, col = cell_of(lat, lng)
+        # Jarak minimum ke cell di luar ring r: r x sisi cell terpendek (lng menyempit jauh dari ekuator)
+        cell_km = CELL_DEG * min(KM_PER_DEG_LAT, KM_PER_DEG_LNG * math.cos(math.radians(min(abs(lat) + 1, 89))))
+        max_radius = math.ceil(max_km / cell_km) + 1
+
+        with self._lock:
+            buckets = [self._buckets[fid] for fid in fleet_ids if self._counts.get(fid)]
+            remaining = sum(self._counts[fid] for fid in fleet_ids if fid in self._counts)
+            slots, distances = [], []
+            collected = 0
+            for radius in range(max_radius + 1):
+                found = [s for cell in ring(row, col, radius) for b in buckets for s in b.get(cell, ())]
+                if found:
+                    found = np.fromiter(found, dtype=np.int64, count=len(found))
+                    slots.append(found)
+                    distances.append(haversine_km_array(lat, lng, self.lat[found], self.lng[found]))
+                    collected += len(found)
+                if collected >= remaining:
+                    break
+                if collected >= k:
+                    kth = np.partition(np.concatenate(distances), k - 1)[k - 1]
+                    if kth <= radius * cell_km:
+                        break
+            if not slots:
+                return []
+            slots = np.concatenate(slots)
+            distances = np.concatenate(distances)
+            within = distances <= max_km
+            slots, distances = slots[within], distances[within]
+            order = np.lexsort((self.weight[slots], distances))[:k]
+            result = []
+            for slot, distance in zip(slots[order].tolist(), distances[order].tolist()):
+                vehicle_id, driver_id, nopol = self._vehicles[slot]
+                result.append(Candidate(
+                    vehicle_id, driver_id, int(self.fleet_ids[slot]), nopol,
+                    float(self.lat[slot]), float(self.lng[slot]), round(distance, 3),
+                ))
+            return result
+
+
+class DispatchIndex:
+    """VehicleGrid bersama per proses, dibangun dari DB dan disegarkan berkala."""
+
+    def __init__(self):
+        self._grid = None
+        self._built_at = 0.0
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    # --- Konfigurasi (lazy, ikut override settings) ---
+    @property
+    def refresh(self):
+        return getattr(settings, 'DISPATCH_INDEX_REFRESH', 15)
+
+    @property
+    def position_max_age(self):
+        return getattr(settings, 'DISPATCH_POSITION_MAX_AGE', 900)
+
+    def _cache(self):
+        return caches[getattr(settings, 'ROUTE_CACHE_ALIAS', 'default')]
+
+    # --- Build ---
+    def build(self):
+        fleets = {
+            fid: FleetSpec(fleet_type, float(weight), float(volume))
+            for fid, fleet_type, weight, volume in Fleet.objects.values_list(
+                'id', 'fleet_type', 'max_weight_kg_limit', 'max_volume_cbm_limit'
+            )
+        }
+        busy = Order.objects.filter(driver_id=OuterRef('mitra_id'), status__in=ORDER_OPEN_STATUSES)
+        rows = ArmadaKendaraan.objects.filter(
+            is_available=True,
+            mitra__document_status='VERIFIED',
+            mitra__position__recorded_at__gte=timezone.now() - timedelta(seconds=self.position_max_age),
+        ).exclude(mitra__risk_status='BLACKLIST').filter(~Exists(busy)).values_list(
+            'id', 'mitra_id', 'jenis_armada_id', 'nopol', 'mitra__position__lat_e6', 'mitra__position__lng_e6',
+        )
+        rows = list(rows)
+        grid = VehicleGrid(fleets, size_hint=len(rows))
+        for vehicle_id, driver_id, fleet_id, nopol, lat_e6, lng_e6 in rows:
+            grid.add(vehicle_id, driver_id, fleet_id, lat_e6 / 1e6, lng_e6 / 1e6, nopol)
+        return grid
+
+    def grid(self):
+        """Grid terkini; dibangun ulang jika kadaluarsa / versi berubah (request lain memakai grid lama)."""
+        now = time.monotonic()
+        grid = self._grid
+        stale = grid is None or now - self._built_at > self.refresh
+        if not stale and now - self._checked_at > 1:
+            self._checked_at = now
+            stale = self._cache().get(VERSION_KEY) != self._version
+        if stale and self._lock.acquire(blocking=grid is None):
+            try:
+                if self._grid is grid:
+                    version = self._cache().get(VERSION_KEY)
+                    self._grid = self.build()
+                    self._version = version
+                    self._built_at = self._checked_at = time.monotonic()
+            finally:
+                self._lock.release()
+        return self._grid
+
+    def invalidate(self):
+        """Naikkan versi (semua worker membangun ulang index pada query berikutnya)."""
+        self._cache().set(VERSION_KEY, time.time_ns(), None)
+
+    # --- Perubahan live (hanya berlaku jika grid sudah dibangun di proses ini) ---
+    def move_drivers(self, positions):
+        """positions: {driver_id: (lat, lng)}"""
+        grid = self._grid
+        if grid is not None:
+            for driver_id, (lat, lng) in positions.items():
+                grid.move_driver(driver_id, lat, lng)
+
+    def driver_busy(self, driver_id):
+        grid = self._grid
+        if grid is not None:
+            grid.remove_driver(driver_id)
+
+    # --- Query ---
+    def candidates(self, lat, lng, k=5, fleet_type=None, fleet_id=None, weight_kg=0, volume_cbm=0, max_km=None):
+        grid = self.grid()
+        fleet_ids = grid.eligible_fleets(fleet_type, fleet_id, weight_kg, volume_cbm)
+        if max_km is None:
+            max_km = getattr(settings, 'DISPATCH_MAX_RADIUS_KM', 100)
+        return grid.nearest(float(lat), float(lng), k, fleet_ids, max_km)
+
+    def stats(self):
+        grid = self._grid
+        return {
+            "vehicles": len(grid) if grid is not None else 0,
+            "age_seconds": round(time.monotonic() - self._built_at, 1) if grid is not None else None,
+        }
+
+
+dispatch_index = DispatchIndex()
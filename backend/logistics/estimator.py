@@ -0,0 +1,286 @@
+# backend/logistics/estimator.py
+
+"""
+Estimator jarak offline (fallback saat TomTom gagal / circuit terbuka).
+
+    jarak_jalan  = haversine x faktor circuity[region, mode]
+    durasi_menit = jarak_jalan x menit_per_km[region, mode]
+
+Faktor di-fit dari tabel CachedDistance (regresi least-squares melalui titik
+nol, vektor per grup lewat np.bincount). Grup yang datanya kurang dari
+ESTIMATOR_MIN_SAMPLES memakai level di atasnya:
+(region, mode) -> (region, semua mode) -> (semua region, mode) -> global -> default.
+
+Hasil kalibrasi disimpan di shared cache selama ESTIMATOR_RECALIBRATE detik;
+setelah kadaluarsa, worker pertama yang butuh estimator memfit ulang di thread
+latar (dengan lock cache.add agar tidak semua worker memfit bersamaan) sambil
+tetap melayani kalibrasi terakhir / default. Bisa juga dijalankan via cron:
+`python manage.py calibrate_estimator`.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+import itertools
+import logging
+import threading
+import time
+
+import numpy as np
+
+from .geo import haversine_km_array
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = "estimator:calibration:v1"
+LOCK_KEY = "lock:estimator:calibration"
+
+# Kotak kasar per pulau (lat_min, lat_max, lng_min, lng_max), dicek berurutan:
+# Jawa sebelum Sumatera agar Merak/Banten tidak masuk Lampung.
+REGIONS = (
+    ('JAWA', -9.0, -5.9, 105.0, 114.42),
+    ('SUMATERA', -6.0, 6.0, 95.0, 106.5),
+    ('BALI_NT', -11.0, -7.9, 114.42, 125.0),
+    ('KALIMANTAN', -4.5, 7.5, 108.5, 119.0),
+    ('SULAWESI', -6.5, 2.5, 119.0, 125.5),
+)
+OTHER_REGION = 'LAINNYA'
+INTER_REGION = 'ANTAR_PULAU'  # Asal & tujuan beda pulau (biasanya lewat penyeberangan)
+REGION_CODES = tuple(r[0] for r in REGIONS) + (OTHER_REGION, INTER_REGION)
+
+MODES = ('truck', 'car')
+UNKNOWN_MODE = len(MODES)  # Baris lama tanpa travel_mode: hanya ikut level "semua mode"
+
+DEFAULT_CIRCUITY = 1.35
+DEFAULT_MINUTES_PER_KM = 1.5  # ~40 km/jam
+
+# Baris dengan rasio di luar rentang ini dianggap outlier (salah geocode, rute memutar jauh)
+MIN_HAVERSINE_KM = 1.0
+MAX_CIRCUITY = 3.0
+
+
+def region_index(lat, lng):
+    lat = np.asarray(lat, dtype=np.float64)
+    lng = np.asarray(lng, dtype=np.float64)
+    index = np.full(lat.shape, REGION_CODES.index(OTHER_REGION), dtype=np.int64)
+    for i in reversed(range(len(REGIONS))):
+        _, lat_min, lat_max, lng_min, lng_max = REGIONS[i]
+        inside = (lat >= lat_min) & (lat < lat_max) & (lng >= lng_min) & (lng < lng_max)
+        index = np.where(inside, i, index)
+    return index
+
+
+def lane_region_index(o_lat, o_lng, d_lat, d_lng):
+    origin = region_index(o_lat, o_lng)
+    dest = region_index(d_lat, d_lng)
+    return np.where(origin == dest, origin, REGION_CODES.index(INTER_REGION))
+
+
+def mode_index(modes):
+    lookup = {mode: i for i, mode in enumerate(MODES)}
+    return np.array([lookup.get(mode, UNKNOWN_MODE) for mode in modes], dtype=np.int64)
+
+
+def _ratio_fit(groups, x, y, n_groups):
+    """Per grup: slope y = k*x (least squares lewat nol). Return (k, n)."""
+    n = np.bincount(groups, minlength=n_groups)
+    sxx = np.bincount(groups, x * x, minlength=n_groups)
+    sxy = np.bincount(groups, x * y, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = np.where(sxx > 0, sxy / sxx, np.nan)
+    return k, n
+
+
+def fit_calibration(o_lat, o_lng, d_lat, d_lng, distance_km, duration_minutes, modes, min_samples=30):
+    """
+    Fit faktor circuity & menit/km dari data rute. Semua argumen array sepanjang N
+    (modes berupa list string, atau array integer hasil mode_index()). Return dict
+    siap disimpan ke cache (JSON-able).
+    """
+    straight = haversine_km_array(o_lat, o_lng, d_lat, d_lng)
+    road = np.asarray(distance_km, dtype=np.float64)
+    minutes = np.asarray(duration_minutes, dtype=np.float64)
+    region = lane_region_index(o_lat, o_lng, d_lat, d_lng)
+    mode = modes if isinstance(modes, np.ndarray) and modes.dtype.kind == 'i' else mode_index(modes)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = road / straight
+    valid = (straight >= MIN_HAVERSINE_KM) & (ratio >= 1.0) & (ratio <= MAX_CIRCUITY) & (minutes > 0)
+    straight, road, minutes, region, mode = (a[valid] for a in (straight, road, minutes, region, mode))
+
+    n_regions, n_modes = len(REGION_CODES), len(MODES)
+    # Level dari paling spesifik; mode UNKNOWN hanya ikut level "semua mode"
+    levels = [
+        ('region_mode', region * (n_modes + 1) + mode, n_regions * (n_modes + 1),
+         lambda r, m: r * (n_modes + 1) + m),
+        ('region', region, n_regions, lambda r, m: r),
+        ('mode', mode, n_modes + 1, lambda r, m: m),
+        ('global', np.zeros_like(region), 1, lambda r, m: 0),
+    ]
+
+    circuity = np.full((n_regions, n_modes), DEFAULT_CIRCUITY)
+    minutes_per_km = np.full((n_regions, n_modes), DEFAULT_MINUTES_PER_KM)
+    source = [['default'] * n_modes for _ in range(n_regions)]
+    samples = np.zeros((n_regions, n_modes), dtype=np.int64)
+    error = np.full((n_regions, n_modes), np.nan)
+
+    resolved = np.zeros((n_regions, n_modes), dtype=bool)
+    for name, groups, n_groups, group_of in levels:
+        k, n = _ratio_fit(groups, straight, road, n_groups)
+        speed, _ = _ratio_fit(groups, road, minutes, n_groups)
+        # Rata-rata galat relatif jarak per grup (untuk memantau mutu estimasi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rel_err = np.abs(k[groups] * straight - road) / road
+            mape = np.bincount(groups, np.nan_to_num(rel_err), minlength=n_groups) / n
+        for r in range(n_regions):
+            for m in range(n_modes):
+                g = group_of(r, m)
+                if resolved[r, m] or n[g] < min_samples or not np.isfinite(k[g]):
+                    continue
+                circuity[r, m] = k[g]
+                minutes_per_km[r, m] = speed[g] if np.isfinite(speed[g]) else DEFAULT_MINUTES_PER_KM
+                source[r][m] = name
+                samples[r, m] = n[g]
+                error[r, m] = mape[g]
+                resolved[r, m] = True
+
+    return {
+        "fitted_at": time.time(),
+        "rows_used": int(valid.sum()),
+        "rows_total": int(valid.size),
+        "regions": list(REGION_CODES),
+        "modes": list(MODES),
+        "circuity": np.round(circuity, 4).tolist(),
+        "minutes_per_km": np.round(minutes_per_km, 4).tolist(),
+        "source": source,
+        "samples": samples.tolist(),
+        "mean_abs_error": np.round(np.nan_to_num(error, nan=-1), 4).tolist(),
+    }
+
+
+def calibrate_from_db(chunk_size=5000):
+    """
+    Fit dari seluruh CachedDistance. Hanya kolom yang perlu, dibaca per chunk dan
+    langsung diubah ke array NumPy (float64 + index mode): memori ~56 byte per
+    rute, bukan satu tuple Python per baris.
+    """
+    from .models import CachedDistance
+
+    rows = CachedDistance.objects.values_list(
+        'origin_lat', 'origin_lng', 'dest_lat', 'dest_lng', 'distance_km', 'duration_minutes', 'travel_mode'
+    ).iterator(chunk_size=chunk_size)
+    numeric, modes = [], []
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        numeric.append(np.array([row[:6] for row in chunk], dtype=np.float64))
+        modes.append(mode_index([row[6] for row in chunk]))
+    numeric = np.concatenate(numeric) if numeric else np.empty((0, 6))
+    modes = np.concatenate(modes) if modes else np.empty(0, dtype=np.int64)
+    min_samples = getattr(settings, 'ESTIMATOR_MIN_SAMPLES', 30)
+    return fit_calibration(*numeric.T, modes, min_samples=min_samples)
+
+
+class DistanceEstimator:
+    def __init__(self, calibration):
+        self.calibration = calibration
+        self.circuity = np.array(calibration['circuity'], dtype=np.float64)
+        self.minutes_per_km = np.array(calibration['minutes_per_km'], dtype=np.float64)
+        self._modes = {mode: i for i, mode in enumerate(calibration['modes'])}
+
+    def estimate(self, o_lat, o_lng, d_lat, d_lng, travel_mode='truck'):
+        """Vektor: array koordinat -> (distance_km, duration_minutes) array."""
+        region = lane_region_index(o_lat, o_lng, d_lat, d_lng)
+        mode = self._modes.get(travel_mode, 0)
+        distance = haversine_km_array(o_lat, o_lng, d_lat, d_lng) * self.circuity[region, mode]
+        duration = distance * self.minutes_per_km[region, mode]
+        return np.round(distance, 2), np.rint(duration).astype(np.int64)
+
+    def estimate_routes(self, keys, travel_mode='truck'):
+        """{lane_key: route_data} untuk banyak lane sekaligus."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        coords = np.array(keys, dtype=np.float64)
+        distance, duration = self.estimate(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3], travel_mode)
+        return {
+            key: {"distance_km": float(distance[i]), "duration_minutes": int(duration[i])}
+            for i, key in enumerate(keys)
+        }
+
+
+class EstimatorHolder:
+    """Estimator per proses, diperbarui dari shared cache / difit ulang (thread latar) jika kalibrasi kadaluarsa."""
+
+    def __init__(self):
+        self._estimator = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'ROUTE_CACHE_ALIAS', 'default')]
+
+    @property
+    def interval(self):
+        return getattr(settings, 'ESTIMATOR_RECALIBRATE', 24 * 3600)
+
+    def recalibrate(self):
+        calibration = calibrate_from_db()
+        self.cache.set(CACHE_KEY, calibration, timeout=self.interval)
+        with self._lock:
+            self._estimator = DistanceEstimator(calibration)
+            self._next_check = time.monotonic() + self.interval
+        logger.info(f"Estimator dikalibrasi ulang dari {calibration['rows_used']} rute")
+        return self._estimator
+
+    def get(self):
+        now = time.monotonic()
+        if self._estimator is not None and now < self._next_check:
+            return self._estimator
+
+        calibration = self.cache.get(CACHE_KEY)
+        if calibration is not None:
+            with self._lock:
+                self._estimator = DistanceEstimator(calibration)
+                # Kalibrasi di cache bisa sudah tua: cek lagi paling lambat saat ia kadaluarsa
+                self._next_check = now + max(60, self.interval - (time.time() - calibration['fitted_at']))
+            return self._estimator
+
+        if self.cache.add(LOCK_KEY, 1, timeout=300):
+            self._recalibrate_in_background()
+
+        # Kalibrasi sedang berjalan (thread latar proses ini / worker lain): pakai yang ada
+        # (atau default) dan cek lagi sebentar lagi, request tidak ikut menunggu fit
+        with self._lock:
+            if self._estimator is None:
+                self._estimator = DistanceEstimator(fit_calibration([], [], [], [], [], [], []))
+            self._next_check = now + 30
+        return self._estimator
+
+    def _recalibrate_in_background(self):
+        def run():
+            try:
+                self.recalibrate()
+            except Exception as e:
+                logger.error(f"Kalibrasi estimator gagal: {e}")
+            finally:
+                self.cache.delete(LOCK_KEY)
+                close_old_connections()
+
+        threading.Thread(target=run, name="estimator-calibrate", daemon=True).start()
+
+
+estimator = EstimatorHolder()
+
+
+def estimate_routes(keys, travel_mode='truck'):
+    """Fallback jarak untuk lane yang gagal di-route. Return {lane_key: route_data}."""
+    if not getattr(settings, 'ESTIMATOR_ENABLED', True):
+        return {}
+    try:
+        return estimator.get().estimate_routes(keys, travel_mode)
+    except Exception as e:
+        logger.error(f"Estimator jarak gagal: {e}")
+        return {}
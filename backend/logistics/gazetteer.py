@@ -0,0 +1,174 @@
+# backend/logistics/gazetteer.py
+
+"""
+Autocomplete lokal dari tabel GazetteerPlace lewat index trigram in-memory.
+
+- Setiap kata label diberi satu spasi di depan lalu dipecah jadi trigram
+  (" cik", "cik", "ika", ...). Token query yang merupakan AWALAN sebuah kata
+  pasti menghasilkan trigram yang semuanya ada di kata itu, jadi cukup irisan
+  posting list lalu verifikasi awalan kata (aturan yang sama dengan
+  label_matches(), dipakai filter prefix di geocode_cache).
+- ID tempat diurutkan sesuai ranking (jenis, popularitas, label pendek) saat
+  index dibangun, sehingga posting list terpendek bisa dibaca berurutan dan
+  berhenti begitu `limit` hasil ditemukan.
+- Index dibangun ulang otomatis jika versi gazetteer di shared cache berubah
+  (di-bump oleh signal GazetteerPlace & command load_gazetteer).
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from asgiref.sync import sync_to_async
+import re
+import threading
+import time
+
+VERSION_KEY = "gazetteer:version"
+
+# Urutan tampil saat skor lain sama: tempat "besar" dulu, alamat order terakhir
+KIND_RANK = {'CITY': 0, 'REGENCY': 1, 'INDUSTRIAL': 2, 'PORT': 2, 'ADDRESS': 3}
+
+# Hasil irisan sebanyak ini cukup diurutkan langsung
+SMALL_MATCHES = 256
+
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def normalize_query(query):
+    """Huruf kecil, tanda baca jadi spasi, spasi berlebih dibuang."""
+    return " ".join(_NON_WORD.sub(" ", (query or "").lower()).split())
+
+
+def label_matches(label, tokens):
+    """Setiap token query harus menjadi awalan salah satu kata di label."""
+    words = normalize_query(label).split()
+    return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+def word_trigrams(text):
+    grams = set()
+    for word in text.split():
+        padded = " " + word
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    def __init__(self, places):
+        """places: iterable (label, kind, lat, lng, popularity)."""
+        ranked = sorted(places, key=lambda p: (KIND_RANK.get(p[1], 9), -p[4], len(p[0])))
+        self.labels = [p[0] for p in ranked]
+        self.results = [{"label": p[0], "lat": p[2], "lng": p[3]} for p in ranked]
+        self.words = [tuple(normalize_query(label).split()) for label in self.labels]
+
+        postings = {}
+        for place_id, words in enumerate(self.words):
+            for gram in word_trigrams(" ".join(words)):
+                postings.setdefault(gram, []).append(place_id)
+        # List (urut ranking) untuk iterasi, set untuk cek keanggotaan
+        self.postings = {gram: (ids, frozenset(ids)) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.labels)
+
+    def search(self, query, limit=5):
+        tokens = normalize_query(query).split()
+        lists = []
+        for token in tokens:
+            grams = word_trigrams(token)
+            if not grams:
+                continue  # Token 1 huruf: cukup diverifikasi di akhir
+            postings = [self.postings.get(gram) for gram in grams]
+            if None in postings:
+                return []
+            # Trigram dalam satu kata saling berkorelasi: posting terjarang sudah cukup menyaring
+            lists.append(min(postings, key=lambda p: len(p[0])))
+        if not lists:
+            return []
+
+        lists.sort(key=lambda p: len(p[0]))
+        driver = lists[0][0]
+        others = [p[1] for p in lists[1:] if p is not lists[0]]
+        if others:
+            # Irisan di level C (frozenset). Hasil sedikit: urutkan langsung (id = urutan
+            # ranking); banyak: baca driver berurutan & berhenti begitu limit terpenuhi
+            matches = lists[0][1].intersection(*others)
+            driver = sorted(matches) if len(matches) <= SMALL_MATCHES else (i for i in driver if i in matches)
+
+        found = []
+        for place_id in driver:
+            if self._matches(place_id, tokens):
+                found.append(self.results[place_id])
+                if len(found) >= limit:
+                    break
+        return found
+
+    def _matches(self, place_id, tokens):
+        words = self.words[place_id]
+        return all(any(word.startswith(token) for word in words) for token in tokens)
+
+
+class Gazetteer:
+    """Pemegang index per proses; cek versi di shared cache paling sering tiap GAZETTEER_REFRESH detik."""
+
+    def __init__(self):
+        self._index = None
+        self._version = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'GEOCODE_CACHE_ALIAS', 'default')]
+
+    def _stale(self):
+        if self._index is None:
+            return True
+        now = time.monotonic()
+        if now - self._checked_at < getattr(settings, 'GAZETTEER_REFRESH', 60):
+            return False
+        self._checked_at = now
+        return self.cache.get(VERSION_KEY) != self._version
+
+    def load(self):
+        from .models import GazetteerPlace
+
+        with self._lock:
+            version = self.cache.get(VERSION_KEY)
+            rows = GazetteerPlace.objects.values_list('name', 'region', 'kind', 'lat', 'lng', 'popularity')
+            self._index = TrigramIndex(
+                (f"{name}, {region}" if region else name, kind, lat, lng, popularity)
+                for name, region, kind, lat, lng, popularity in rows.iterator(chunk_size=5000)
+            )
+            self._version = version
+            self._checked_at = time.monotonic()
+        return self._index
+
+    def index(self):
+        return self.load() if self._stale() else self._index
+
+    async def aindex(self):
+        # Cek versi & build menyentuh DB/cache sync: jalankan di thread
+        return await sync_to_async(self.index)()
+
+    def search(self, query, limit=5):
+        if not getattr(settings, 'GAZETTEER_ENABLED', True):
+            return []
+        return self.index().search(query, limit)
+
+    async def asearch(self, query, limit=5):
+        if not getattr(settings, 'GAZETTEER_ENABLED', True):
+            return []
+        if self._index is None or time.monotonic() - self._checked_at >= getattr(settings, 'GAZETTEER_REFRESH', 60):
+            index = await self.aindex()
+        else:
+            index = self._index
+        return index.search(query, limit)
+
+
+def bump_version():
+    """Tandai gazetteer berubah: semua worker membangun ulang index pada refresh berikutnya."""
+    gazetteer.cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+# Instance tunggal per proses
+gazetteer = Gazetteer()
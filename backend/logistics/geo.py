@@ -0,0 +1,44 @@
+# backend/logistics/geo.py
+
+"""
+Helper geografis ringan (tanpa dependency GIS): jarak haversine & grid cell.
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Ukuran grid cell untuk index spasial CachedDistance (~1,1 km di ekuator).
+# Mengubah nilai ini berarti semua origin_cell/dest_cell harus di-backfill ulang.
+CELL_DEG = 0.01
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Jarak garis lurus (great-circle) dalam km."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (float(lat1), float(lng1), float(lat2), float(lng2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def haversine_km_array(lat1, lng1, lat2, lng2):
+    """Versi vektor haversine_km (NumPy array/list, hasil array km)."""
+    lat1, lng1, lat2, lng2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def grid_cell(lat, lng):
+    """Koordinat -> id grid cell, contoh '-621:10684'."""
+    return f"{math.floor(float(lat) / CELL_DEG)}:{math.floor(float(lng) / CELL_DEG)}"
+
+
+def neighbour_cells(lat, lng):
+    """Cell milik koordinat + 8 cell di sekelilingnya (cukup untuk radius <= 1 cell)."""
+    row = math.floor(float(lat) / CELL_DEG)
+    col = math.floor(float(lng) / CELL_DEG)
+    return {f"{row + dr}:{col + dc}" for dr in (-1, 0, 1) for dc in (-1, 0, 1)}
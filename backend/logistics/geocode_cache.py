@@ -0,0 +1,256 @@
+# backend/logistics/geocode_cache.py
+
+"""
+Cache hasil autocomplete geocode (TomTom search).
+
+- Query dinormalisasi dulu (huruf kecil, tanda baca & spasi berlebih dibuang),
+  jadi "Jakarta  Ut" dan "jakarta ut" memakai entry yang sama.
+- 2 tingkat seperti route_cache: LRU in-process -> Django shared cache, dengan TTL.
+- Prefix: saat user mengetik "cikarang b", hasil cache untuk "cikarang" yang
+  LENGKAP (jumlah hasil < limit, artinya TomTom tidak memotong daftar) bisa
+  difilter lokal tanpa panggilan upstream.
+- Gazetteer lokal (gazetteer.py) ditanya paling awal; TomTom hanya saat miss.
+- Metrik per sumber jawaban (gazetteer/local/shared/prefix/upstream): jumlah & latency
+  (rata-rata, p50, p95) untuk membuktikan berapa panggilan upstream yang dihemat.
+"""
+
+from collections import OrderedDict, deque
+from django.conf import settings
+from django.core.cache import caches
+import hashlib
+import threading
+import time
+
+from .gazetteer import gazetteer, normalize_query, label_matches
+
+KEY_PREFIX = "geocode:v1:"
+MIN_QUERY_LENGTH = 3
+LATENCY_SAMPLES = 1024
+
+def cache_key(norm_query, limit):
+    digest = hashlib.sha1(norm_query.encode()).hexdigest()  # Aman untuk memcached (tanpa spasi)
+    return f"{KEY_PREFIX}{limit}:{digest}"
+
+
+class GeocodeCache:
+    """
+    Nilai yang disimpan: {"results": [...], "complete": bool, "cached_at": epoch detik}.
+    `complete` True jika TomTom mengembalikan lebih sedikit dari limit.
+    """
+    SOURCES = ('gazetteer', 'local', 'shared', 'prefix', 'upstream')
+
+    def __init__(self, maxsize=None, ttl=None, alias=None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._alias = alias
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(('errors', 'evictions'), 0)
+        self._latency = {source: deque(maxlen=LATENCY_SAMPLES) for source in self.SOURCES}
+        self._hits = dict.fromkeys(self.SOURCES, 0)
+
+    # --- Konfigurasi (lazy, ikut override settings) ---
+    @property
+    def maxsize(self):
+        return self._maxsize or getattr(settings, 'GEOCODE_CACHE_LRU_SIZE', 5000)
+
+    @property
+    def ttl(self):
+        return self._ttl or getattr(settings, 'GEOCODE_CACHE_TTL', 24 * 3600)
+
+    @property
+    def shared(self):
+        return caches[self._alias or getattr(settings, 'GEOCODE_CACHE_ALIAS', 'default')]
+
+    def _is_fresh(self, entry, now):
+        return now - entry['cached_at'] < self.ttl
+
+    def _local_get(self, skey, now):
+        with self._lock:
+            entry = self._local.get(skey)
+            if entry is None:
+                return None
+            if not self._is_fresh(entry, now):
+                del self._local[skey]
+                return None
+            self._local.move_to_end(skey)
+            return entry
+
+    def _local_set(self, skey, entry):
+        with self._lock:
+            self._local[skey] = entry
+            self._local.move_to_end(skey)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    # --- Lookup ---
+    def _candidates(self, norm_query, limit):
+        """Key query lengkap + semua prefix-nya (terpanjang dulu, minimal MIN_QUERY_LENGTH)."""
+        return [
+            (norm_query[:end], cache_key(norm_query[:end], limit))
+            for end in range(len(norm_query), MIN_QUERY_LENGTH - 1, -1)
+            if norm_query[end - 1] != " "
+        ]
+
+    def _resolve(self, norm_query, candidates, local, shared, now):
+        """Pilih jawaban dari entry yang ditemukan. Return (results, source) atau (None, None)."""
+        tokens = norm_query.split()
+        for prefix, skey in candidates:
+            entry, source = local.get(skey), 'local'
+            if entry is None:
+                entry, source = shared.get(skey), 'shared'
+                if entry is None or not self._is_fresh(entry, now):
+                    continue
+                self._local_set(skey, entry)
+
+            if prefix == norm_query:
+                return entry['results'], source
+            if entry['complete']:
+                filtered = [r for r in entry['results'] if label_matches(r['label'], tokens)]
+                # Daftar kosong bisa berarti TomTom (fuzzy) tetap punya hasil: tanya upstream
+                if filtered:
+                    return filtered, 'prefix'
+        return None, None
+
+    def get(self, query, limit=5):
+        """Return (results, source) atau (None, None) jika harus ke upstream."""
+        norm_query = normalize_query(query)
+        now = time.time()
+        candidates = self._candidates(norm_query, limit)
+        local = {}
+        for _, skey in candidates:
+            entry = self._local_get(skey, now)
+            if entry is not None:
+                local[skey] = entry
+        missing = [skey for _, skey in candidates if skey not in local]
+        shared = self.shared.get_many(missing) if missing else {}
+        return self._resolve(norm_query, candidates, local, shared, now)
+
+    async def aget(self, query, limit=5):
+        norm_query = normalize_query(query)
+        now = time.time()
+        candidates = self._candidates(norm_query, limit)
+        local = {}
+        for _, skey in candidates:
+            entry = self._local_get(skey, now)
+            if entry is not None:
+                local[skey] = entry
+        missing = [skey for _, skey in candidates if skey not in local]
+        shared = await self.shared.aget_many(missing) if missing else {}
+        return self._resolve(norm_query, candidates, local, shared, now)
+
+    def _entry(self, results, limit):
+        return {"results": results, "complete": len(results) < limit, "cached_at": time.time()}
+
+    def set(self, query, limit, results):
+        skey = cache_key(normalize_query(query), limit)
+        entry = self._entry(results, limit)
+        self._local_set(skey, entry)
+        self.shared.set(skey, entry, timeout=self.ttl)
+
+    async def aset(self, query, limit, results):
+        skey = cache_key(normalize_query(query), limit)
+        entry = self._entry(results, limit)
+        self._local_set(skey, entry)
+        await self.shared.aset(skey, entry, timeout=self.ttl)
+
+    # --- Metrik ---
+    def record(self, source, started):
+        """Catat satu query yang dijawab oleh `source` (started = time.perf_counter())."""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._hits[source] += 1
+            self._latency[source].append(elapsed_ms)
+
+    def record_error(self):
+        with self._lock:
+            self._counters['errors'] += 1
+
+    def stats(self):
+        with self._lock:
+            hits = dict(self._hits)
+            samples = {source: sorted(values) for source, values in self._latency.items()}
+            counters = dict(self._counters)
+            size = len(self._local)
+
+        def latency(values):
+            if not values:
+                return None
+            return {
+                "avg_ms": round(sum(values) / len(values), 3),
+                "p50_ms": round(values[len(values) // 2], 3),
+                "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+            }
+
+        total = sum(hits.values())
+        cached = total - hits['upstream']
+        return {
+            "queries": total,
+            "gazetteer_hits": hits['gazetteer'],
+            "local_hits": hits['local'],
+            "shared_hits": hits['shared'],
+            "prefix_hits": hits['prefix'],
+            "upstream_calls": hits['upstream'],
+            **counters,
+            "hit_ratio": round(cached / total, 4) if total else None,
+            "latency": {source: latency(values) for source, values in samples.items()},
+            "lru_size": size,
+            "lru_maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+            for source in self.SOURCES:
+                self._hits[source] = 0
+                self._latency[source].clear()
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+
+# Instance tunggal per proses
+geocode_cache = GeocodeCache()
+
+
+def cached_search(client, query, limit=5):
+    """
+    Autocomplete lewat cache; `client` adalah TomTomClient.
+    Exception dari upstream diteruskan (view yang memutuskan fallback-nya).
+    """
+    started = time.perf_counter()
+    results, source = gazetteer.search(query, limit), 'gazetteer'
+    if not results:
+        results, source = geocode_cache.get(query, limit)
+    if results is None:
+        try:
+            results = client.search(normalize_query(query), limit=limit)
+        except Exception:
+            geocode_cache.record_error()
+            raise
+        geocode_cache.set(query, limit, results)
+        source = 'upstream'
+    geocode_cache.record(source, started)
+    return results
+
+
+async def acached_search(client, query, limit=5):
+    """Versi async cached_search; `client` adalah AsyncTomTomClient."""
+    started = time.perf_counter()
+    results, source = await gazetteer.asearch(query, limit), 'gazetteer'
+    if not results:
+        results, source = await geocode_cache.aget(query, limit)
+    if results is None:
+        try:
+            results = await client.search(normalize_query(query), limit=limit)
+        except Exception:
+            geocode_cache.record_error()
+            raise
+        await geocode_cache.aset(query, limit, results)
+        source = 'upstream'
+    geocode_cache.record(source, started)
+    return results
@@ -0,0 +1,435 @@
+# backend/logistics/gps.py
+
+"""
+Ingest GPS driver (MitraArmada) berfrekuensi tinggi.
+
+    POST batch (JSON kolom, opsional gzip + delta)
+        -> decode_batch()                  : array NumPy, tervalidasi & terurut
+        -> ring buffer per driver (memori) : tanpa query DB di jalur request
+        -> flush periodik (thread)         : Douglas-Peucker per driver
+        -> DriverLocation.bulk_create      : tabel time-series kolom integer
+        -> DriverPosition (upsert)         : posisi terakhir, sumber index dispatch
+
+Format batch (satu driver per request):
+    {"t": [epoch ms, ...], "lat": [...], "lng": [...], "speed": [...], "heading": [...]}
+    "speed" (km/j) & "heading" (derajat) opsional. Dengan "delta": true, t / lat /
+    lng berisi selisih terhadap elemen sebelumnya (elemen pertama absolut) dan
+    lat / lng dalam mikroderajat (x 1e6, integer): bentuk ini jauh lebih kecil
+    setelah gzip (Content-Encoding: gzip). Titik dengan timestamp lebih dari
+    GPS_MAX_CLOCK_SKEW detik dari jam server dibuang.
+
+Buffer & flush per proses worker: tiap worker menyederhanakan potongan track
+yang ia terima. Titik terakhir yang sudah ditulis menjadi jangkar flush
+berikutnya agar garis tetap tersambung. Jika buffer penuh sebelum flush, titik
+terlama ditimpa (dihitung sebagai `dropped`).
+"""
+
+from django.conf import settings
+from django.db import close_old_connections
+from datetime import datetime, timedelta, timezone as dt_timezone
+import atexit
+import json
+import logging
+import math
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from .dispatch import dispatch_index
+from .models import DriverLocation, DriverPosition, MitraArmada
+
+logger = logging.getLogger(__name__)
+
+E6 = 1_000_000
+MAX_BODY_BYTES = 1 << 20  # Batas body setelah dekompresi (cegah gzip bomb)
+METERS_PER_DEG = 111_320.0
+POINT_DTYPE = np.dtype([('t', 'i8'), ('lat', 'i4'), ('lng', 'i4'), ('speed', 'i2'), ('heading', 'i2')])
+MISSING = -1  # speed / heading tidak dikirim
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class GPSBatchError(ValueError):
+    pass
+
+
+# ===========================================================
+# DECODE BATCH
+# ===========================================================
+
+def read_body(raw, content_encoding=""):
+    """Body request -> dict JSON. Mendukung Content-Encoding: gzip / deflate."""
+    if content_encoding in ("gzip", "deflate"):
+        wbits = 16 + zlib.MAX_WBITS if content_encoding == "gzip" else zlib.MAX_WBITS
+        inflater = zlib.decompressobj(wbits)
+        try:
+            raw = inflater.decompress(raw, MAX_BODY_BYTES)
+        except zlib.error:
+            raise GPSBatchError("Body terkompresi rusak")
+        if inflater.unconsumed_tail:
+            raise GPSBatchError("Batch terlalu besar")
+    elif content_encoding not in ("", "identity"):
+        raise GPSBatchError(f"Content-Encoding tidak didukung: {content_encoding}")
+    try:
+        payload = json.loads(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise GPSBatchError("Body bukan JSON valid")
+    if not isinstance(payload, dict):
+        raise GPSBatchError("Body harus objek JSON")
+    return payload
+
+
+def _column(payload, name, dtype, size=None):
+    values = payload.get(name)
+    if values is None:
+        if size is None:
+            raise GPSBatchError(f"Kolom '{name}' wajib diisi")
+        return np.full(size, MISSING, dtype=dtype)
+    try:
+        array = np.asarray(values, dtype=dtype)
+    except (TypeError, ValueError, OverflowError):
+        raise GPSBatchError(f"Kolom '{name}' harus berisi angka")
+    if array.ndim != 1 or (size is not None and len(array) != size):
+        raise GPSBatchError(f"Panjang kolom '{name}' tidak sama dengan 't'")
+    return array
+
+
+def decode_batch(payload):
+    """dict batch -> array POINT_DTYPE terurut waktu, tanpa duplikat timestamp."""
+    delta = bool(payload.get("delta"))
+    t = _column(payload, "t", np.int64)
+    n = len(t)
+    if n == 0:
+        return np.empty(0, dtype=POINT_DTYPE)
+    max_points = getattr(settings, 'GPS_MAX_BATCH_POINTS', 1000)
+    if n > max_points:
+        raise GPSBatchError(f"Maksimal {max_points} titik per batch")
+
+    if delta:
+        t = np.cumsum(t)
+        lat = np.cumsum(_column(payload, "lat", np.int64, n))
+        lng = np.cumsum(_column(payload, "lng", np.int64, n))
+        in_range = True  # Integer: dicek lewat perbandingan di bawah
+    else:
+        # json.loads menerima NaN / Infinity: cek rentang dalam derajat SEBELUM dikonversi ke
+        # int64 (NaN / nilai raksasa jadi INT64_MIN, dan abs() darinya tetap negatif)
+        lat = _column(payload, "lat", np.float64, n)
+        lng = _column(payload, "lng", np.float64, n)
+        in_range = (np.abs(lat) <= 90) & (np.abs(lng) <= 180)  # False untuk NaN
+        lat = np.rint(np.where(in_range, lat, 0) * E6).astype(np.int64)
+        lng = np.rint(np.where(in_range, lng, 0) * E6).astype(np.int64)
+    # speed / heading NaN / Infinity dianggap tidak dikirim
+    speed = _column(payload, "speed", np.float64, n)
+    speed = np.rint(np.where(np.isfinite(speed), speed, MISSING)).clip(MISSING, 32767)
+    heading = _column(payload, "heading", np.float64, n)
+    heading = np.rint(np.where(np.isfinite(heading), heading, MISSING))
+    heading = np.where(heading < 0, MISSING, heading % 360)
+
+    # Jam HP yang ngawur (jauh di masa lalu / depan) dibuang: satu titik masa depan
+    # akan memblokir semua titik berikutnya driver itu (DriverTrack.last_t)
+    now_ms = int(time.time() * 1000)
+    skew_ms = int(getattr(settings, 'GPS_MAX_CLOCK_SKEW', 86400) * 1000)
+    valid = in_range & (
+        (lat >= -90 * E6) & (lat <= 90 * E6) & (lng >= -180 * E6) & (lng <= 180 * E6)  # Tanpa abs(): aman dari INT64_MIN
+        & (t >= now_ms - skew_ms) & (t <= now_ms + skew_ms)
+    )
+    points = np.empty(int(valid.sum()), dtype=POINT_DTYPE)
+    points['t'], points['lat'], points['lng'] = t[valid], lat[valid], lng[valid]
+    points['speed'], points['heading'] = speed[valid], heading[valid]
+    points.sort(order='t', kind='stable')
+    if len(points) > 1:
+        points = points[np.concatenate(([True], np.diff(points['t']) > 0))]
+    return points
+
+
+# ===========================================================
+# DOUGLAS-PEUCKER
+# ===========================================================
+
+def douglas_peucker(lat_e6, lng_e6, tolerance_m):
+    """
+    Mask titik yang dipertahankan (ujung selalu dipertahankan). Koordinat
+    diproyeksikan equirectangular lokal (meter); jarak tiap segmen dihitung
+    vektor sekaligus, rekursi diganti stack.
+    """
+    n = len(lat_e6)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    if tolerance_m <= 0:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+    if n < 3:
+        return keep
+
+    scale = METERS_PER_DEG / E6
+    y = lat_e6.astype(np.float64) * scale
+    x = lng_e6.astype(np.float64) * scale * math.cos(math.radians(float(lat_e6[0]) / E6))
+
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        dx, dy = x[end] - x[start], y[end] - y[start]
+        px, py = x[start + 1:end] - x[start], y[start + 1:end] - y[start]
+        length_sq = dx * dx + dy * dy
+        if length_sq == 0:
+            dist = np.hypot(px, py)
+        else:
+            # Jarak ke SEGMEN (bukan garis tak hingga): track bisa berbalik arah
+            u = np.clip((px * dx + py * dy) / length_sq, 0.0, 1.0)
+            dist = np.hypot(px - u * dx, py - u * dy)
+        farthest = int(np.argmax(dist))
+        if dist[farthest] > tolerance_m:
+            index = start + 1 + farthest
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+    return keep
+
+
+# ===========================================================
+# RING BUFFER PER DRIVER
+# ===========================================================
+
+class DriverTrack:
+    """Ring buffer titik yang belum ditulis + jangkar (titik terakhir yang sudah ditulis)."""
+    __slots__ = ('driver_id', 'points', 'head', 'count', 'anchor', 'last_t', 'dropped', 'lock')
+
+    def __init__(self, driver_id, capacity):
+        self.driver_id = driver_id
+        self.points = np.empty(capacity, dtype=POINT_DTYPE)
+        self.head = 0  # Index titik tertua yang belum ditulis
+        self.count = 0
+        self.anchor = None
+        self.last_t = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def append(self, batch):
+        """Tambahkan batch terurut; titik yang tidak lebih baru dari titik terakhir dibuang."""
+        with self.lock:
+            batch = batch[batch['t'] > self.last_t]
+            n = len(batch)
+            if not n:
+                return 0
+            capacity = len(self.points)
+            overflow = max(0, self.count + n - capacity)
+            if overflow:
+                self.dropped += overflow
+                skip = min(overflow, self.count)
+                self.head = (self.head + skip) % capacity
+                self.count -= skip
+                batch = batch[-capacity:]
+            tail = (self.head + self.count) % capacity
+            self.points[(tail + np.arange(len(batch))) % capacity] = batch
+            self.count += len(batch)
+            self.last_t = int(batch['t'][-1])
+            return n
+
+    def drain(self):
+        """(jangkar, titik belum ditulis terurut); buffer dikosongkan."""
+        with self.lock:
+            if not self.count:
+                return self.anchor, None
+            pending = self.points[(self.head + np.arange(self.count)) % len(self.points)]
+            self.head = (self.head + self.count) % len(self.points)
+            self.count = 0
+            anchor, self.anchor = self.anchor, pending[-1].copy()
+            return anchor, pending
+
+    def restore(self, anchor, pending):
+        """Kembalikan hasil drain() yang gagal ditulis ke depan buffer (sebelum titik yang masuk sesudahnya)."""
+        with self.lock:
+            capacity = len(self.points)
+            newer = self.points[(self.head + np.arange(self.count)) % capacity]
+            merged = np.concatenate((pending, newer))
+            if len(merged) > capacity:
+                self.dropped += len(merged) - capacity
+                merged = merged[-capacity:]
+            self.points[:len(merged)] = merged
+            self.head, self.count = 0, len(merged)
+            self.anchor = anchor
+
+    def latest(self):
+        with self.lock:
+            if self.count:
+                return self.points[(self.head + self.count - 1) % len(self.points)].copy()
+            return self.anchor
+
+
+def simplify(anchor, pending, tolerance_m):
+    """Titik pending yang lolos Douglas-Peucker, dihitung bersama jangkar flush sebelumnya."""
+    track = pending if anchor is None else np.concatenate(([anchor], pending))
+    keep = douglas_peucker(track['lat'], track['lng'], tolerance_m)
+    return track[keep] if anchor is None else track[1:][keep[1:]]
+
+
+def location_row(driver_id, point):
+    """Titik POINT_DTYPE (tuple) -> DriverLocation, None jika timestamp di luar rentang datetime."""
+    t, lat, lng, speed, heading = point
+    try:
+        recorded_at = EPOCH + timedelta(milliseconds=t)
+    except OverflowError:
+        logger.warning(f"Titik GPS driver {driver_id} dengan timestamp {t} dibuang")
+        return None
+    return DriverLocation(
+        driver_id=driver_id, recorded_at=recorded_at, lat_e6=lat, lng_e6=lng,
+        speed_kmh=None if speed == MISSING else speed,
+        heading=None if heading == MISSING else heading,
+    )
+
+
+class LocationBuffer:
+    def __init__(self, auto_flush=True):
+        self.auto_flush = auto_flush  # False: flush hanya manual (benchmark / command)
+        self._tracks = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = None
+        self._drivers = {}  # user_id -> MitraArmada.id
+        self._counters = dict.fromkeys(('received', 'accepted', 'written', 'flushes'), 0)
+
+    # --- Konfigurasi (lazy, ikut override settings) ---
+    @property
+    def capacity(self):
+        return getattr(settings, 'GPS_BUFFER_SIZE', 256)
+
+    @property
+    def tolerance_m(self):
+        return getattr(settings, 'GPS_SIMPLIFY_TOLERANCE_M', 10)
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, 'GPS_FLUSH_INTERVAL', 30)
+
+    # --- Ingest (jalur request) ---
+    def driver_id_for(self, user):
+        """MitraArmada.id milik user (di-cache per proses), atau None jika user bukan driver."""
+        driver_id = self._drivers.get(user.id)
+        if driver_id is None:
+            driver_id = MitraArmada.objects.filter(user_id=user.id).values_list('id', flat=True).first()
+            if driver_id is not None:
+                self._drivers[user.id] = driver_id
+        return driver_id
+
+    def track(self, driver_id):
+        track = self._tracks.get(driver_id)
+        if track is None:
+            with self._lock:
+                track = self._tracks.setdefault(driver_id, DriverTrack(driver_id, self.capacity))
+        return track
+
+    def ingest(self, driver_id, points):
+        accepted = self.track(driver_id).append(points)
+        with self._lock:
+            self._counters['received'] += len(points)
+            self._counters['accepted'] += accepted
+        if self.auto_flush:
+            self._ensure_flusher()
+        return accepted
+
+    def latest(self, driver_id):
+        """Titik terbaru driver di proses ini (POINT_DTYPE) atau None."""
+        track = self._tracks.get(driver_id)
+        return track.latest() if track is not None else None
+
+    # --- Flush (thread latar / management command) ---
+    def flush(self, batch_size=2000):
+        """
+        Sederhanakan & tulis semua titik pending. Return jumlah baris yang ditulis.
+        Jika penulisan gagal, titik yang belum tertulis dikembalikan ke buffer
+        (dicoba lagi flush berikutnya) lalu error diteruskan.
+        """
+        with self._flush_lock:
+            with self._lock:
+                tracks = list(self._tracks.values())
+            rows = []
+            drained = []  # (track, jangkar, pending) yang baris-barisnya belum tertulis
+            positions = {}
+            written = 0
+            try:
+                for track in tracks:
+                    anchor, pending = track.drain()
+                    if pending is None:
+                        continue
+                    drained.append((track, anchor, pending))
+                    track_rows = [
+                        row for row in (
+                            location_row(track.driver_id, point)
+                            for point in simplify(anchor, pending, self.tolerance_m).tolist()
+                        ) if row is not None
+                    ]
+                    if track_rows:
+                        rows.extend(track_rows)
+                        positions[track.driver_id] = track_rows[-1]
+                    if len(rows) >= batch_size:
+                        DriverLocation.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+                        written += len(rows)
+                        rows, drained = [], []
+                if rows:
+                    DriverLocation.objects.bulk_create(rows, batch_size=batch_size, ignore_conflicts=True)
+                    written += len(rows)
+                drained = []
+            except Exception:
+                for track, anchor, pending in drained:
+                    track.restore(anchor, pending)
+                raise
+            finally:
+                with self._lock:
+                    self._counters['written'] += written
+            with self._lock:
+                self._counters['flushes'] += 1
+            if positions:
+                DriverPosition.objects.bulk_create(
+                    [DriverPosition(driver_id=driver_id, recorded_at=row.recorded_at, lat_e6=row.lat_e6, lng_e6=row.lng_e6)
+                     for driver_id, row in positions.items()],
+                    batch_size=batch_size, update_conflicts=True,
+                    unique_fields=['driver'], update_fields=['recorded_at', 'lat_e6', 'lng_e6'],
+                )
+                dispatch_index.move_drivers({
+                    driver_id: (row.lat_e6 / E6, row.lng_e6 / E6) for driver_id, row in positions.items()
+                })
+            return written
+
+    def _ensure_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is None or not self._flusher.is_alive():
+                self._flusher = threading.Thread(target=self._flush_loop, name="gps-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Flush lokasi driver gagal: {e}")
+            finally:
+                close_old_connections()
+
+    def stats(self):
+        with self._lock:
+            tracks = list(self._tracks.values())
+            stats = dict(self._counters)
+        stats["drivers"] = len(tracks)
+        stats["pending"] = sum(track.count for track in tracks)
+        stats["dropped"] = sum(track.dropped for track in tracks)
+        return stats
+
+
+location_buffer = LocationBuffer()
+
+
+@atexit.register
+def _flush_on_exit():
+    if location_buffer._counters['accepted']:
+        try:
+            location_buffer.flush()
+        except Exception as e:
+            logger.error(f"Flush lokasi driver saat shutdown gagal: {e}")
@@ -0,0 +1,118 @@
+# backend/logistics/management/commands/bench_async_views.py
+
+"""
+Benchmark konkurensi: SimulasiHargaView (WSGI, thread pool) vs
+AsyncSimulasiHargaView (ASGI, satu event loop) terhadap stub TomTom lokal
+dengan latency buatan. Memakai database test sementara, data asli tidak disentuh.
+
+Contoh: python manage.py bench_async_views --requests 400 --latency 0.25
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import Client, AsyncClient, override_settings
+from django.test.utils import setup_databases, teardown_databases
+import asyncio
+import os
+import tempfile
+import time
+
+from logistics.models import Fleet, MasterPricingRule
+from logistics.route_cache import route_cache
+from logistics.tomtom import reset_clients
+from logistics.tomtom_stub import start_stub_process
+
+
+class Command(BaseCommand):
+    help = "Bandingkan throughput simulasi harga WSGI vs ASGI dengan upstream TomTom stub."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Jumlah request per skenario")
+        parser.add_argument('--latency', type=float, default=0.2, help="Latency stub TomTom (detik)")
+        parser.add_argument('--wsgi-threads', type=int, default=8, help="Thread per worker WSGI (mis. gunicorn gthread)")
+        parser.add_argument('--concurrency', type=int, default=200, help="Request in-flight maksimal untuk ASGI")
+
+    def handle(self, *args, **options):
+        n = options['requests']
+        db = settings.DATABASES['default']
+        if db['ENGINE'].endswith('sqlite3'):
+            # SQLite in-memory (shared cache) langsung "table is locked" saat ditulis paralel
+            tmpdir = tempfile.mkdtemp()
+            db.setdefault('TEST', {})['NAME'] = os.path.join(tmpdir, 'bench.sqlite3')
+
+        stub, stub_url = start_stub_process(latency=options['latency'])
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(
+                TOMTOM_BASE_URL=stub_url, TOMTOM_API_KEY='bench',
+                TOMTOM_MAX_CONCURRENCY=options['concurrency'], ROUTE_MATCH_RADIUS_M=0,
+                ALLOWED_HOSTS=['*'],
+            ):
+                reset_clients()
+                fleet = self._seed()
+                wsgi = self._run_wsgi(fleet, self._lanes(n, 0), options['wsgi_threads'])
+                asgi = asyncio.run(self._run_asgi(fleet, self._lanes(n, 1), options['concurrency']))
+        finally:
+            reset_clients()
+            stub.terminate()
+            teardown_databases(old_config, verbosity=0)
+
+        self.stdout.write(f"Stub latency {options['latency']}s, {n} request, semua cache miss")
+        for name, (elapsed, ok) in (("WSGI", wsgi), ("ASGI", asgi)):
+            self.stdout.write(
+                f"{name}: {elapsed:.2f}s, {ok}/{n} sukses, {n / elapsed:.1f} req/s"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Speedup ASGI: {wsgi[0] / asgi[0]:.1f}x"))
+
+    def _seed(self):
+        fleet = Fleet.objects.create(name='Bench CDE', fleet_type='ENGKEL', tomtom_travel_mode='truck')
+        MasterPricingRule.objects.create(
+            fleet_type='ENGKEL', base_fare=Decimal('150000'), base_rate_per_km=Decimal('4500'),
+            min_price_lumpsum=Decimal('500000')
+        )
+        return fleet
+
+    def _lanes(self, n, batch):
+        # Lane unik per request agar setiap request benar-benar memanggil upstream
+        return [
+            {
+                "origin_lat": -6.2 + batch * 0.5 + i * 0.001, "origin_lng": 106.8,
+                "dest_lat": -6.9, "dest_lng": 107.6, "fleet_id": None,
+            }
+            for i in range(n)
+        ]
+
+    def _run_wsgi(self, fleet, lanes, threads):
+        route_cache.clear_local()
+        client = Client()
+
+        def call(lane):
+            try:
+                response = client.post('/api/simulasi-harga/', {**lane, "fleet_id": fleet.id},
+                                       content_type='application/json')
+                return response.status_code == 200
+            finally:
+                connections.close_all()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            ok = sum(pool.map(call, lanes))
+        return time.perf_counter() - start, ok
+
+    async def _run_asgi(self, fleet, lanes, concurrency):
+        route_cache.clear_local()
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(lane):
+            async with semaphore:
+                response = await client.post('/api/simulasi-harga/async/', {**lane, "fleet_id": fleet.id},
+                                             content_type='application/json')
+                return response.status_code == 200
+
+        start = time.perf_counter()
+        ok = sum(await asyncio.gather(*(call(lane) for lane in lanes)))
+        return time.perf_counter() - start, ok
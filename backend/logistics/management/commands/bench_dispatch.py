@@ -0,0 +1,124 @@
+# backend/logistics/management/commands/bench_dispatch.py
+
+"""
+Benchmark index dispatch (logistics/dispatch.py) dengan kendaraan sintetis di
+memori (tanpa database): waktu build, latensi query k-terdekat (p50/p95/p99)
+dengan filter jenis & kapasitas, throughput update posisi live, dan
+pembanding brute-force NumPy atas seluruh kendaraan (hasil harus sama).
+
+  python manage.py bench_dispatch --vehicles 50000 --queries 2000 --k 5
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+import time
+
+import numpy as np
+
+from logistics.dispatch import FleetSpec, VehicleGrid
+from logistics.geo import haversine_km_array
+from logistics.models import FLEET_TYPE_CHOICES
+
+# Sebaran kendaraan: kota logistik besar (lat, lng, bobot)
+HUBS = [
+    (-6.20, 106.85, 5), (-6.30, 107.15, 3), (-7.25, 112.75, 3), (-6.92, 107.62, 2),
+    (-6.97, 110.42, 2), (3.59, 98.67, 1), (-5.14, 119.42, 1), (-0.95, 100.35, 1),
+]
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+
+class Command(BaseCommand):
+    help = "Ukur build, query k-terdekat & update live index dispatch untuk puluhan ribu kendaraan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vehicles', type=int, default=50000)
+        parser.add_argument('--queries', type=int, default=2000)
+        parser.add_argument('--k', type=int, default=5)
+        parser.add_argument('--radius', type=float, default=100, help="Radius maksimal (km)")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        n, k, radius = options['vehicles'], options['k'], options['radius']
+        rng = np.random.default_rng(options['seed'])
+
+        fleet_types = [code for code, _ in FLEET_TYPE_CHOICES]
+        fleets = {
+            fid: FleetSpec(fleet_types[fid % len(fleet_types)], weight, volume)
+            for fid, (weight, volume) in enumerate(
+                [(1000, 6), (2500, 9), (2200, 9), (5000, 16), (5500, 24), (8000, 30), (15000, 40), (18000, 55)],
+                start=1,
+            )
+        }
+        weights = np.array([w for *_, w in HUBS], dtype=float)
+        hub = rng.choice(len(HUBS), size=n, p=weights / weights.sum())
+        centers = np.array([(lat, lng) for lat, lng, _ in HUBS])
+        lat = centers[hub, 0] + rng.normal(0, 0.25, n)
+        lng = centers[hub, 1] + rng.normal(0, 0.25, n)
+        fleet_of = rng.integers(1, len(fleets) + 1, n)
+
+        start = time.perf_counter()
+        grid = VehicleGrid(fleets, size_hint=n)
+        for i in range(n):
+            grid.add(i + 1, i + 1, int(fleet_of[i]), float(lat[i]), float(lng[i]), f"B {i} XX")
+        t_build = time.perf_counter() - start
+
+        # Query: titik muat sekitar hub, setengahnya dengan filter jenis / kapasitas
+        q_hub = rng.choice(len(HUBS), size=options['queries'], p=weights / weights.sum())
+        q_lat = centers[q_hub, 0] + rng.normal(0, 0.3, options['queries'])
+        q_lng = centers[q_hub, 1] + rng.normal(0, 0.3, options['queries'])
+        filters = []
+        for _ in range(options['queries']):
+            roll = rng.random()
+            if roll < 0.5:
+                filters.append({})
+            elif roll < 0.75:
+                filters.append({"fleet_type": fleets[int(rng.integers(1, len(fleets) + 1))].fleet_type})
+            else:
+                filters.append({"weight_kg": float(rng.choice([2000, 5000, 10000])), "volume_cbm": 8.0})
+
+        latencies, results = [], []
+        for qlat, qlng, spec in zip(q_lat.tolist(), q_lng.tolist(), filters):
+            start = time.perf_counter()
+            found = grid.nearest(qlat, qlng, k, grid.eligible_fleets(**spec), radius)
+            latencies.append(time.perf_counter() - start)
+            results.append(found)
+
+        # Brute-force: semua kendaraan, mask armada, haversine penuh
+        weight_of = np.array([0] + [fleets[f].weight_kg for f in sorted(fleets)])[fleet_of]
+        brute_latencies = []
+        for (qlat, qlng, spec), found in zip(zip(q_lat.tolist(), q_lng.tolist(), filters), results):
+            start = time.perf_counter()
+            mask = np.isin(fleet_of, grid.eligible_fleets(**spec))
+            distance = haversine_km_array(qlat, qlng, lat[mask], lng[mask])
+            ids = np.flatnonzero(mask)
+            within = distance <= radius
+            order = np.lexsort((weight_of[ids][within], distance[within]))[:k]
+            expected = np.round(distance[within][order], 3).tolist()
+            brute_latencies.append(time.perf_counter() - start)
+            if expected != [c.distance_km for c in found]:
+                raise CommandError(f"Hasil index berbeda dari brute-force di ({qlat}, {qlng}) {spec}")
+
+        # Update posisi live (driver bergerak ~100 m)
+        moves = rng.integers(1, n + 1, 20000)
+        start = time.perf_counter()
+        for driver_id in moves.tolist():
+            i = driver_id - 1
+            grid.move_driver(driver_id, float(lat[i]) + 0.001, float(lng[i]) + 0.001)
+        t_moves = time.perf_counter() - start
+
+        self.stdout.write(f"{n} kendaraan, {len(fleets)} armada, {options['queries']} query k={k} radius {radius:g} km")
+        self.stdout.write(f"Build index      : {t_build:.2f}s ({n / t_build:,.0f} kendaraan/detik)")
+        self.stdout.write(
+            f"Query index      : p50 {percentile_ms(latencies, 50):.3f} ms, p95 {percentile_ms(latencies, 95):.3f} ms, "
+            f"p99 {percentile_ms(latencies, 99):.3f} ms"
+        )
+        self.stdout.write(
+            f"Brute-force NumPy: p50 {percentile_ms(brute_latencies, 50):.3f} ms, "
+            f"p95 {percentile_ms(brute_latencies, 95):.3f} ms"
+        )
+        self.stdout.write(f"Update posisi    : {len(moves) / t_moves:,.0f} update/detik")
+        self.stdout.write(self.style.SUCCESS(
+            f"Hasil identik dengan brute-force; query {np.median(brute_latencies) / np.median(latencies):.0f}x lebih cepat (p50)"
+        ))
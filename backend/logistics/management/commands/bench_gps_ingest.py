@@ -0,0 +1,132 @@
+# backend/logistics/management/commands/bench_gps_ingest.py
+
+"""
+Benchmark pipeline GPS driver (logistics/gps.py) di satu proses, tanpa HTTP:
+decode batch gzip + ring buffer (jalur request), lalu flush Douglas-Peucker +
+bulk_create (thread latar). Track sintetis: truk melaju di jalan berbelok
+dengan noise GPS, sampling 1 Hz, dikirim tiap --interval detik.
+
+Benchmark berjalan di database uji sementara yang dibuat & dihapus seperti test
+runner (create_test_db): database yang dikonfigurasi tidak pernah ditulisi, dan
+checkout yang belum migrate pun bisa menjalankannya. Penulisan tetap dalam
+transaksi yang di-rollback (FK driver fiktif aman: SQLite & PostgreSQL memeriksa
+FK saat commit).
+
+  python manage.py bench_gps_ingest --drivers 5000 --minutes 2 --interval 5
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+import gzip
+import json
+import math
+import time
+
+import numpy as np
+
+from logistics.gps import E6, LocationBuffer, decode_batch, read_body
+
+
+def synthetic_tracks(drivers, seconds, rng):
+    """(t_ms, lat_e6, lng_e6, speed) per driver: arah berubah sesekali, noise ~3 m."""
+    start_ms = int(time.time() * 1000) - seconds * 1000
+    t = start_ms + np.arange(seconds, dtype=np.int64) * 1000
+    tracks = []
+    for _ in range(drivers):
+        heading = rng.uniform(0, 2 * math.pi) + np.cumsum(
+            np.where(rng.random(seconds) < 0.02, rng.normal(0, 1.2, seconds), 0)
+        )
+        speed = np.clip(rng.normal(40, 8, seconds), 0, 90)  # km/j
+        step = speed / 3.6  # meter per detik
+        lat0, lng0 = rng.uniform(-7.5, -6.0), rng.uniform(106.0, 112.0)
+        north = np.cumsum(step * np.cos(heading)) + rng.normal(0, 3, seconds)
+        east = np.cumsum(step * np.sin(heading)) + rng.normal(0, 3, seconds)
+        lat = np.rint((lat0 + north / 110_540) * E6).astype(np.int64)
+        lng = np.rint((lng0 + east / (111_320 * math.cos(math.radians(lat0)))) * E6).astype(np.int64)
+        tracks.append((t, lat, lng, np.rint(speed).astype(np.int64)))
+    return tracks
+
+
+def delta_payload(t, lat, lng, speed):
+    return {
+        "delta": True,
+        "t": np.diff(t, prepend=0).tolist(),
+        "lat": np.diff(lat, prepend=0).tolist(),
+        "lng": np.diff(lng, prepend=0).tolist(),
+        "speed": speed.tolist(),
+    }
+
+
+class Command(BaseCommand):
+    help = "Ukur throughput ingest GPS driver (decode + ring buffer) dan flush (Douglas-Peucker + bulk_create)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drivers', type=int, default=5000)
+        parser.add_argument('--minutes', type=int, default=2, help="Durasi track per driver")
+        parser.add_argument('--interval', type=int, default=5, help="Detik antar kiriman batch per driver")
+        parser.add_argument('--tolerance', type=float, default=10, help="Toleransi Douglas-Peucker (meter)")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        setup_test_environment(debug=False)
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.bench(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def bench(self, options):
+        drivers, interval = options['drivers'], options['interval']
+        seconds = options['minutes'] * 60
+        rng = np.random.default_rng(options['seed'])
+        tracks = synthetic_tracks(drivers, seconds, rng)
+
+        # Body request persis seperti yang dikirim aplikasi driver (urut waktu, antar driver berselang)
+        requests = []
+        for offset in range(0, seconds, interval):
+            for driver_id, (t, lat, lng, speed) in enumerate(tracks, start=1):
+                window = slice(offset, offset + interval)
+                body = gzip.compress(json.dumps(delta_payload(t[window], lat[window], lng[window], speed[window])).encode())
+                requests.append((driver_id, body))
+        raw_bytes = sum(len(json.dumps({
+            "t": t.tolist(), "lat": (lat / E6).tolist(), "lng": (lng / E6).tolist(), "speed": speed.tolist(),
+        })) for t, lat, lng, speed in tracks)
+        wire_bytes = sum(len(body) for _, body in requests)
+
+        buffer = LocationBuffer(auto_flush=False)
+        flush_every = max(1, len(requests) // 4)  # 4 kali flush sepanjang benchmark
+        flushed_rows = 0
+        ingest_time = flush_time = 0.0
+        with transaction.atomic():
+            for i, (driver_id, body) in enumerate(requests, start=1):
+                start = time.perf_counter()
+                buffer.ingest(driver_id, decode_batch(read_body(body, "gzip")))
+                ingest_time += time.perf_counter() - start
+                if i % flush_every == 0 or i == len(requests):
+                    start = time.perf_counter()
+                    flushed_rows += buffer.flush()
+                    flush_time += time.perf_counter() - start
+            transaction.set_rollback(True)
+
+        stats = buffer.stats()
+        points = stats['accepted']
+        self.stdout.write(
+            f"{drivers} driver x {seconds}s @1 Hz, kirim tiap {interval}s: "
+            f"{len(requests)} request, {points} titik"
+        )
+        self.stdout.write(
+            f"Payload: JSON biasa {raw_bytes / 1e6:.1f} MB -> delta + gzip {wire_bytes / 1e6:.1f} MB "
+            f"({raw_bytes / max(wire_bytes, 1):.1f}x lebih kecil)"
+        )
+        self.stdout.write(
+            f"Ingest : {len(requests) / ingest_time:,.0f} request/detik, {points / ingest_time:,.0f} titik/detik "
+            f"(setara {len(requests) / ingest_time * interval:,.0f} driver aktif per proses)"
+        )
+        self.stdout.write(
+            f"Flush  : {flushed_rows} baris ditulis dari {points} titik "
+            f"({points / max(flushed_rows, 1):.1f}x lebih sedikit), {points / flush_time:,.0f} titik/detik"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Dropped: {stats['dropped']}, pending: {stats['pending']}"))
@@ -0,0 +1,177 @@
+# backend/logistics/management/commands/bench_pricing.py
+
+"""
+Micro-benchmark mesin harga: rumus Decimal lama (referensi di bawah, sama
+dengan kode sebelum pricing.py dipakai semua jalur) vs mesin integer
+(skalar & batch). Tidak menyentuh database; armada & rule dibuat di memori.
+Sekaligus memastikan hasil mesin integer identik dengan rumus Decimal yang
+inputnya dibaca eksak (Decimal(str(x))). Rumus lama membaca float apa adanya
+(Decimal(1211.24) = 1211.2399999...), sehingga sesekali meleset Rp 1 saat
+ceil; jumlah selisih itu ikut dilaporkan.
+
+  python manage.py bench_pricing --quotes 50000 --fleets 6
+"""
+
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+import math
+import random
+import time
+
+import numpy as np
+
+from logistics.models import Fleet, MasterPricingRule
+from logistics.pricing import (
+    compile_tariff, order_price, order_prices, quote, quote_matrix, stack_tariffs, units_to_rupiah,
+)
+
+
+# ===========================================================
+# REFERENSI: RUMUS DECIMAL SEBELUM MESIN INTEGER
+# ===========================================================
+
+def _exact(value):
+    return Decimal(str(value))
+
+
+def legacy_simulasi(fleet, rule, distance_km, weight, volume, exact=False):
+    distance = _exact(distance_km) if exact else Decimal(distance_km)
+    final_base_price = max(distance * rule.base_rate_per_km + rule.base_fare, rule.min_price_lumpsum)
+    surcharge_weight = Decimal(0)
+    surcharge_volume = Decimal(0)
+    if weight > fleet.max_weight_kg_limit:
+        over_kg = _exact(weight) - fleet.max_weight_kg_limit if exact else Decimal(weight - fleet.max_weight_kg_limit)
+        surcharge_weight = over_kg * fleet.surcharge_weight_price
+    if volume > fleet.max_volume_cbm_limit:
+        over_cbm = (_exact(volume) - _exact(fleet.max_volume_cbm_limit) if exact
+                    else Decimal(volume - fleet.max_volume_cbm_limit))
+        surcharge_volume = over_cbm * fleet.surcharge_volume_price
+    total_hpp = final_base_price + surcharge_weight + surcharge_volume
+    return {
+        "estimated_price": math.ceil(total_hpp / Decimal("0.8")),
+        "base_price": math.ceil(final_base_price / Decimal("0.8")),
+        "surcharge_weight": math.ceil(surcharge_weight / Decimal("0.8")),
+        "surcharge_volume": math.ceil(surcharge_volume / Decimal("0.8")),
+    }
+
+
+def legacy_order(rule, distance_km, express, corporate, exact=False):
+    distance = _exact(distance_km) if exact else Decimal(distance_km)
+    final_hpp = max(rule.base_fare + distance * rule.base_rate_per_km, rule.min_price_lumpsum)
+    selling_price = final_hpp / (1 - Decimal("0.20"))
+    if express:
+        selling_price *= rule.sla_express_multiplier
+    if corporate:
+        selling_price = selling_price / (1 - Decimal("0.02"))
+    return round(selling_price, -3), final_hpp
+
+
+def _cents(rng, low, high):
+    return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+
+class Command(BaseCommand):
+    help = "Bandingkan quote/detik rumus harga Decimal lama vs mesin integer (skalar & batch)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--quotes', type=int, default=50000, help="Jumlah quote per skenario")
+        parser.add_argument('--fleets', type=int, default=6, help="Jumlah armada (kolom matrix batch)")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        n, m = options['quotes'], options['fleets']
+        rng = random.Random(options['seed'])
+
+        fleets = []
+        for i in range(m):
+            fleet = Fleet(
+                id=i + 1, name=f"BENCH-{i}", max_weight_kg_limit=rng.choice([1000, 2000, 5000, 8000]),
+                max_volume_cbm_limit=rng.choice([3.5, 5.0, 12.0, 24.5]),
+                surcharge_weight_price=_cents(rng, 50, 500), surcharge_volume_price=_cents(rng, 10000, 90000),
+            )
+            rule = MasterPricingRule(
+                base_fare=_cents(rng, 0, 250000), base_rate_per_km=_cents(rng, 2000, 15000),
+                min_price_lumpsum=_cents(rng, 100000, 900000), sla_express_multiplier=rng.choice(
+                    [Decimal('1.25'), Decimal('1.5'), Decimal('1.75')]
+                ),
+            )
+            fleets.append((fleet, rule))
+        tariffs = [compile_tariff(fleet, rule) for fleet, rule in fleets]
+
+        lanes = [
+            (
+                rng.randrange(m),
+                rng.randint(100, 250000) / 100,  # jarak 2 desimal, seperti CachedDistance
+                rng.randint(0, 1000000) / 100,
+                rng.randint(0, 4000) / 100,
+                rng.random() < 0.3,
+                rng.random() < 0.5,
+            )
+            for _ in range(n)
+        ]
+
+        # --- Simulasi: Decimal vs integer skalar ---
+        start = time.perf_counter()
+        legacy = [legacy_simulasi(*fleets[f], d, w, v) for f, d, w, v, _, _ in lanes]
+        t_legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine = [quote(tariffs[f], d, w, v) for f, d, w, v, _, _ in lanes]
+        t_engine = time.perf_counter() - start
+        if engine != [legacy_simulasi(*fleets[f], d, w, v, exact=True) for f, d, w, v, _, _ in lanes]:
+            raise CommandError("Hasil quote simulasi berbeda dari rumus Decimal")
+        float_diffs = sum(a != b for a, b in zip(legacy, engine))
+
+        # --- Simulasi batch: N lane x M armada dalam satu pass ---
+        start = time.perf_counter()
+        matrix = quote_matrix(
+            [d for _, d, _, _, _, _ in lanes], [w for _, _, w, _, _, _ in lanes],
+            [v for _, _, _, v, _, _ in lanes], stack_tariffs(tariffs),
+        )
+        t_matrix = time.perf_counter() - start
+        picked = matrix["estimated_price"][np.arange(n), [f for f, *_ in lanes]]
+        if picked.tolist() != [q["estimated_price"] for q in engine]:
+            raise CommandError("Hasil quote_matrix berbeda dari quote skalar")
+
+        # --- Harga order: Decimal vs integer skalar vs batch ---
+        start = time.perf_counter()
+        legacy_orders = [legacy_order(fleets[f][1], d, e, c) for f, d, _, _, e, c in lanes]
+        t_legacy_order = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine_orders = [order_price(tariffs[f], d, e, c) for f, d, _, _, e, c in lanes]
+        t_engine_order = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch_prices, _ = order_prices(
+            [d for _, d, *_ in lanes], stack_tariffs([tariffs[f] for f, *_ in lanes]),
+            [e for *_, e, _ in lanes], [c for *_, c in lanes],
+        )
+        t_batch_order = time.perf_counter() - start
+
+        exact_orders = [legacy_order(fleets[f][1], d, e, c, exact=True) for f, d, _, _, e, c in lanes]
+        float_diffs += sum(a[0] != b[0] for a, b in zip(legacy_orders, exact_orders))
+        for (price, hpp), (e_price, e_units), b_price in zip(exact_orders, engine_orders, batch_prices.tolist()):
+            if price != e_price or price != b_price:
+                raise CommandError(f"Harga order berbeda: {price} vs {e_price} / {b_price}")
+            if hpp.quantize(Decimal('0.01')) != units_to_rupiah(e_units):
+                raise CommandError(f"HPP order berbeda: {hpp} vs {units_to_rupiah(e_units)}")
+
+        self.stdout.write(
+            f"{n} quote, {m} armada: hasil identik dengan rumus Decimal eksak "
+            f"({float_diffs} hasil rumus lama meleset karena artefak float)"
+        )
+        self.stdout.write(f"{'SKENARIO':<34} {'DETIK':>8} {'QUOTE/DETIK':>12}")
+        rows = [
+            ("simulasi Decimal (lama)", t_legacy, n),
+            ("simulasi integer skalar", t_engine, n),
+            (f"simulasi batch {n}x{m}", t_matrix, n * m),
+            ("order Decimal (lama)", t_legacy_order, n),
+            ("order integer skalar", t_engine_order, n),
+            ("order integer batch", t_batch_order, n),
+        ]
+        for name, elapsed, count in rows:
+            self.stdout.write(f"{name:<34} {elapsed:>8.3f} {count / max(elapsed, 1e-9):>12,.0f}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Skalar: simulasi {t_legacy / t_engine:.1f}x, order {t_legacy_order / t_engine_order:.1f}x lebih cepat"
+        ))
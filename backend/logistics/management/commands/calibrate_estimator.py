@@ -0,0 +1,36 @@
+# backend/logistics/management/commands/calibrate_estimator.py
+
+"""
+Fit ulang faktor circuity estimator jarak dari CachedDistance dan simpan ke
+shared cache (dipakai semua worker). Cocok dijalankan via cron, mis. tiap malam:
+
+  python manage.py calibrate_estimator
+"""
+
+from django.core.management.base import BaseCommand
+import time
+
+from logistics.estimator import estimator
+
+
+class Command(BaseCommand):
+    help = "Kalibrasi ulang estimator jarak offline (haversine x circuity) per region & travel mode."
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        calibration = estimator.recalibrate().calibration
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Rute dipakai: {calibration['rows_used']} dari {calibration['rows_total']} ({elapsed:.2f}s)"
+        )
+        self.stdout.write(f"{'REGION':<12} {'MODE':<6} {'CIRCUITY':>8} {'MNT/KM':>7} {'SAMPEL':>7} {'GALAT':>6}  SUMBER")
+        for r, region in enumerate(calibration['regions']):
+            for m, mode in enumerate(calibration['modes']):
+                error = calibration['mean_abs_error'][r][m]
+                self.stdout.write(
+                    f"{region:<12} {mode:<6} {calibration['circuity'][r][m]:>8.3f} "
+                    f"{calibration['minutes_per_km'][r][m]:>7.3f} {calibration['samples'][r][m]:>7} "
+                    f"{(f'{error:.1%}' if error >= 0 else '-'):>6}  {calibration['source'][r][m]}"
+                )
+        self.stdout.write(self.style.SUCCESS("Kalibrasi tersimpan di shared cache."))
@@ -0,0 +1,44 @@
+# backend/logistics/management/commands/explain_hot_queries.py
+
+"""
+Cek query plan query terpanas (logistics/query_plans.py) terhadap database yang
+dikonfigurasi, mis. setelah migrate di staging. Di CI cek yang sama dijalankan
+oleh tests/test_query_plans.py. Exit code 1 jika ada query yang tidak memakai index.
+
+  python manage.py explain_hot_queries
+  python manage.py explain_hot_queries --verbose   # tampilkan plan lengkap
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from logistics.query_plans import SUPPORTED_VENDORS, check_plans
+
+
+class Command(BaseCommand):
+    help = "Pastikan query terpanas Order & CachedDistance memakai index (SQLite / PostgreSQL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose', action='store_true', help="Tampilkan query plan lengkap")
+
+    def handle(self, *args, **options):
+        if connection.vendor not in SUPPORTED_VENDORS:
+            raise CommandError(f"Database {connection.vendor} belum didukung (hanya SQLite & PostgreSQL)")
+        try:
+            results = check_plans()
+        except LookupError as e:
+            raise CommandError(str(e))
+
+        failed = []
+        for name, index, plan, ok in results:
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(style(f"{'OK  ' if ok else 'GAGAL'} {name:<36} {index}"))
+            if options['verbose'] or not ok:
+                for line in plan.splitlines():
+                    self.stdout.write(f"        {line}")
+            if not ok:
+                failed.append(name)
+
+        if failed:
+            raise CommandError(f"{len(failed)} query tidak memakai index yang diharapkan: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS(f"Semua query memakai index ({connection.vendor})."))
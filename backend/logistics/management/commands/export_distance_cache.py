@@ -0,0 +1,60 @@
+# backend/logistics/management/commands/export_distance_cache.py
+
+"""
+Export CachedDistance secara streaming (memori konstan) ke CSV atau biner kolumnar.
+
+  python manage.py export_distance_cache rute.ldc                # biner (format dari ekstensi)
+  python manage.py export_distance_cache rute.csv.gz --max-age 7 # CSV gzip, hanya rute <= 7 hari
+  python manage.py export_distance_cache - --format csv > rute.csv
+
+Format & angka throughput: lihat logistics/distance_io.py.
+"""
+
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+import time
+
+from logistics.distance_io import BLOCK_ROWS, export_blocks, open_stream, write_binary, write_csv
+from logistics.models import CachedDistance
+
+
+class Command(BaseCommand):
+    help = "Export tabel CachedDistance (streaming) ke CSV atau format biner kolumnar."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="Path file tujuan ('-' = stdout, akhiran .gz = gzip)")
+        parser.add_argument('--format', choices=['csv', 'bin'],
+                            help="Default dari ekstensi: .ldc/.bin = biner, selain itu CSV")
+        parser.add_argument('--max-age', type=float, help="Hanya rute yang di-cache dalam N hari terakhir")
+        parser.add_argument('--mode', choices=['truck', 'car'], help="Hanya rute dengan travel mode ini")
+        parser.add_argument('--block-rows', type=int, default=BLOCK_ROWS, help="Baris per blok / chunk query")
+
+    def handle(self, *args, **options):
+        path = options['output']
+        fmt = options['format'] or ('bin' if path.removesuffix('.gz').endswith(('.ldc', '.bin')) else 'csv')
+        # Saat menulis ke stdout, laporan dikirim ke stderr agar file tidak tercemar
+        log = self.stderr if path == '-' else self.stdout
+
+        queryset = CachedDistance.objects.all()
+        if options['max_age'] is not None:
+            queryset = queryset.filter(cached_at__gte=timezone.now() - timedelta(days=options['max_age']))
+        if options['mode']:
+            queryset = queryset.filter(travel_mode=options['mode'])
+
+        start = time.perf_counter()
+        stream, owned = open_stream(path, 'wb')
+        try:
+            writer = write_binary if fmt == 'bin' else write_csv
+            total = writer(export_blocks(queryset, options['block_rows']), stream)
+        finally:
+            if owned:
+                stream.close()
+            else:
+                stream.flush()
+        elapsed = time.perf_counter() - start
+
+        log.write(self.style.SUCCESS(
+            f"{total} rute diekspor ke {path} ({fmt}) dalam {elapsed:.1f}s "
+            f"({total / max(elapsed, 1e-9):,.0f} baris/detik)"
+        ))
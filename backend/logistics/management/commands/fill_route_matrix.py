@@ -0,0 +1,98 @@
+# backend/logistics/management/commands/fill_route_matrix.py
+
+"""
+Isi CachedDistance massal untuk jaringan hub-and-spoke lewat TomTom Matrix Routing.
+
+  python manage.py fill_route_matrix --depot=-6.1045,106.8863 --destinations tujuan.csv
+  python manage.py fill_route_matrix --depots depo.csv --gazetteer-kind INDUSTRIAL --dry-run
+
+CSV minimal berisi kolom lat,lng (kolom lain diabaikan). Semua pasangan
+depot x tujuan dihitung; uji lokal tanpa kuota: jalankan `manage.py tomtom_stub`
+dan set TOMTOM_BASE_URL ke alamat stub.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import csv
+import time
+
+from logistics.models import GazetteerPlace
+from logistics.routing import fill_route_matrix, matrix_tiles
+
+
+def parse_point(text):
+    try:
+        lat, lng = (float(v) for v in text.split(','))
+    except ValueError:
+        raise CommandError(f"Titik tidak valid: '{text}' (format: lat,lng)")
+    return lat, lng
+
+
+def read_points(path):
+    try:
+        with open(path, newline='', encoding='utf-8') as f:
+            return [(float(row['lat']), float(row['lng'])) for row in csv.DictReader(f)]
+    except FileNotFoundError:
+        raise CommandError(f"File tidak ditemukan: {path}")
+    except (KeyError, ValueError, TypeError) as e:
+        raise CommandError(f"{path}: kolom lat,lng wajib berisi angka ({e})")
+
+
+class Command(BaseCommand):
+    help = "Isi cache jarak untuk semua pasangan depot x tujuan via TomTom Matrix Routing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depot', action='append', default=[], help="Titik depot --depot=lat,lng (boleh berulang)")
+        parser.add_argument('--depots', help="CSV depot (kolom lat,lng)")
+        parser.add_argument('--destination', action='append', default=[], help="Titik tujuan --destination=lat,lng (boleh berulang)")
+        parser.add_argument('--destinations', help="CSV tujuan (kolom lat,lng)")
+        parser.add_argument('--gazetteer-kind', action='append', default=[],
+                            choices=[k for k, _ in GazetteerPlace.KIND_CHOICES],
+                            help="Tambahkan tempat gazetteer jenis ini sebagai tujuan")
+        parser.add_argument('--mode', default='truck', choices=['truck', 'car'])
+        parser.add_argument('--max-cells', type=int, help="Cell per request (default TOMTOM_MATRIX_MAX_CELLS)")
+        parser.add_argument('--concurrency', type=int, default=4, help="Request matrix paralel maksimal")
+        parser.add_argument('--keep-existing', action='store_true', help="Jangan timpa rute yang sudah ada")
+        parser.add_argument('--dry-run', action='store_true', help="Hanya hitung jumlah tile & cell")
+
+    def handle(self, *args, **options):
+        depots = [parse_point(p) for p in options['depot']]
+        if options['depots']:
+            depots += read_points(options['depots'])
+        destinations = [parse_point(p) for p in options['destination']]
+        if options['destinations']:
+            destinations += read_points(options['destinations'])
+        if options['gazetteer_kind']:
+            destinations += list(
+                GazetteerPlace.objects.filter(kind__in=options['gazetteer_kind']).values_list('lat', 'lng')
+            )
+        depots, destinations = list(dict.fromkeys(depots)), list(dict.fromkeys(destinations))
+        if not depots or not destinations:
+            raise CommandError("Minimal satu depot dan satu tujuan")
+
+        max_cells = options['max_cells'] or getattr(settings, 'TOMTOM_MATRIX_MAX_CELLS', 200)
+        tiles = sum(1 for _ in matrix_tiles(len(depots), len(destinations), max_cells))
+        self.stdout.write(
+            f"{len(depots)} depot x {len(destinations)} tujuan = {len(depots) * len(destinations)} cell, "
+            f"{tiles} request matrix (maks {max_cells} cell/request)"
+        )
+        if options['dry_run']:
+            return
+
+        def progress(done, total, stored):
+            if done == total or done % 10 == 0:
+                self.stdout.write(f"  tile {done}/{total}")
+
+        start = time.perf_counter()
+        summary = fill_route_matrix(
+            depots, destinations, travel_mode=options['mode'], max_cells=max_cells,
+            concurrency=options['concurrency'], overwrite=not options['keep_existing'], on_tile=progress,
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f"Tile: {summary['tiles']} ({summary['failed_tiles']} gagal), cell: {summary['cells']}, "
+            f"rute tersimpan: {summary['stored']}, cell gagal: {summary['failed_cells']}"
+        )
+        style = self.style.SUCCESS if not summary['failed_tiles'] else self.style.WARNING
+        self.stdout.write(style(f"Selesai dalam {elapsed:.1f}s ({summary['stored'] / max(elapsed, 1e-9):.0f} rute/detik)"))
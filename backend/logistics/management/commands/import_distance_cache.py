@@ -0,0 +1,81 @@
+# backend/logistics/management/commands/import_distance_cache.py
+
+"""
+Import CachedDistance secara streaming (memori konstan) dari hasil
+export_distance_cache: bulk_create per batch dengan upsert pada kunci
+(origin_lat, origin_lng, dest_lat, dest_lng).
+
+  python manage.py import_distance_cache rute.ldc
+  python manage.py import_distance_cache rute.csv.gz --keep-existing --max-age 14
+  cat rute.csv | python manage.py import_distance_cache -
+
+Format dikenali otomatis dari isi file. Catatan: entry lama di shared cache rute
+(ROUTE_CACHE_ALIAS) tetap dipakai sampai kadaluarsa; flush cache jika perlu
+data hasil import langsung terbaca.
+Format & angka throughput: lihat logistics/distance_io.py.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import reset_queries
+import time
+
+from logistics.distance_io import (
+    BLOCK_ROWS, MAGIC, DistanceFormatError, detect_format, import_blocks, open_stream, read_binary, read_csv,
+)
+
+
+class Command(BaseCommand):
+    help = "Import CachedDistance dari file CSV / biner hasil export_distance_cache (upsert per batch)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Path file sumber ('-' = stdin, akhiran .gz = gzip)")
+        parser.add_argument('--format', choices=['csv', 'bin'], help="Default: deteksi otomatis")
+        parser.add_argument('--keep-existing', action='store_true', help="Jangan timpa rute yang sudah ada")
+        parser.add_argument('--max-age', type=float, help="Lewati rute yang di file berumur lebih dari N hari")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Baris per INSERT")
+        parser.add_argument('--block-rows', type=int, default=BLOCK_ROWS, help="Baris CSV per blok")
+        parser.add_argument('--dry-run', action='store_true', help="Hanya baca & validasi file, tanpa menulis DB")
+
+    def handle(self, *args, **options):
+        path = options['input']
+        try:
+            stream, owned = open_stream(path, 'rb')
+        except FileNotFoundError:
+            raise CommandError(f"File tidak ditemukan: {path}")
+
+        min_cached_at = None
+        if options['max_age'] is not None:
+            min_cached_at = int(time.time() - options['max_age'] * 86400)
+
+        def progress(read, written):
+            reset_queries()  # DEBUG=True menyimpan setiap INSERT di connection.queries
+            if read % 100000 < options['block_rows']:
+                self.stdout.write(f"  {read} baris dibaca, {written} di-upsert")
+
+        start = time.perf_counter()
+        try:
+            fmt = options['format'] or detect_format(stream.peek(len(MAGIC))[:len(MAGIC)])
+            blocks = read_binary(stream) if fmt == 'bin' else read_csv(stream, options['block_rows'])
+            if options['dry_run']:
+                summary = {"read": 0, "written": 0, "skipped": 0}
+                for block in blocks:
+                    summary["read"] += len(block['origin_lat'])
+            else:
+                # Tanpa transaksi pembungkus: tiap bulk_create commit sendiri supaya lock & WAL
+                # tetap kecil, dan import yang terputus bisa diulang (upsert idempoten)
+                summary = import_blocks(
+                    blocks, overwrite=not options['keep_existing'], batch_size=options['batch_size'],
+                    min_cached_at=min_cached_at, on_block=progress,
+                )
+        except DistanceFormatError as e:
+            raise CommandError(f"{path}: {e}")
+        finally:
+            if owned:
+                stream.close()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{fmt}: {summary['read']} baris dibaca, {summary['written']} di-upsert, "
+            f"{summary['skipped']} dilewati dalam {elapsed:.1f}s "
+            f"({summary['read'] / max(elapsed, 1e-9):,.0f} baris/detik)"
+        ))
@@ -0,0 +1,114 @@
+# backend/logistics/management/commands/load_gazetteer.py
+
+"""
+Isi tabel GazetteerPlace untuk autocomplete lokal.
+
+  python manage.py load_gazetteer                      # data bawaan (logistics/data/gazetteer_id.csv)
+  python manage.py load_gazetteer --file tempat.csv    # CSV: name,kind,region,lat,lng[,popularity]
+  python manage.py load_gazetteer --harvest-orders     # + alamat dari Order (yang punya koordinat)
+
+Baris yang sudah ada (name + kind sama) diperbarui, bukan diduplikasi.
+"""
+
+from collections import Counter
+from django.core.management.base import BaseCommand, CommandError
+from pathlib import Path
+import csv
+
+from logistics.gazetteer import bump_version
+from logistics.models import GazetteerPlace, Order
+
+DEFAULT_FILE = Path(__file__).resolve().parents[2] / 'data' / 'gazetteer_id.csv'
+BATCH_SIZE = 2000
+UPDATE_FIELDS = ['region', 'lat', 'lng', 'popularity']
+
+
+class Command(BaseCommand):
+    help = "Muat gazetteer lokal (kota, kabupaten, kawasan industri, pelabuhan, alamat Order)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help=f"CSV sumber (default: {DEFAULT_FILE.name} bawaan)")
+        parser.add_argument('--no-default', action='store_true', help="Jangan muat data bawaan")
+        parser.add_argument('--harvest-orders', action='store_true', help="Ambil alamat asal/tujuan dari Order")
+        parser.add_argument('--clear', action='store_true', help="Kosongkan tabel dulu")
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            GazetteerPlace.objects.all().delete()
+
+        total = 0
+        if options['file'] or not options['no_default']:
+            path = Path(options['file']) if options['file'] else DEFAULT_FILE
+            if not path.exists():
+                raise CommandError(f"File tidak ditemukan: {path}")
+            total += self._upsert(self._read_csv(path))
+            self.stdout.write(f"{path.name}: {total} tempat")
+
+        if options['harvest_orders']:
+            harvested = self._upsert(self._harvest_orders())
+            self.stdout.write(f"Alamat Order: {harvested} tempat")
+            total += harvested
+
+        bump_version()  # bulk_create tidak memicu signal
+        self.stdout.write(self.style.SUCCESS(
+            f"Selesai: {total} baris dimuat, total gazetteer {GazetteerPlace.objects.count()}"
+        ))
+
+    def _read_csv(self, path):
+        kinds = dict(GazetteerPlace.KIND_CHOICES)
+        with open(path, newline='', encoding='utf-8') as f:
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                try:
+                    kind = row['kind'].strip().upper()
+                    if kind not in kinds:
+                        raise ValueError(f"kind '{kind}' tidak dikenal")
+                    yield GazetteerPlace(
+                        name=row['name'].strip(), kind=kind, region=(row.get('region') or '').strip(),
+                        lat=float(row['lat']), lng=float(row['lng']),
+                        popularity=int(row.get('popularity') or 0),
+                    )
+                except (KeyError, ValueError) as e:
+                    raise CommandError(f"{path.name} baris {line}: {e}")
+
+    def _harvest_orders(self):
+        """Satu entry per alamat unik; koordinat dari order terbaru, popularitas = jumlah pemakaian."""
+        usage = Counter()
+        places = {}
+        sides = (('origin_address', 'origin_city', 'origin_lat', 'origin_lng'),
+                 ('dest_address', 'dest_city', 'dest_lat', 'dest_lng'))
+        for address_field, city_field, lat_field, lng_field in sides:
+            rows = (
+                Order.objects.exclude(**{f'{lat_field}__isnull': True})
+                .exclude(**{f'{lng_field}__isnull': True})
+                .order_by('created_at')
+                .values_list(address_field, city_field, lat_field, lng_field)
+            )
+            for address, city, lat, lng in rows.iterator(chunk_size=BATCH_SIZE):
+                name = " ".join((address or '').split())[:255]
+                if len(name) < 3:
+                    continue
+                usage[name] += 1
+                places[name] = (city or '', lat, lng)
+
+        for name, (city, lat, lng) in places.items():
+            yield GazetteerPlace(
+                name=name, kind='ADDRESS', region=city[:150], lat=lat, lng=lng, popularity=usage[name]
+            )
+
+    def _upsert(self, places):
+        count = 0
+        batch = []
+        for place in places:
+            batch.append(place)
+            if len(batch) >= BATCH_SIZE:
+                count += self._flush(batch)
+                batch = []
+        if batch:
+            count += self._flush(batch)
+        return count
+
+    def _flush(self, batch):
+        GazetteerPlace.objects.bulk_create(
+            batch, update_conflicts=True, unique_fields=['name', 'kind'], update_fields=UPDATE_FIELDS
+        )
+        return len(batch)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from logistics.tomtom_stub import make_stub_server
+
+
+class Command(BaseCommand):
+    help = "Jalankan stub server TomTom lokal (routing & search) untuk development/benchmark."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.0, help="Delay per request (detik)")
+        parser.add_argument('--failure-rate', type=float, default=0.0, help="Peluang balas HTTP 503 (0-1)")
+
+    def handle(self, *args, **options):
+        server = make_stub_server(
+            options['host'], options['port'],
+            latency=options['latency'], failure_rate=options['failure_rate']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Stub TomTom aktif di {server.base_url} (Ctrl+C untuk berhenti)"))
+        self.stdout.write(f"Set TOMTOM_BASE_URL={server.base_url} untuk memakainya.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Total request: {server.state.requests}")
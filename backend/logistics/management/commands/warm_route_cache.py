@@ -0,0 +1,102 @@
+# backend/logistics/management/commands/warm_route_cache.py
+
+"""
+Panaskan cache jarak untuk lane tersibuk setelah deploy / cache di-flush:
+lane diambil dari histori Order, lalu lane yang belum ada atau hampir
+kadaluarsa di CachedDistance di-fetch ulang ke TomTom (paralel terbatas,
+dalam batas kuota harian ROUTE_WARM_DAILY_BUDGET).
+
+  python manage.py warm_route_cache --days 90 --top 500
+  python manage.py warm_route_cache --dry-run
+
+Contoh cron (tiap malam 02:30):
+  30 2 * * * cd /app/backend && python manage.py warm_route_cache --top 1000
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+import time
+
+from logistics.route_cache import route_cache
+from logistics.routing import (
+    lanes_needing_refresh, release_warm_budget, reserve_warm_budget, top_order_lanes, warm_routes,
+)
+
+LOCK_KEY = "lock:warm_route_cache"
+
+
+class Command(BaseCommand):
+    help = "Isi / refresh CachedDistance untuk lane Order tersibuk (paralel terbatas, dalam kuota harian)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help="Histori Order yang dianalisis (hari)")
+        parser.add_argument('--top', type=int, default=500, help="Jumlah lane tersibuk yang dipertimbangkan")
+        parser.add_argument('--min-orders', type=int, default=2, help="Minimal order per lane")
+        parser.add_argument('--mode', default='truck', choices=['truck', 'car'])
+        parser.add_argument('--budget', type=int, help="Maks panggilan TomTom run ini (tetap dibatasi kuota harian)")
+        parser.add_argument('--concurrency', type=int, help="Request paralel maksimal (default TOMTOM_MAX_CONCURRENCY)")
+        parser.add_argument('--refresh-before', type=int,
+                            help="Refresh lane yang kadaluarsa dalam N detik (default ROUTE_WARM_REFRESH_BEFORE)")
+        parser.add_argument('--dry-run', action='store_true', help="Hanya tampilkan lane yang akan di-fetch")
+
+    def handle(self, *args, **options):
+        lock_cache = caches[getattr(settings, 'ROUTE_CACHE_ALIAS', 'default')]
+        if not options['dry_run'] and not lock_cache.add(LOCK_KEY, 1, timeout=3600):
+            raise CommandError("warm_route_cache lain masih berjalan")
+        try:
+            self._warm(options)
+        finally:
+            if not options['dry_run']:
+                lock_cache.delete(LOCK_KEY)
+
+    def _warm(self, options):
+        lanes = top_order_lanes(options['days'], options['top'], options['min_orders'])
+        refresh_before = options['refresh_before']
+        if refresh_before is None:
+            refresh_before = getattr(settings, 'ROUTE_WARM_REFRESH_BEFORE', 24 * 3600)
+        refresh_before = min(refresh_before, route_cache.ttl)
+        todo = lanes_needing_refresh([key for key, _ in lanes], refresh_before)
+        orders = dict(lanes)
+
+        self.stdout.write(
+            f"{len(lanes)} lane tersibuk ({sum(orders.values())} order, {options['days']} hari), "
+            f"{len(todo)} perlu di-fetch / refresh"
+        )
+        if options['dry_run']:
+            for key in todo[:20]:
+                self.stdout.write(f"  {orders[key]:>5} order  {key[0]},{key[1]} -> {key[2]},{key[3]}")
+            if len(todo) > 20:
+                self.stdout.write(f"  ... {len(todo) - 20} lane lainnya")
+            return
+        if not todo:
+            self.stdout.write(self.style.SUCCESS("Semua lane tersibuk sudah hangat."))
+            return
+
+        wanted = len(todo) if options['budget'] is None else min(len(todo), max(0, options['budget']))
+        granted = reserve_warm_budget(wanted, getattr(settings, 'ROUTE_WARM_DAILY_BUDGET', 1000))
+        if granted < len(todo):
+            self.stdout.write(self.style.WARNING(
+                f"Kuota: hanya {granted} dari {len(todo)} lane (lane tersibuk didahulukan)"
+            ))
+        if not granted:
+            return
+
+        def progress(done, total, stored):
+            if done == total or done % 50 == 0:
+                self.stdout.write(f"  {done}/{total} lane, {stored} tersimpan")
+
+        start = time.perf_counter()
+        summary = warm_routes(
+            {key: options['mode'] for key in todo[:granted]},
+            concurrency=options['concurrency'], on_progress=progress,
+        )
+        elapsed = time.perf_counter() - start
+        release_warm_budget(granted - summary['called'])
+
+        self.stdout.write(
+            f"Panggilan TomTom: {summary['called']}, tersimpan: {summary['stored']}, "
+            f"gagal: {summary['failed']}, dilewati (circuit terbuka): {summary['skipped']}"
+        )
+        style = self.style.SUCCESS if not (summary['failed'] or summary['skipped']) else self.style.WARNING
+        self.stdout.write(style(f"Selesai dalam {elapsed:.1f}s"))
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:17
+
+import math
+
+from django.db import migrations, models
+
+CELL_DEG = 0.01  # Salinan logistics.geo.CELL_DEG saat migrasi ini dibuat
+
+
+def grid_cell(lat, lng):
+    return f"{math.floor(float(lat) / CELL_DEG)}:{math.floor(float(lng) / CELL_DEG)}"
+
+
+def backfill_cells(apps, schema_editor):
+    CachedDistance = apps.get_model("logistics", "CachedDistance")
+    batch = []
+    for row in CachedDistance.objects.only(
+        "origin_lat", "origin_lng", "dest_lat", "dest_lng"
+    ).iterator(chunk_size=2000):
+        row.origin_cell = grid_cell(row.origin_lat, row.origin_lng)
+        row.dest_cell = grid_cell(row.dest_lat, row.dest_lng)
+        batch.append(row)
+        if len(batch) >= 2000:
+            CachedDistance.objects.bulk_update(batch, ["origin_cell", "dest_cell"])
+            batch = []
+    if batch:
+        CachedDistance.objects.bulk_update(batch, ["origin_cell", "dest_cell"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cacheddistance",
+            name="dest_cell",
+            field=models.CharField(blank=True, default="", max_length=20),
+        ),
+        migrations.AddField(
+            model_name="cacheddistance",
+            name="origin_cell",
+            field=models.CharField(blank=True, default="", max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name="cacheddistance",
+            index=models.Index(
+                fields=["origin_cell", "dest_cell"], name="cacheddist_cells_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_cells, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0002_cacheddistance_grid_cells"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GazetteerPlace",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("CITY", "Kota"),
+                            ("REGENCY", "Kabupaten"),
+                            ("INDUSTRIAL", "Kawasan Industri"),
+                            ("PORT", "Pelabuhan"),
+                            ("ADDRESS", "Alamat Order"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "region",
+                    models.CharField(
+                        blank=True,
+                        help_text="Kab/Kota & Provinsi, mis. 'Bekasi, Jawa Barat'",
+                        max_length=150,
+                    ),
+                ),
+                ("lat", models.FloatField()),
+                ("lng", models.FloatField()),
+                (
+                    "popularity",
+                    models.IntegerField(
+                        default=0, help_text="Bobot ranking (mis. jumlah order)"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "6. Gazetteer (Autocomplete Lokal)",
+                "unique_together": {("name", "kind")},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.2 on 2026-10-18 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0003_gazetteerplace"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cacheddistance",
+            name="travel_mode",
+            field=models.CharField(blank=True, default="", max_length=10),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.2 on 2026-10-18 13:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0004_cacheddistance_travel_mode"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["customer", "-created_at", "-id"],
+                name="order_customer_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0.2 on 2026-10-18 13:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0005_order_updated_at_customer_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="cacheddistance",
+            name="cacheddist_cells_idx",
+        ),
+        migrations.AddIndex(
+            model_name="cacheddistance",
+            index=models.Index(
+                fields=["origin_cell", "dest_cell", "cached_at"],
+                name="cacheddist_cells_fresh_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="cacheddistance",
+            index=models.Index(fields=["cached_at"], name="cacheddist_cached_at_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "-created_at"], name="order_status_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(
+                    (
+                        "status__in",
+                        (
+                            "PENDING",
+                            "SEARCHING_DRIVER",
+                            "DRIVER_ASSIGNED",
+                            "ARRIVED_PICKUP",
+                            "IN_TRANSIT",
+                            "ARRIVED_DROP",
+                        ),
+                    )
+                ),
+                fields=["created_at"],
+                name="order_open_queue_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["driver", "status"], name="order_driver_status_idx"
+            ),
+        ),
+    ]
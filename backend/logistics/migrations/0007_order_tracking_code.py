@@ -0,0 +1,59 @@
+# Generated by Django 5.0.2 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+# Salinan logistics.models.TRACKING_CODE_LENGTHS saat migrasi ini dibuat
+TRACKING_CODE_LENGTHS = (8, 12, 16, 32)
+
+
+def backfill_tracking_codes(apps, schema_editor):
+    # Order terlama didahulukan agar resi "ORD-xxxxxxxx" yang sudah beredar tetap valid
+    Order = apps.get_model("logistics", "Order")
+    used = set()
+    batch = []
+    for order in (
+        Order.objects.order_by("created_at", "id").only("id").iterator(chunk_size=2000)
+    ):
+        hex_id = order.id.hex
+        candidates = [hex_id[:length] for length in TRACKING_CODE_LENGTHS]
+        order.tracking_code = next(
+            (code for code in candidates if code not in used), candidates[-1]
+        )
+        used.add(order.tracking_code)
+        batch.append(order)
+        if len(batch) >= 2000:
+            Order.objects.bulk_update(batch, ["tracking_code"])
+            batch = []
+    if batch:
+        Order.objects.bulk_update(batch, ["tracking_code"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0006_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="tracking_code",
+            field=models.CharField(
+                editable=False,
+                help_text="Kode resi publik",
+                max_length=32,
+                null=True,
+            ),
+        ),
+        migrations.RunPython(backfill_tracking_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="order",
+            name="tracking_code",
+            field=models.CharField(
+                editable=False,
+                help_text="Kode resi publik",
+                max_length=32,
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.2 on 2026-10-18 13:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0007_order_tracking_code"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DriverLocation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("recorded_at", models.DateTimeField()),
+                ("lat_e6", models.IntegerField()),
+                ("lng_e6", models.IntegerField()),
+                ("speed_kmh", models.SmallIntegerField(blank=True, null=True)),
+                (
+                    "heading",
+                    models.SmallIntegerField(
+                        blank=True, help_text="Derajat dari utara (0-359)", null=True
+                    ),
+                ),
+                (
+                    "driver",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="locations",
+                        to="logistics.mitraarmada",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "7. Lokasi Driver (GPS)",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="driverlocation",
+            constraint=models.UniqueConstraint(
+                fields=("driver", "recorded_at"), name="driverloc_driver_time_uniq"
+            ),
+        ),
+    ]
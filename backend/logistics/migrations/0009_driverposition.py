@@ -0,0 +1,35 @@
+# Generated by Django 5.0.2 on 2026-10-18 13:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0008_driverlocation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DriverPosition",
+            fields=[
+                (
+                    "driver",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="position",
+                        serialize=False,
+                        to="logistics.mitraarmada",
+                    ),
+                ),
+                ("recorded_at", models.DateTimeField(db_index=True)),
+                ("lat_e6", models.IntegerField()),
+                ("lng_e6", models.IntegerField()),
+            ],
+            options={
+                "verbose_name_plural": "7. Posisi Terakhir Driver",
+            },
+        ),
+    ]
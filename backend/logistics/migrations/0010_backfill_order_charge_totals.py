@@ -0,0 +1,47 @@
+# Generated by Django 5.0.2 on 2026-10-18 14:30
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+# Salinan logistics.models.ORDER_CHARGE_TOTALS saat migrasi ini dibuat
+ORDER_CHARGE_TOTALS = {"REIMBURSEMENT": "reimbursement_total", "ADDON": "addons_price"}
+
+
+def backfill_charge_totals(apps, schema_editor):
+    # Total lama tidak pernah disinkronkan: hitung ulang dari charge terverifikasi,
+    # setelah itu dijaga inkremental oleh OrderCharge.save / apply_charge_totals
+    Order = apps.get_model("logistics", "Order")
+    OrderCharge = apps.get_model("logistics", "OrderCharge")
+    zero = models.Value(
+        Decimal(0), output_field=models.DecimalField(max_digits=12, decimal_places=2)
+    )
+    totals = {}
+    for category, field in ORDER_CHARGE_TOTALS.items():
+        subtotal = (
+            OrderCharge.objects.filter(
+                order=models.OuterRef("pk"), category=category, is_verified=True
+            )
+            .values("order")
+            .annotate(total=models.Sum("amount"))
+            .values("total")
+        )
+        totals[field] = Coalesce(models.Subquery(subtotal), zero)
+    Order.objects.update(**totals)
+    Order.objects.update(
+        final_total_price=models.F("base_price")
+        + models.F("addons_price")
+        + models.F("reimbursement_total")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("logistics", "0009_driverposition"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_charge_totals, migrations.RunPython.noop),
+    ]
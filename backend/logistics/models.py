@@ -1,11 +1,14 @@
 # backend/logistics/models.py (KOREKSI FINAL CUSTOMER & CACHE)
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
 from django.contrib.auth.models import User
 from django.utils import timezone
 from decimal import Decimal 
 import uuid 
 
+from .geo import grid_cell
+
 # =================================================================
 # 1. KONFIGURASI & PILIHAN
 # =================================================================
@@ -188,7 +191,51 @@ class ArmadaKendaraan(models.Model):
     class Meta: verbose_name_plural = "2. Aset Kendaraan Mitra"
     def __str__(self): return f"{self.nopol} - {self.mitra.full_name_ktp}"
 
+# Status order yang masih berjalan (belum selesai / batal): target index parsial
+ORDER_OPEN_STATUSES = (
+    'PENDING', 'SEARCHING_DRIVER', 'DRIVER_ASSIGNED', 'ARRIVED_PICKUP', 'IN_TRANSIT', 'ARRIVED_DROP',
+)
+
+# State machine status order: status asal -> status tujuan yang sah (logic di order_lifecycle.py)
+ORDER_TRANSITIONS = {
+    'PENDING': ('SEARCHING_DRIVER', 'DRIVER_ASSIGNED', 'CANCELLED'),
+    'SEARCHING_DRIVER': ('DRIVER_ASSIGNED', 'CANCELLED'),
+    'DRIVER_ASSIGNED': ('ARRIVED_PICKUP', 'SEARCHING_DRIVER', 'CANCELLED'),  # SEARCHING_DRIVER: driver batal jalan
+    'ARRIVED_PICKUP': ('IN_TRANSIT', 'CANCELLED'),
+    'IN_TRANSIT': ('ARRIVED_DROP',),
+    'ARRIVED_DROP': ('DELIVERED',),
+    'DELIVERED': ('COMPLETED',),
+    'COMPLETED': (),
+    'CANCELLED': (),
+}
+
+# Kolom waktu yang diisi saat order MASUK ke status tersebut
+ORDER_STATUS_TIMESTAMPS = {
+    'DRIVER_ASSIGNED': 'driver_assigned_at',
+    'ARRIVED_PICKUP': 'arrived_pickup_at',
+    'IN_TRANSIT': 'loaded_at',
+    'ARRIVED_DROP': 'arrived_drop_at',
+    'COMPLETED': 'completed_at',
+}
+
+# Komponen final_total_price: disimpan ulang hanya jika salah satunya ikut di update_fields
+ORDER_PRICE_FIELDS = frozenset({'base_price', 'addons_price', 'reimbursement_total'})
+
+# Kolom total di Order per kategori OrderCharge; hanya diubah lewat F() oleh apply_charge_totals()
+ORDER_CHARGE_TOTALS = {'REIMBURSEMENT': 'reimbursement_total', 'ADDON': 'addons_price'}
+
+# Kode resi = prefix hex UUID order (8 karakter, sama dengan "ORD-xxxxxxxx" di resi lama);
+# diperpanjang hanya jika prefix itu sudah dipakai order lain.
+TRACKING_CODE_LENGTHS = (8, 12, 16, 32)
+
+
+def tracking_code_candidates(order_id):
+    hex_id = order_id.hex
+    return [hex_id[:length] for length in TRACKING_CODE_LENGTHS]
+
+
 class Order(models.Model):
+    OPEN_STATUSES = ORDER_OPEN_STATUSES
     STATUS_CHOICES = [
         ('PENDING', 'Menunggu Konfirmasi'),
         ('SEARCHING_DRIVER', 'Mencari Driver'),
@@ -203,6 +250,7 @@ class Order(models.Model):
     SERVICE_TYPE_CHOICES = [('STANDARD', 'Standard'), ('EXPRESS', 'Express')]
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tracking_code = models.CharField(max_length=32, unique=True, editable=False, help_text="Kode resi publik")
     customer = models.ForeignKey(User, on_delete=models.PROTECT, related_name='orders')
     driver = models.ForeignKey(MitraArmada, on_delete=models.SET_NULL, null=True, blank=True)
     vehicle = models.ForeignKey(ArmadaKendaraan, on_delete=models.SET_NULL, null=True, blank=True)
@@ -236,6 +284,7 @@ class Order(models.Model):
     cancellation_reason = models.TextField(blank=True, null=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     driver_assigned_at = models.DateTimeField(null=True, blank=True)
     arrived_pickup_at = models.DateTimeField(null=True, blank=True)
     loaded_at = models.DateTimeField(null=True, blank=True)
@@ -245,12 +294,79 @@ class Order(models.Model):
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = "3. Transaksi Order (Logistik)"
+        indexes = [
+            # Daftar order customer (cursor pagination created_at, id) tanpa sort di memori
+            models.Index(fields=['customer', '-created_at', '-id'], name='order_customer_created_idx'),
+            # Filter status di admin / laporan, urut terbaru
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            # Antrian order berjalan (dispatch, monitoring), hanya memuat baris status terbuka
+            models.Index(fields=['created_at'], name='order_open_queue_idx',
+                         condition=models.Q(status__in=ORDER_OPEN_STATUSES)),
+            # Job aktif per driver (sengaja bukan index parsial: SQLite tidak memakai index
+            # parsial jika daftar status dikirim sebagai parameter)
+            models.Index(fields=['driver', 'status'], name='order_driver_status_idx'),
+        ]
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        order = super().from_db(db, field_names, values)
+        order._loaded_status = order.__dict__.get('status')  # Pembanding status_changed (None jika di-defer)
+        return order
+
+    @property
+    def status_changed(self):
+        """True jika status berbeda dari yang terakhir dibaca / disimpan ke DB."""
+        return self.status != getattr(self, '_loaded_status', None)
+
     def save(self, *args, **kwargs):
-        self.final_total_price = self.base_price + self.addons_price + self.reimbursement_total
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and self.status_changed:
+            # Status diubah manual (admin / form): stempel waktu tetap konsisten dengan state machine
+            stamp = ORDER_STATUS_TIMESTAMPS.get(self.status)
+            if stamp:
+                setattr(self, stamp, timezone.now())
+        if not self.tracking_code:
+            Order.assign_tracking_codes([self])
+
+        inserting = self._state.adding or kwargs.get('force_insert')
+        if update_fields is None and not inserting:
+            # Update penuh: total charge milik apply_charge_totals(), nilai di memori bisa sudah basi
+            update_fields = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ORDER_CHARGE_TOTALS.values()
+            ]
+            kwargs['update_fields'] = update_fields
+        recompute = update_fields is None or ORDER_PRICE_FIELDS.intersection(update_fields)
+        if recompute and inserting:
+            self.final_total_price = self.base_price + self.addons_price + self.reimbursement_total
+        elif recompute:
+            # Dihitung di UPDATE: komponen yang tidak ditulis diambil dari baris DB, bukan dari memori
+            self.final_total_price = sum(
+                (Value(getattr(self, name)) if name in update_fields else F(name) for name in sorted(ORDER_PRICE_FIELDS)),
+                start=Value(Decimal(0)),
+            )
+            kwargs['update_fields'] = {*update_fields, 'final_total_price'}
         super().save(*args, **kwargs)
-
-    def __str__(self): return f"ORD-{str(self.id)[:8]} | {self.origin_city} -> {self.dest_city}"
+        if recompute and not inserting:
+            self.refresh_from_db(fields=['final_total_price', *ORDER_CHARGE_TOTALS.values()])
+
+    @classmethod
+    def assign_tracking_codes(cls, orders):
+        """Isi kode resi terpendek yang belum dipakai. Wajib dipanggil manual sebelum bulk_create."""
+        candidates = {order.pk: tracking_code_candidates(order.id) for order in orders}
+        wanted = [code for codes in candidates.values() for code in codes]
+        used = set()
+        for start in range(0, len(wanted), 900):  # Batas parameter per query SQLite
+            used.update(cls.objects.filter(
+                tracking_code__in=wanted[start:start + 900]
+            ).values_list('tracking_code', flat=True))
+        for order in orders:
+            codes = candidates[order.pk]
+            order.tracking_code = next((code for code in codes if code not in used), codes[-1])
+            used.add(order.tracking_code)
+        return orders
+
+    def __str__(self): return f"ORD-{self.tracking_code} | {self.origin_city} -> {self.dest_city}"
 
 class OrderCharge(models.Model):
     CHARGE_CATEGORY = [('REIMBURSEMENT', 'Reimbursement (Tol/Parkir)'), ('ADDON', 'Addon (Jasa)')]
@@ -265,6 +381,46 @@ class OrderCharge(models.Model):
     class Meta: verbose_name_plural = "4. Biaya Tambahan (Charges)"
     def __str__(self): return f"{self.charge_name} - Rp {self.amount}"
 
+    TOTAL_FIELDS = ('order_id', 'category', 'amount', 'is_verified')  # Penentu kontribusi ke total Order
+
+    def total_share(self):
+        return tuple(getattr(self, name) for name in self.TOTAL_FIELDS)
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            before = None
+            if not self._state.adding:
+                # Kunci baris & baca kontribusi lama dari DB: dua verifikasi bersamaan tidak dihitung dua kali
+                before = OrderCharge.objects.select_for_update().filter(pk=self.pk).values_list(
+                    *self.TOTAL_FIELDS).first()
+            super().save(*args, **kwargs)
+            apply_charge_totals(before, self.total_share())
+
+
+def apply_charge_totals(before, after):
+    """
+    Geser total Order (reimbursement_total / addons_price / final_total_price) dari
+    kontribusi charge `before` ke `after` (tuple OrderCharge.TOTAL_FIELDS atau None).
+    Hanya charge terverifikasi yang dihitung. UPDATE ... SET x = x + delta (F()),
+    tanpa baca-ubah-tulis, jadi aman untuk upload charge bersamaan.
+    """
+    deltas = {}  # order_id -> {kolom: selisih}
+    for share, sign in ((before, -1), (after, 1)):
+        if share is None:
+            continue
+        order_id, category, amount, is_verified = share
+        field = ORDER_CHARGE_TOTALS.get(category)
+        if is_verified and field:
+            fields = deltas.setdefault(order_id, {})
+            fields[field] = fields.get(field, Decimal(0)) + sign * Decimal(str(amount))
+    for order_id, fields in deltas.items():
+        fields = {field: delta for field, delta in fields.items() if delta}
+        if fields:
+            Order.objects.filter(pk=order_id).update(
+                final_total_price=F('final_total_price') + sum(fields.values()),
+                **{field: F(field) + delta for field, delta in fields.items()},
+            )
+
 class Promo(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
@@ -294,9 +450,121 @@ class CachedDistance(models.Model):
     toll_fee_idr = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     cached_at = models.DateTimeField(auto_now_add=True)
 
+    # Index spasial (grid ~1 km) untuk mencocokkan rute dengan titik yang berdekatan
+    origin_cell = models.CharField(max_length=20, blank=True, default='')
+    dest_cell = models.CharField(max_length=20, blank=True, default='')
+
+    # Mode TomTom yang menghasilkan baris ini ('' = data lama, tidak diketahui).
+    # Bukan bagian kunci cache; dipakai untuk kalibrasi estimator per mode.
+    travel_mode = models.CharField(max_length=10, blank=True, default='')
+
     class Meta:
         unique_together = ('origin_lat', 'origin_lng', 'dest_lat', 'dest_lng')
+        indexes = [
+            # Pencocokan rute terdekat: cell asal/tujuan + batas umur TTL dalam satu index
+            models.Index(fields=['origin_cell', 'dest_cell', 'cached_at'], name='cacheddist_cells_fresh_idx'),
+            # Scan rute kadaluarsa (warm_route_cache, export --max-age)
+            models.Index(fields=['cached_at'], name='cacheddist_cached_at_idx'),
+        ]
         verbose_name = "Cached Distance"
 
+    def save(self, *args, **kwargs):
+        self.fill_cells()
+        super().save(*args, **kwargs)
+
+    def fill_cells(self):
+        """Isi origin_cell/dest_cell. Wajib dipanggil manual sebelum bulk_create."""
+        self.origin_cell = grid_cell(self.origin_lat, self.origin_lng)
+        self.dest_cell = grid_cell(self.dest_lat, self.dest_lng)
+        return self
+
     def __str__(self):
         return f"Rute {self.distance_km}km"
+
+
+# =================================================================
+# 7. GAZETTEER LOKAL (AUTOCOMPLETE OFFLINE)
+# =================================================================
+
+class GazetteerPlace(models.Model):
+    """
+    Daftar tempat untuk autocomplete tanpa TomTom: kota, kabupaten, kawasan
+    industri, pelabuhan, dan alamat yang pernah dipakai di Order.
+    Diisi lewat `python manage.py load_gazetteer`.
+    """
+    KIND_CHOICES = [
+        ('CITY', 'Kota'),
+        ('REGENCY', 'Kabupaten'),
+        ('INDUSTRIAL', 'Kawasan Industri'),
+        ('PORT', 'Pelabuhan'),
+        ('ADDRESS', 'Alamat Order'),
+    ]
+
+    name = models.CharField(max_length=255)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    region = models.CharField(max_length=150, blank=True, help_text="Kab/Kota & Provinsi, mis. 'Bekasi, Jawa Barat'")
+    lat = models.FloatField()
+    lng = models.FloatField()
+    popularity = models.IntegerField(default=0, help_text="Bobot ranking (mis. jumlah order)")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('name', 'kind')
+        verbose_name_plural = "6. Gazetteer (Autocomplete Lokal)"
+
+    @property
+    def label(self):
+        return f"{self.name}, {self.region}" if self.region else self.name
+
+    def __str__(self):
+        return f"{self.label} ({self.get_kind_display()})"
+
+
+# =================================================================
+# 8. LOKASI DRIVER (TIME-SERIES GPS)
+# =================================================================
+
+class DriverLocation(models.Model):
+    """
+    Titik GPS driver setelah disederhanakan (Douglas-Peucker, lihat gps.py).
+    Kolom integer agar ringkas: koordinat dalam mikroderajat (x 1e6, ~11 cm).
+    Diisi lewat bulk_create oleh flush buffer, bukan per request.
+    """
+    driver = models.ForeignKey(MitraArmada, on_delete=models.CASCADE, related_name='locations', db_index=False)
+    recorded_at = models.DateTimeField()
+    lat_e6 = models.IntegerField()
+    lng_e6 = models.IntegerField()
+    speed_kmh = models.SmallIntegerField(null=True, blank=True)
+    heading = models.SmallIntegerField(null=True, blank=True, help_text="Derajat dari utara (0-359)")
+
+    class Meta:
+        constraints = [
+            # Juga index utama query track per driver; batch yang dikirim ulang tidak menggandakan titik
+            models.UniqueConstraint(fields=['driver', 'recorded_at'], name='driverloc_driver_time_uniq'),
+        ]
+        verbose_name_plural = "7. Lokasi Driver (GPS)"
+
+    @property
+    def lat(self):
+        return self.lat_e6 / 1e6
+
+    @property
+    def lng(self):
+        return self.lng_e6 / 1e6
+
+    def __str__(self):
+        return f"{self.driver_id} @ {self.recorded_at:%Y-%m-%d %H:%M:%S} ({self.lat:.6f}, {self.lng:.6f})"
+
+
+class DriverPosition(models.Model):
+    """Posisi terakhir driver (1 baris per driver), di-upsert tiap flush GPS. Sumber index dispatch."""
+    driver = models.OneToOneField(MitraArmada, on_delete=models.CASCADE, primary_key=True, related_name='position')
+    recorded_at = models.DateTimeField(db_index=True)
+    lat_e6 = models.IntegerField()
+    lng_e6 = models.IntegerField()
+
+    class Meta:
+        verbose_name_plural = "7. Posisi Terakhir Driver"
+
+    def __str__(self):
+        return f"{self.driver_id} @ {self.recorded_at:%Y-%m-%d %H:%M:%S} ({self.lat_e6 / 1e6:.6f}, {self.lng_e6 / 1e6:.6f})"
@@ -0,0 +1,200 @@
+# backend/logistics/order_events.py
+
+"""
+Event perubahan status Order untuk push ke klien (SSE di async_views.py,
+WebSocket di websocket.py), pengganti polling PublicTrackingView / OrderViewSet.
+
+- Topik: "order:<tracking_code>" (publik, per resi) dan "customer:<user_id>"
+  (semua order milik satu customer).
+- InProcessBroker (default): subscriber = asyncio.Queue kecil di event loop
+  worker ASGI; publish boleh dari thread mana pun (call_soon_threadsafe).
+  Subscriber yang diam hanya memakan 1 queue + 1 entry dict: tanpa query DB,
+  tanpa polling. Cukup untuk 1 worker ASGI.
+- RedisBroker: publish ke Redis pub/sub, tiap worker punya SATU koneksi
+  listener yang membagikan event ke subscriber lokalnya, jadi event dari worker
+  mana pun (termasuk worker WSGI / management command) sampai ke semua klien.
+- Broker lain: turunan InProcessBroker yang mengganti publish() & start(),
+  lalu set ORDER_EVENTS_BROKER ke dotted path kelasnya.
+"""
+
+from contextlib import asynccontextmanager
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+import asyncio
+import json
+import logging
+import threading
+
+try:
+    import redis  # Hanya dibutuhkan oleh RedisBroker
+    import redis.asyncio
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BROKER = 'logistics.order_events.InProcessBroker'
+CHANNEL_PREFIX = "logistics:events:"
+
+
+def tracking_topic(tracking_code):
+    return f"order:{tracking_code}"
+
+
+def customer_topic(user_id):
+    return f"customer:{user_id}"
+
+
+def order_event(order):
+    return {
+        "order_id": str(order.id),
+        "tracking_code": order.tracking_code,
+        "status": order.status,
+        "status_display": order.get_status_display(),
+        "updated_at": order.updated_at.isoformat() if order.updated_at else None,
+    }
+
+
+class Subscription:
+    """Antrian event satu klien, terikat ke event loop tempat ia dibuat."""
+    __slots__ = ('topics', 'loop', 'queue')
+
+    def __init__(self, topics, maxsize):
+        self.topics = tuple(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def put(self, event):
+        # Dijalankan di loop subscriber. Klien lambat: buang event terlama, status terbaru lebih penting
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """Event berikutnya; raise asyncio.TimeoutError jika tidak ada dalam `timeout` detik."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+def _put_all(subscriptions, event):
+    for subscription in subscriptions:
+        subscription.put(event)
+
+
+class InProcessBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._topics = {}
+
+    # --- Sisi publisher (thread request / signal) ---
+    def publish(self, topic, event):
+        self.deliver(topic, event)
+
+    def deliver(self, topic, event):
+        """Teruskan event ke subscriber lokal topik ini (1 wakeup per event loop, bukan per subscriber)."""
+        with self._lock:
+            subscriptions = list(self._topics.get(topic, ()))
+        by_loop = {}
+        for subscription in subscriptions:
+            by_loop.setdefault(subscription.loop, []).append(subscription)
+        for loop, batch in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_put_all, batch, event)
+            except RuntimeError:
+                pass  # Event loop subscriber sudah ditutup
+
+    # --- Sisi subscriber (event loop ASGI) ---
+    async def start(self):
+        """Siapkan transport antar worker (no-op untuk broker in-process)."""
+
+    @asynccontextmanager
+    async def listen(self, topics):
+        await self.start()
+        subscription = Subscription(topics, getattr(settings, 'ORDER_EVENTS_QUEUE_SIZE', 16))
+        with self._lock:
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                for topic in subscription.topics:
+                    subscribers = self._topics.get(topic)
+                    if subscribers is not None:
+                        subscribers.discard(subscription)
+                        if not subscribers:
+                            del self._topics[topic]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "topics": len(self._topics),
+                "subscriptions": len({s for subs in self._topics.values() for s in subs}),
+            }
+
+
+class RedisBroker(InProcessBroker):
+    """
+    Pub/sub lewat Redis (ORDER_EVENTS_REDIS_URL). Listener per worker memakai
+    PSUBSCRIBE ke semua topik: volume event status order kecil, dan jumlah
+    koneksi Redis tetap 1 per worker berapa pun jumlah subscriber-nya.
+    """
+
+    def __init__(self, url=None):
+        super().__init__()
+        if redis is None:
+            raise ImproperlyConfigured("Paket 'redis' belum terpasang (pip install redis)")
+        self.url = url or getattr(settings, 'ORDER_EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+        self._publisher = redis.Redis.from_url(self.url)
+        self._listener = None
+
+    def publish(self, topic, event):
+        self._publisher.publish(CHANNEL_PREFIX + topic, json.dumps(event))
+
+    async def start(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self):
+        while True:
+            client = redis.asyncio.Redis.from_url(self.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                    async for message in pubsub.listen():
+                        if message["type"] != "pmessage":
+                            continue
+                        topic = message["channel"].decode()[len(CHANNEL_PREFIX):]
+                        self.deliver(topic, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Listener Redis order events terputus: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await client.aclose()
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Broker bersama per proses (kelas dari ORDER_EVENTS_BROKER)."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'ORDER_EVENTS_BROKER', DEFAULT_BROKER))()
+    return _broker
+
+
+def publish_order_event(order):
+    """Kirim status order terkini ke subscriber resi & customer-nya. Tidak pernah raise."""
+    event = order_event(order)
+    try:
+        broker = get_broker()
+        broker.publish(tracking_topic(order.tracking_code), event)
+        broker.publish(customer_topic(order.customer_id), event)
+    except Exception as e:
+        logger.error(f"Gagal publish event order {order.tracking_code}: {e}")
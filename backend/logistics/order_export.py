@@ -0,0 +1,207 @@
+# backend/logistics/order_export.py
+
+"""
+Export Order + OrderCharge untuk finance (OrderExportView & action OrderAdmin).
+
+- Order dibaca dengan queryset.iterator(chunk_size=ORDER_EXPORT_CHUNK_SIZE)
+  (server-side cursor di PostgreSQL); charges di-prefetch SEKALI per chunk.
+- Satu baris per order, rincian charge diringkas di kolom charge_*; total
+  reimbursement/addons di kolom Order sudah hanya menghitung charge terverifikasi.
+- CSV & XLSX ditulis sambil jalan ke StreamingHttpResponse: byte pertama keluar
+  setelah chunk pertama, memori tetap berapa pun jumlah barisnya (WSGI & ASGI,
+  lihat streaming.py).
+- Sel teks CSV yang berawalan karakter formula diberi prefix ' (CSV injection).
+- XLSX ditulis langsung sebagai zip streaming (inline string, tanpa style),
+  karena openpyxl harus menyelesaikan seluruh file sebelum bisa dikirim.
+"""
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
+from decimal import Decimal
+from xml.sax.saxutils import escape
+import csv
+import re
+import zipfile
+
+from .models import Order, OrderCharge
+from .streaming import streaming_response
+
+COLUMNS = (
+    'tracking_code', 'created_at', 'status', 'customer', 'customer_email',
+    'origin_city', 'dest_city', 'total_distance_km', 'service_type',
+    'driver', 'vehicle', 'base_price', 'addons_price', 'reimbursement_total',
+    'final_total_price', 'completed_at', 'cancellation_reason',
+    'charge_count', 'charge_verified_total', 'charge_pending_total', 'charge_details',
+)
+NUMERIC_COLUMNS = frozenset({
+    'total_distance_km', 'base_price', 'addons_price', 'reimbursement_total', 'final_total_price',
+    'charge_count', 'charge_verified_total', 'charge_pending_total',
+})
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def export_queryset(queryset=None):
+    queryset = Order.objects.all() if queryset is None else queryset
+    return queryset.select_related('customer', 'driver', 'vehicle').prefetch_related(
+        Prefetch('charges', queryset=OrderCharge.objects.order_by('created_at', 'id'))
+    ).order_by('created_at', 'id')
+
+
+def _when(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def order_rows(queryset=None):
+    """Baris export (tuple sesuai COLUMNS) per order, dibaca per chunk dari DB."""
+    chunk_size = getattr(settings, 'ORDER_EXPORT_CHUNK_SIZE', 2000)
+    for order in export_queryset(queryset).iterator(chunk_size=chunk_size):
+        charges = order.charges.all()
+        verified = sum((c.amount for c in charges if c.is_verified), Decimal('0.00'))
+        pending = sum((c.amount for c in charges if not c.is_verified), Decimal('0.00'))
+        details = "; ".join(
+            f"{c.charge_name} {c.amount}{'' if c.is_verified else ' (belum verifikasi)'}" for c in charges
+        )
+        yield (
+            order.tracking_code, _when(order.created_at), order.status,
+            order.customer.username, order.customer.email,
+            order.origin_city, order.dest_city, order.total_distance_km, order.service_type,
+            order.driver.full_name_ktp if order.driver else '', order.vehicle.nopol if order.vehicle else '',
+            order.base_price, order.addons_price, order.reimbursement_total, order.final_total_price,
+            _when(order.completed_at), order.cancellation_reason or '',
+            len(charges), verified, pending, details,
+        )
+
+
+# =================================================================
+# 1. CSV
+# =================================================================
+
+class _Echo:
+    """Pseudo-buffer csv.writer: write() langsung mengembalikan teksnya."""
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    # Teks berawalan = + - @ (atau tab / CR) dibaca Excel sebagai formula: paksa jadi teks
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(_Echo())
+    yield "﻿" + writer.writerow(COLUMNS)  # BOM: Excel membaca UTF-8 dengan benar
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+# =================================================================
+# 2. XLSX (ZIP STREAMING)
+# =================================================================
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Orders" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+SHEET_TAIL = '</sheetData></worksheet>'
+# Karakter kontrol yang tidak sah di XML 1.0
+ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _ZipBuffer:
+    """Target tulis zipfile tanpa seek (zip memakai data descriptor); isinya diambil per potong."""
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _cell(value, numeric):
+    if numeric and value not in ('', None):
+        return f'<c><v>{value}</v></c>'
+    text = escape(ILLEGAL_XML.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xml_row(values, numeric=NUMERIC_COLUMNS):
+    cells = "".join(_cell(value, column in numeric) for column, value in zip(COLUMNS, values))
+    return f'<row>{cells}</row>'
+
+
+def xlsx_stream(rows, flush_every=500):
+    buffer = _ZipBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((SHEET_HEAD + _xml_row(COLUMNS, numeric=())).encode())
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xml_row(row).encode())
+                if count % flush_every == 0:
+                    yield buffer.take()
+            sheet.write(SHEET_TAIL.encode())
+    yield buffer.take()
+
+
+def export_response(request, queryset=None, file_type='csv'):
+    """Response streaming export order (file_type 'csv' / 'xlsx'), juga di ASGI."""
+    rows = order_rows(queryset)
+    stream = xlsx_stream(rows) if file_type == 'xlsx' else csv_stream(rows)
+    response = streaming_response(request, stream, content_type=CONTENT_TYPES[file_type])
+    filename = f"orders-{timezone.localtime():%Y%m%d-%H%M}.{file_type}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
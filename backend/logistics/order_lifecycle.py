@@ -0,0 +1,134 @@
+# backend/logistics/order_lifecycle.py
+
+"""
+State machine status Order (peta transisi ORDER_TRANSITIONS di models.py).
+
+- transition_orders(): pindahkan banyak order ke satu status tujuan dengan SATU
+  UPDATE ... WHERE id IN (...) AND status IN (<status asal yang sah>). Hanya
+  kolom yang berubah yang ditulis (status, updated_at, kolom waktu status, field
+  tambahan); tanpa save() per order, jadi final_total_price tidak dihitung ulang.
+- Kondisi status ada di WHERE: order yang statusnya sudah berubah oleh request
+  lain tidak ikut ter-update dan dilaporkan sebagai ditolak (tanpa row lock).
+- queryset.update() tidak memicu signal, jadi efek sampingnya dijalankan di sini
+  setelah commit: invalidasi cache lacak resi, event push status, driver sibuk
+  di index dispatch.
+"""
+
+from collections import namedtuple
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+import uuid
+
+from .dispatch import dispatch_index
+from .models import Order, ORDER_OPEN_STATUSES, ORDER_STATUS_TIMESTAMPS, ORDER_TRANSITIONS
+from .order_events import publish_order_event
+from .tracking import invalidate_tracking
+
+TransitionResult = namedtuple('TransitionResult', 'updated rejected')  # [id], {id: status saat ini / None}
+
+
+class TransitionError(ValueError):
+    """Permintaan transisi tidak valid (status tujuan / field tambahan)."""
+
+
+class InvalidTransition(TransitionError):
+    """Order tidak bisa pindah dari status saat ini ke status tujuan."""
+
+
+def can_transition(current, target):
+    return target in ORDER_TRANSITIONS.get(current, ())
+
+
+def allowed_sources(target):
+    return tuple(source for source, targets in ORDER_TRANSITIONS.items() if target in targets)
+
+
+def transition_orders(order_ids, target, *, driver=None, vehicle=None, cancellation_reason=None):
+    """
+    Pindahkan order `order_ids` ke status `target`. driver/vehicle hanya untuk
+    DRIVER_ASSIGNED (satu order), cancellation_reason hanya untuk CANCELLED.
+    DRIVER_ASSIGNED tanpa driver hanya berlaku untuk order yang driver-nya sudah diisi.
+    """
+    if target not in ORDER_TRANSITIONS:
+        raise TransitionError(f"Status '{target}' tidak dikenal")
+    sources = allowed_sources(target)
+    if not sources:
+        raise TransitionError(f"Order tidak bisa dipindah ke status {target}")
+    try:
+        order_ids = list(dict.fromkeys(uuid.UUID(str(pk)) for pk in order_ids))
+    except ValueError:
+        raise TransitionError("ID order tidak valid")
+    if (driver is not None or vehicle is not None) and target != 'DRIVER_ASSIGNED':
+        raise TransitionError("Driver / kendaraan hanya bisa diisi saat transisi ke DRIVER_ASSIGNED")
+    if driver is not None and len(order_ids) > 1:
+        raise TransitionError("Satu driver hanya bisa ditugaskan ke satu order")
+    if cancellation_reason is not None and target != 'CANCELLED':
+        raise TransitionError("Alasan pembatalan hanya untuk transisi ke CANCELLED")
+    if not order_ids:
+        return TransitionResult([], {})
+
+    now = timezone.now()
+    values = {'status': target, 'updated_at': now}
+    stamp = ORDER_STATUS_TIMESTAMPS.get(target)
+    if stamp:
+        values[stamp] = now
+    if target == 'SEARCHING_DRIVER':
+        values.update(driver=None, vehicle=None)  # Dispatch ulang: lepas driver lama
+    if driver is not None:
+        values['driver'] = driver
+    if vehicle is not None:
+        values['vehicle'] = vehicle
+    if cancellation_reason is not None:
+        values['cancellation_reason'] = cancellation_reason
+
+    guard = Q(status__in=sources)
+    if target == 'DRIVER_ASSIGNED' and driver is None:
+        guard &= Q(driver__isnull=False)
+
+    with transaction.atomic():
+        Order.objects.filter(guard, pk__in=order_ids).update(**values)
+        # Baris yang ter-update = status tujuan dengan updated_at milik UPDATE ini
+        rows = Order.objects.filter(pk__in=order_ids).values(
+            'id', 'status', 'updated_at', 'tracking_code', 'customer_id', 'driver_id',
+        )
+        updated, rejected = [], {}
+        for row in rows:
+            if row['status'] == target and row['updated_at'] == now:
+                updated.append(row)
+            else:
+                rejected[row['id']] = row['status']
+        found = {row['id'] for row in updated} | rejected.keys()
+        rejected.update((pk, None) for pk in order_ids if pk not in found)
+        if updated:
+            transaction.on_commit(lambda: _after_transition(updated, target))
+
+    return TransitionResult([row['id'] for row in updated], rejected)
+
+
+def transition_order(order, target, **fields):
+    """Transisi satu order; instance ikut diperbarui. Raise InvalidTransition jika ditolak."""
+    result = transition_orders([order.pk], target, **fields)
+    if not result.updated:
+        current = result.rejected.get(order.pk)
+        raise InvalidTransition(f"Order {order.tracking_code} berstatus {current}, tidak bisa ke {target}")
+    refreshed = ['status', 'updated_at', 'driver', 'vehicle', 'cancellation_reason']
+    stamp = ORDER_STATUS_TIMESTAMPS.get(target)
+    if stamp:
+        refreshed.append(stamp)
+    order.refresh_from_db(fields=refreshed)
+    order._loaded_status = order.status
+    return order
+
+
+def _after_transition(rows, target):
+    orders = [
+        Order(id=row['id'], tracking_code=row['tracking_code'], customer_id=row['customer_id'],
+              driver_id=row['driver_id'], status=target, updated_at=row['updated_at'])
+        for row in rows
+    ]
+    invalidate_tracking(*orders)
+    for order in orders:
+        publish_order_event(order)
+        if order.driver_id and target in ORDER_OPEN_STATUSES:
+            dispatch_index.driver_busy(order.driver_id)
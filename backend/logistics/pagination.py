@@ -0,0 +1,20 @@
+# backend/logistics/pagination.py
+
+"""
+Pagination API. Cursor (keyset) pagination: halaman berikutnya diambil dengan
+WHERE created_at < cursor (bukan OFFSET, tanpa COUNT), jadi biaya per halaman
+tetap sama di halaman 1 maupun halaman ke-2.500 akun dengan 50 rb order.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class OrderCursorPagination(CursorPagination):
+    """
+    ?cursor=<token dari next/previous>&page_size=20
+    Urutan (-created_at, -id) didukung index order_customer_created_idx.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
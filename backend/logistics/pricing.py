@@ -0,0 +1,209 @@
+# backend/logistics/pricing.py
+
+"""
+Mesin harga tunggal (integer Rupiah / fixed-point) untuk semua jalur quote:
+
+- quote() / quote_matrix()    : harga simulasi (SimulasiHargaView, versi async,
+                                SimulasiHargaBatchView) -> surcharge berat/volume,
+                                margin 20%, dibulatkan ke atas per Rupiah.
+- service_price()             : harga simulasi -> harga order lewat quote token
+                                (express & corporate diterapkan ke harga simulasi,
+                                surcharge tetap ikut).
+- order_price() / order_prices(): harga order tanpa quote token (calculate_shipping_cost,
+                                upload massal; tanpa data berat/volume) ->
+                                margin 20%, multiplier express, markup corporate
+                                2%, dibulatkan ke ribuan terdekat (half-even,
+                                sama dengan round(Decimal, -3)).
+
+Semua tarif di-compile sekali per armada menjadi Tariff berisi integer x100
+(lihat pricing_snapshot), lalu dihitung tanpa Decimal. Fungsi inti menerima
+int Python (skalar) maupun array NumPy (batch), jadi kedua jalur memakai rumus
+yang sama persis. Benchmark: `python manage.py bench_pricing`.
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+import numpy as np
+
+# Jarak, tarif, berat & volume disimpan dengan 2 desimal -> dikali 100
+SCALE = 100
+UNIT = SCALE * SCALE  # 1 Rupiah dalam unit fixed-point (jarak x tarif)
+
+# Harga jual = HPP / 0.8  ->  HPP * 5 / 4
+MARGIN_NUM = 5
+MARGIN_DEN = 4
+
+# Corporate: harga / (1 - 0.02)  ->  harga * 100 / 98
+CORPORATE_NUM = 100
+CORPORATE_DEN = 98
+
+DEFAULT_EXPRESS_MULTIPLIER = Decimal('1.5')
+ORDER_ROUNDING = 1000  # Harga order dibulatkan ke ribuan
+
+# Semua field integer x SCALE (skalar per armada, atau array untuk batch)
+Tariff = namedtuple('Tariff', [
+    'base_fare', 'rate_per_km', 'min_price',
+    'weight_limit', 'volume_limit', 'weight_price', 'volume_price',
+    'express_multiplier',
+])
+
+
+def fixed(value):
+    """Satu angka (float/Decimal/None) -> int x100 (pembulatan sama dengan to_fixed)."""
+    return int(round(float(value or 0) * SCALE))
+
+
+def to_fixed(values):
+    """Konversi list angka (float/Decimal/None) ke array int64 dengan 2 desimal."""
+    arr = np.array([float(v or 0) for v in values], dtype=np.float64)
+    return np.rint(arr * SCALE).astype(np.int64)
+
+
+def units_to_rupiah(units):
+    """Unit fixed-point -> Decimal Rupiah (eksak, 2 desimal seperti kolom harga)."""
+    return (Decimal(int(units)) / UNIT).quantize(Decimal('0.01'))
+
+
+def compile_tariff(fleet, rule):
+    """(Fleet, MasterPricingRule) -> Tariff integer. Dipanggil sekali per snapshot."""
+    return Tariff(
+        base_fare=fixed(rule.base_fare),
+        rate_per_km=fixed(rule.base_rate_per_km),
+        min_price=fixed(rule.min_price_lumpsum),
+        weight_limit=fixed(fleet.max_weight_kg_limit),
+        volume_limit=fixed(fleet.max_volume_cbm_limit),
+        weight_price=fixed(fleet.surcharge_weight_price),
+        volume_price=fixed(fleet.surcharge_volume_price),
+        express_multiplier=fixed(rule.sla_express_multiplier or DEFAULT_EXPRESS_MULTIPLIER),
+    )
+
+
+def stack_tariffs(tariffs):
+    """List Tariff skalar -> satu Tariff berisi array int64 (M,)."""
+    return Tariff(*(np.array(column, dtype=np.int64) for column in zip(*tariffs)))
+
+
+def fleet_pricing_arrays(fleet_rules):
+    """List (fleet, rule) -> Tariff array, siap di-broadcast terhadap array lane."""
+    return stack_tariffs([compile_tariff(fleet, rule) for fleet, rule in fleet_rules])
+
+
+# ===========================================================
+# RUMUS INTI (int Python atau array NumPy)
+# ===========================================================
+
+def _ceil_selling(units):
+    """ceil(units / UNIT / 0.8) dalam Rupiah, tetap integer."""
+    return -((-units * MARGIN_NUM) // (UNIT * MARGIN_DEN))
+
+
+def _base_units(t, dist, maximum):
+    """HPP dasar (unit): tarif per km + base fare, minimal harga lumpsum."""
+    return maximum(dist * t.rate_per_km + t.base_fare * SCALE, t.min_price * SCALE)
+
+
+def _surcharge_units(t, wgt, vol, maximum):
+    weight = maximum(wgt - t.weight_limit, 0) * t.weight_price
+    volume = maximum(vol - t.volume_limit, 0) * t.volume_price
+    return weight, volume
+
+
+def _round_half_even(num, den):
+    """round(num / den) ke bilangan bulat terdekat, seri ke genap (integer/array)."""
+    q, r = num // den, num % den
+    twice = 2 * r
+    return q + ((twice > den) | ((twice == den) & (q % 2 == 1)))
+
+
+def _order_price(t, dist, express, corporate, maximum):
+    base = _base_units(t, dist, maximum)
+    multiplier = t.express_multiplier * express + SCALE * (1 - express)  # x100
+    corp_num = CORPORATE_NUM * corporate + CORPORATE_DEN * (1 - corporate)
+    num = base * MARGIN_NUM * multiplier * corp_num
+    den = UNIT * MARGIN_DEN * SCALE * CORPORATE_DEN * ORDER_ROUNDING
+    return _round_half_even(num, den) * ORDER_ROUNDING, base
+
+
+# ===========================================================
+# API SKALAR (1 quote)
+# ===========================================================
+
+def quote(tariff, distance_km, weight=0, volume=0):
+    """
+    Harga simulasi 1 lane x 1 armada.
+    Return dict int Rupiah: estimated_price, base_price, surcharge_weight, surcharge_volume.
+    """
+    base = _base_units(tariff, fixed(distance_km), max)
+    surcharge_weight, surcharge_volume = _surcharge_units(tariff, fixed(weight), fixed(volume), max)
+    return {
+        "estimated_price": _ceil_selling(base + surcharge_weight + surcharge_volume),
+        "base_price": _ceil_selling(base),
+        "surcharge_weight": _ceil_selling(surcharge_weight),
+        "surcharge_volume": _ceil_selling(surcharge_volume),
+    }
+
+
+def service_price(price, express_multiplier, express=False, corporate=False):
+    """
+    Harga simulasi (Rupiah, sudah termasuk surcharge berat/volume) -> harga order
+    per service type: x multiplier express (Tariff.express_multiplier), markup
+    corporate, dibulatkan ke atas per Rupiah. STANDARD non-corporate = harga
+    simulasi apa adanya. Dipakai respons simulasi DAN quote token, jadi harga
+    yang dilihat customer selalu sama dengan harga order yang dibuat.
+    """
+    multiplier = int(express_multiplier) if express else SCALE
+    corp_num, corp_den = (CORPORATE_NUM, CORPORATE_DEN) if corporate else (1, 1)
+    return -((-int(price) * multiplier * corp_num) // (SCALE * corp_den))
+
+
+def order_price(tariff, distance_km, express=False, corporate=False):
+    """
+    Harga order 1 lane. Return (harga jual Rupiah dibulatkan ribuan, HPP dalam unit).
+    HPP -> Decimal Rupiah: units_to_rupiah().
+    """
+    return _order_price(tariff, fixed(distance_km), int(bool(express)), int(bool(corporate)), max)
+
+
+# ===========================================================
+# API BATCH (array NumPy)
+# ===========================================================
+
+def quote_matrix(distance_km, weight, volume, fleet_params):
+    """
+    Hitung harga untuk N lane x M armada sekaligus.
+
+    distance_km, weight, volume : array (N,)
+    fleet_params                : Tariff array (M,) dari stack_tariffs()/fleet_pricing_arrays()
+
+    Return dict berisi array int64 (N, M) dalam Rupiah:
+    estimated_price, base_price, surcharge_weight, surcharge_volume.
+    """
+    dist = to_fixed(distance_km)[:, None]
+    wgt = to_fixed(weight)[:, None]
+    vol = to_fixed(volume)[:, None]
+    t = Tariff(*(column[None, :] for column in fleet_params))
+
+    base = _base_units(t, dist, np.maximum)
+    surcharge_weight, surcharge_volume = _surcharge_units(t, wgt, vol, np.maximum)
+    return {
+        "estimated_price": _ceil_selling(base + surcharge_weight + surcharge_volume),
+        "base_price": _ceil_selling(base),
+        "surcharge_weight": _ceil_selling(surcharge_weight),
+        "surcharge_volume": _ceil_selling(surcharge_volume),
+    }
+
+
+def order_prices(distance_km, tariffs, express, corporate):
+    """
+    Harga order untuk N baris sekaligus (mis. upload order massal).
+
+    distance_km, express, corporate : array/list (N,)
+    tariffs                         : Tariff array (N,) -> tarif armada per baris
+
+    Return (harga jual int64 (N,), HPP unit int64 (N,)).
+    Catatan: dihitung dalam int64, aman untuk HPP s/d ~Rp 10 miliar per order.
+    """
+    return _order_price(
+        tariffs, to_fixed(distance_km),
+        np.asarray(express, dtype=np.int64), np.asarray(corporate, dtype=np.int64), np.maximum
+    )
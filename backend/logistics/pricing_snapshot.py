@@ -0,0 +1,111 @@
+# backend/logistics/pricing_snapshot.py
+
+"""
+Snapshot master data harga (Fleet + MasterPricingRule) per proses.
+
+Tabel ini kecil (~20 baris) dan jarang berubah, jadi jalur quote tidak perlu
+query ke DB sama sekali:
+
+- Snapshot dibangun sekali (2 query) lalu dipakai bersama semua request.
+- Snapshot tidak pernah diubah; perubahan = bangun snapshot baru lalu tukar
+  referensinya (atomic), request yang sedang berjalan tetap memakai yang lama.
+- post_save/post_delete Fleet & MasterPricingRule (lihat signals.py) menaikkan
+  versi di shared cache setelah commit. Worker lain mengecek versi itu paling
+  sering tiap MASTER_DATA_REFRESH detik, worker yang mengubah data langsung
+  membangun ulang pada request berikutnya.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from asgiref.sync import sync_to_async
+from types import MappingProxyType
+import threading
+import time
+
+from .pricing import compile_tariff
+
+VERSION_KEY = "pricing:snapshot:version"
+
+
+class PricingSnapshot:
+    """Fleet yang punya rule harga, terindeks per id. Read-only."""
+    __slots__ = ('version', 'built_at', 'fleets', 'rules', 'tariffs', '_ordered')
+
+    def __init__(self, fleets, rules, version=None):
+        self.version = version
+        self.built_at = time.time()
+        self.rules = MappingProxyType({rule.fleet_type: rule for rule in rules})
+        # Urutan mengikuti Fleet.Meta.ordering (order, name), sama dengan queryset biasa
+        self._ordered = tuple((f, self.rules[f.fleet_type]) for f in fleets if f.fleet_type in self.rules)
+        self.fleets = MappingProxyType({f.id: (f, rule) for f, rule in self._ordered})
+        # Tarif integer siap hitung (lihat pricing.py), di-compile sekali per snapshot
+        self.tariffs = MappingProxyType({f.id: compile_tariff(f, rule) for f, rule in self._ordered})
+
+    def get(self, fleet_id):
+        """(fleet, rule) atau None jika armada tidak ada / belum punya rule harga."""
+        try:
+            return self.fleets.get(int(fleet_id))
+        except (TypeError, ValueError):
+            return None
+
+    def tariff(self, fleet_id):
+        """pricing.Tariff armada atau None (sama seperti get())."""
+        try:
+            return self.tariffs.get(int(fleet_id))
+        except (TypeError, ValueError):
+            return None
+
+    def pairs(self, fleet_ids):
+        """[(fleet, rule), ...] untuk id yang diminta, urut seperti Fleet.Meta.ordering."""
+        wanted = {int(i) for i in fleet_ids}
+        return [(f, rule) for f, rule in self._ordered if f.id in wanted]
+
+    def __len__(self):
+        return len(self._ordered)
+
+
+class SnapshotHolder:
+    def __init__(self):
+        self._snapshot = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'ROUTE_CACHE_ALIAS', 'default')]
+
+    def _build(self, version):
+        from .models import Fleet, MasterPricingRule
+
+        return PricingSnapshot(list(Fleet.objects.all()), list(MasterPricingRule.objects.all()), version)
+
+    def get(self):
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now < self._next_check:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and now < self._next_check:
+                return snapshot  # Sudah dicek thread lain
+            version = self.cache.get(VERSION_KEY)
+            if snapshot is None or version != snapshot.version:
+                snapshot = self._snapshot = self._build(version)
+            self._next_check = now + getattr(settings, 'MASTER_DATA_REFRESH', 5)
+        return snapshot
+
+    async def aget(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            return snapshot
+        return await sync_to_async(self.get)()
+
+    def invalidate(self):
+        """Dipanggil setelah master data berubah (on_commit)."""
+        self.cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+        self._next_check = 0.0
+
+
+# Instance tunggal per proses
+pricing_snapshot = SnapshotHolder()
@@ -0,0 +1,89 @@
+# backend/logistics/query_plans.py
+
+"""
+Query terpanas Order & CachedDistance beserta index yang wajib dipakai. Dicek
+di CI oleh tests/test_query_plans.py; `python manage.py explain_hot_queries`
+menjalankan cek yang sama terhadap database yang dikonfigurasi (staging).
+
+Di PostgreSQL seq scan dimatikan sementara (SET LOCAL) agar tabel yang masih
+kecil tidak membuat planner memilih seq scan.
+
+Index parsial order_open_queue_idx hanya dipakai PostgreSQL: SQLite tidak bisa
+mencocokkan WHERE index parsial dengan daftar status yang dikirim sebagai
+parameter, sehingga di SQLite query itu cukup memakai order_status_created_idx.
+"""
+
+from datetime import timedelta
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .geo import neighbour_cells
+from .models import CachedDistance, Order, ORDER_OPEN_STATUSES
+
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+LANE_COLUMNS = ['origin_lat', 'origin_lng', 'dest_lat', 'dest_lng']
+
+
+def lane_unique_index():
+    """Nama index unik (origin_lat, origin_lng, dest_lat, dest_lng), dibuat otomatis oleh Django."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, CachedDistance._meta.db_table)
+    for name, info in constraints.items():
+        if info['unique'] and info['columns'] == LANE_COLUMNS:
+            return name
+    raise LookupError("Unique index lane CachedDistance tidak ditemukan (sudah migrate?)")
+
+
+def hot_queries():
+    """[(nama, queryset, index yang wajib dipakai di vendor database aktif), ...]"""
+    now = timezone.now()
+    cells = sorted(neighbour_cells(-6.2, 106.8))
+    queries = [
+        ("order: list customer (cursor)",
+         Order.objects.filter(customer_id=1, created_at__lt=now).order_by('-created_at', '-id')[:20],
+         'order_customer_created_idx'),
+        ("order: filter status",
+         Order.objects.filter(status='COMPLETED').order_by('-created_at')[:50],
+         'order_status_created_idx'),
+        ("order: antrian order berjalan",
+         Order.objects.filter(status__in=ORDER_OPEN_STATUSES).order_by('created_at')[:50],
+         {'postgresql': 'order_open_queue_idx', 'sqlite': 'order_status_created_idx'}),
+        ("order: job aktif driver",
+         Order.objects.filter(driver_id=1, status__in=ORDER_OPEN_STATUSES),
+         'order_driver_status_idx'),
+        ("jarak: lookup lane",
+         CachedDistance.objects.filter(
+             origin_lat__in=['-6.2000'], origin_lng__in=['106.8000'],
+             dest_lat__in=['-6.9000'], dest_lng__in=['107.6000'],
+         ),
+         lane_unique_index()),
+        ("jarak: rute terdekat (cell + TTL)",
+         CachedDistance.objects.filter(
+             origin_cell__in=cells, dest_cell__in=cells, cached_at__gte=now - timedelta(days=7),
+         ),
+         'cacheddist_cells_fresh_idx'),
+        ("jarak: rute kadaluarsa",
+         CachedDistance.objects.filter(cached_at__lt=now - timedelta(days=6)).order_by('cached_at')[:1000],
+         'cacheddist_cached_at_idx'),
+    ]
+    return [
+        (name, queryset, index[connection.vendor] if isinstance(index, dict) else index)
+        for name, queryset, index in queries
+    ]
+
+
+def explain(queryset):
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+
+def check_plans():
+    """[(nama, index, plan, memakai index?), ...] untuk semua hot_queries()."""
+    results = []
+    for name, queryset, index in hot_queries():
+        plan = explain(queryset)
+        results.append((name, index, plan, index in plan))
+    return results
@@ -0,0 +1,79 @@
+# backend/logistics/quote_token.py
+
+"""
+Quote token: hasil SimulasiHargaView (rute + harga) ditandatangani dengan
+django.core.signing dan dikirim ke frontend. Saat order dibuat, token cukup
+diverifikasi (HMAC SECRET_KEY + umur maksimal QUOTE_TOKEN_MAX_AGE) tanpa query
+DB dan tanpa menghitung ulang rute / harga.
+
+Token berisi harga simulasi (pricing.quote, termasuk surcharge berat/volume)
+dan multiplier express armada. Service type & status corporate baru diketahui
+saat order dibuat, jadi keduanya diterapkan lewat pricing.service_price(),
+fungsi yang sama dengan service_prices di respons simulasi: harga order
+STANDARD non-corporate = estimated_price simulasi.
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+from django.conf import settings
+from django.core import signing
+
+from .pricing import service_price
+
+SALT = "logistics.quote"
+VERSION = 2  # v1: harga order tanpa surcharge (tidak dipakai lagi)
+SERVICE_TYPES = ('STANDARD', 'EXPRESS')
+
+
+class InvalidQuoteToken(Exception):
+    pass
+
+
+class Quote(namedtuple('Quote', [
+    'fleet_id', 'lane', 'distance_km', 'duration_minutes', 'is_estimated', 'simulated_price', 'express_multiplier',
+])):
+    """Isi token yang sudah diverifikasi. lane: 4 koordinat Decimal (lane key)."""
+    __slots__ = ()
+
+    def price(self, service_type="STANDARD", is_corporate=False):
+        if service_type not in SERVICE_TYPES:
+            raise InvalidQuoteToken(f"Service type tidak dikenal: {service_type}")
+        return Decimal(service_price(
+            self.simulated_price, self.express_multiplier, service_type == 'EXPRESS', is_corporate
+        ))
+
+
+def issue_quote_token(fleet_id, lane, route_data, tariff, simulated_price, is_estimated=False):
+    """Buat token untuk 1 lane x 1 armada dari harga simulasi (estimated_price) yang ditampilkan."""
+    payload = {
+        "v": VERSION,
+        "f": int(fleet_id),
+        "l": [f"{v:.4f}" for v in lane],
+        "d": route_data['distance_km'],
+        "t": route_data['duration_minutes'],
+        "e": int(bool(is_estimated)),
+        "p": int(simulated_price),
+        "x": int(tariff.express_multiplier),
+    }
+    return signing.dumps(payload, salt=SALT, compress=True)
+
+
+def load_quote_token(token):
+    """Verifikasi tanda tangan & umur token. Return Quote, atau raise InvalidQuoteToken."""
+    try:
+        payload = signing.loads(token, salt=SALT, max_age=getattr(settings, 'QUOTE_TOKEN_MAX_AGE', 900))
+    except signing.SignatureExpired:
+        raise InvalidQuoteToken("Quote sudah kadaluarsa, silakan simulasi ulang")
+    except signing.BadSignature:
+        raise InvalidQuoteToken("Quote token tidak valid")
+    if not isinstance(payload, dict) or payload.get("v") != VERSION:
+        raise InvalidQuoteToken("Versi quote token tidak didukung, silakan simulasi ulang")
+    return Quote(
+        fleet_id=payload["f"],
+        lane=tuple(Decimal(v) for v in payload["l"]),
+        distance_km=payload["d"],
+        duration_minutes=payload["t"],
+        is_estimated=bool(payload["e"]),
+        simulated_price=payload["p"],
+        express_multiplier=payload["x"],
+    )
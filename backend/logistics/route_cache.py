@@ -0,0 +1,191 @@
+# backend/logistics/route_cache.py
+
+"""
+Cache rute 2 tingkat di depan tabel CachedDistance:
+
+1. LRU in-process (dict terurut, dibatasi jumlah entry) -> tanpa I/O sama sekali.
+2. Shared cache (Django cache backend: Redis/Memcached di production,
+   locmem/file saat development & test) -> dipakai bersama antar worker.
+3. Tabel CachedDistance (sumber asli).
+
+Setiap entry membawa `cached_at` dari baris CachedDistance, sehingga data lalu
+lintas yang sudah lebih tua dari ROUTE_CACHE_TTL dianggap kadaluarsa di semua tingkat.
+"""
+
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+import threading
+import time
+
+KEY_PREFIX = "route:v1:"
+
+
+def cache_key(key):
+    """Lane key (4 Decimal) -> string stabil, apapun jumlah desimal yang tersimpan."""
+    return KEY_PREFIX + ":".join(f"{v:.4f}" for v in key)
+
+
+class RouteCache:
+    """
+    Cache rute 2 tingkat + counter hit/miss untuk sizing.
+    Nilai yang disimpan: {"distance_km", "duration_minutes", "cached_at" (epoch detik)}.
+    """
+
+    def __init__(self, maxsize=None, ttl=None, alias=None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._alias = alias
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ('local_hits', 'shared_hits', 'db_hits', 'nearby_hits', 'misses', 'expired', 'evictions'), 0
+        )
+
+    # --- Konfigurasi (dibaca lazy agar override settings saat test tetap berlaku) ---
+    @property
+    def maxsize(self):
+        return self._maxsize or getattr(settings, 'ROUTE_CACHE_LRU_SIZE', 10000)
+
+    @property
+    def ttl(self):
+        return self._ttl or getattr(settings, 'ROUTE_CACHE_TTL', 7 * 24 * 3600)
+
+    @property
+    def shared(self):
+        return caches[self._alias or getattr(settings, 'ROUTE_CACHE_ALIAS', 'default')]
+
+    def _count(self, name, amount=1):
+        if amount:
+            with self._lock:
+                self._counters[name] += amount
+
+    def _is_fresh(self, entry, now):
+        return now - entry['cached_at'] < self.ttl
+
+    # --- Tingkat 1: LRU lokal ---
+    def _local_get(self, skey, now):
+        with self._lock:
+            entry = self._local.get(skey)
+            if entry is None:
+                return None
+            if not self._is_fresh(entry, now):
+                del self._local[skey]
+                self._counters['expired'] += 1
+                return None
+            self._local.move_to_end(skey)
+            return entry
+
+    def _local_set(self, skey, entry):
+        with self._lock:
+            self._local[skey] = entry
+            self._local.move_to_end(skey)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    # --- API publik ---
+    def get_many(self, keys, loader=None):
+        """
+        Ambil banyak lane sekaligus: LRU -> shared cache (get_many) -> loader (DB).
+
+        loader(missing_keys) -> {lane_key: entry} dipanggil SEKALI untuk semua
+        lane yang tidak ada di kedua tingkat cache. Entry dari loader yang masih
+        segar otomatis diisi balik ke tingkat cache.
+        Return: {lane_key: entry}
+        """
+        now = time.time()
+        found = {}
+        pending = {}
+
+        for key in set(keys):
+            skey = cache_key(key)
+            entry = self._local_get(skey, now)
+            if entry is not None:
+                found[key] = entry
+            else:
+                pending[skey] = key
+        self._count('local_hits', len(found))
+
+        if pending:
+            shared_hits = 0
+            for skey, entry in self.shared.get_many(list(pending)).items():
+                if self._is_fresh(entry, now):
+                    found[pending.pop(skey)] = entry
+                    self._local_set(skey, entry)
+                    shared_hits += 1
+            self._count('shared_hits', shared_hits)
+
+        if pending and loader is not None:
+            loaded = loader(list(pending.values()))
+            fresh = {k: e for k, e in loaded.items() if self._is_fresh(e, now)}
+            self._count('expired', len(loaded) - len(fresh))
+            nearby = sum(1 for e in fresh.values() if 'offset_m' in e)
+            self._count('db_hits', len(fresh) - nearby)
+            self._count('nearby_hits', nearby)
+            self.set_many(fresh)
+            found.update(fresh)
+            for key in fresh:
+                pending.pop(cache_key(key), None)
+
+        self._count('misses', len(pending))
+        return found
+
+    def get(self, key, loader=None):
+        return self.get_many([key], loader).get(key)
+
+    def peek(self, key):
+        """Cek LRU lalu shared cache tanpa menyentuh counter (untuk polling)."""
+        now = time.time()
+        skey = cache_key(key)
+        with self._lock:
+            entry = self._local.get(skey)
+        if entry is None:
+            entry = self.shared.get(skey)
+        return entry if entry is not None and self._is_fresh(entry, now) else None
+
+    def set_many(self, entries):
+        """Simpan {lane_key: entry} ke LRU lokal & shared cache (timeout = sisa TTL)."""
+        now = time.time()
+        by_timeout = {}
+        for key, entry in entries.items():
+            skey = cache_key(key)
+            self._local_set(skey, entry)
+            remaining = int(self.ttl - (now - entry['cached_at']))
+            if remaining > 0:
+                by_timeout.setdefault(remaining, {})[skey] = entry
+        for timeout, batch in by_timeout.items():
+            self.shared.set_many(batch, timeout=timeout)
+
+    def invalidate(self, key):
+        skey = cache_key(key)
+        with self._lock:
+            self._local.pop(skey, None)
+        self.shared.delete(skey)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._local)
+        hits = counters['local_hits'] + counters['shared_hits'] + counters['db_hits'] + counters['nearby_hits']
+        lookups = hits + counters['misses']
+        return {
+            **counters,
+            "lru_size": size,
+            "lru_maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+# Instance tunggal per proses
+route_cache = RouteCache()
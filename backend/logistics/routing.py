@@ -0,0 +1,524 @@
+# backend/logistics/routing.py
+
+"""
+Utilitas rute: pemanggilan TomTom & lookup cache jarak (CachedDistance).
+Dipakai oleh SimulasiHargaView (satu lane) dan SimulasiHargaBatchView (banyak lane).
+"""
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import Round
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+import logging
+import threading
+import time
+
+from .geo import haversine_km, neighbour_cells
+from .models import CachedDistance, Order
+from .route_cache import route_cache, cache_key
+from .singleflight import SingleFlight, AsyncSingleFlight, cache_lock_do, async_cache_lock_do
+from .tomtom import get_client, get_async_client, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+COORD_PRECISION = 4  # Koordinat dibulatkan 4 desimal (~11 meter)
+
+# Satu panggilan TomTom in-flight per lane di worker ini
+route_flight = SingleFlight()
+async_route_flight = AsyncSingleFlight()
+
+
+def get_tomtom_route(lat1, lon1, lat2, lon2, travel_mode='truck'):
+    """
+    Mengambil jarak & waktu via TomTom API (lewat client pooled + circuit breaker).
+    Return None jika gagal / circuit terbuka.
+    """
+    try:
+        return get_client().calculate_route(lat1, lon1, lat2, lon2, travel_mode=travel_mode)
+    except CircuitOpenError as e:
+        logger.warning(f"TomTom API dilewati: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"TomTom API Error: {e}")
+        return None
+
+
+# ===========================================================
+# LANE KEY & LOOKUP MASSAL
+# ===========================================================
+
+def lane_key(o_lat, o_lng, d_lat, d_lng):
+    """
+    Kunci lane = 4 koordinat Decimal yang sudah dibulatkan, sama persis dengan
+    nilai yang disimpan di CachedDistance.
+    """
+    return tuple(
+        round(Decimal(v), COORD_PRECISION) for v in (o_lat, o_lng, d_lat, d_lng)
+    )
+
+
+def _route_data(entry):
+    return {"distance_km": entry['distance_km'], "duration_minutes": entry['duration_minutes']}
+
+
+def load_routes_from_db(keys):
+    """
+    Loader tingkat terakhir untuk route_cache: ambil semua lane dalam SATU query.
+    Filter IN per kolom lalu dicocokkan ulang per lane di Python.
+    Return: {lane_key: entry} (entry sudah termasuk cached_at untuk TTL)
+    """
+    keys = set(keys)
+    if not keys:
+        return {}
+
+    candidates = CachedDistance.objects.filter(
+        origin_lat__in={k[0] for k in keys},
+        origin_lng__in={k[1] for k in keys},
+        dest_lat__in={k[2] for k in keys},
+        dest_lng__in={k[3] for k in keys},
+    ).only('origin_lat', 'origin_lng', 'dest_lat', 'dest_lng', 'distance_km', 'duration_minutes', 'cached_at')
+
+    found = {}
+    for row in candidates:
+        key = (row.origin_lat, row.origin_lng, row.dest_lat, row.dest_lng)
+        if key in keys:
+            found[key] = {
+                "distance_km": float(row.distance_km),
+                "duration_minutes": row.duration_minutes,
+                "cached_at": row.cached_at.timestamp(),
+            }
+
+    if getattr(settings, 'ROUTE_MATCH_RADIUS_M', 0) > 0:
+        found.update(find_nearby_routes(keys - set(found)))
+    return found
+
+
+def find_nearby_routes(keys):
+    """
+    Cari rute cache yang origin DAN destination-nya berada dalam radius
+    ROUTE_MATCH_RADIUS_M dari lane yang diminta, lewat index grid cell
+    (origin_cell, dest_cell) -> tanpa full-table scan.
+
+    Jarak dikoreksi dengan menambahkan offset kedua titik (konservatif), durasi
+    diskalakan proporsional.
+    Return: {lane_key: entry} dengan tambahan "offset_m".
+    """
+    if not keys:
+        return {}
+
+    radius_km = min(getattr(settings, 'ROUTE_MATCH_RADIUS_M', 0), 1000) / 1000
+    origin_cells, dest_cells = set(), set()
+    for o_lat, o_lng, d_lat, d_lng in keys:
+        origin_cells |= neighbour_cells(o_lat, o_lng)
+        dest_cells |= neighbour_cells(d_lat, d_lng)
+
+    min_cached_at = timezone.now() - timedelta(seconds=route_cache.ttl)
+    candidates = CachedDistance.objects.filter(
+        origin_cell__in=origin_cells, dest_cell__in=dest_cells, cached_at__gte=min_cached_at
+    ).only(
+        'origin_lat', 'origin_lng', 'dest_lat', 'dest_lng', 'origin_cell', 'dest_cell',
+        'distance_km', 'duration_minutes', 'cached_at'
+    )
+    by_origin_cell = defaultdict(list)
+    for row in candidates:
+        by_origin_cell[row.origin_cell].append(row)
+
+    found = {}
+    for key in keys:
+        o_lat, o_lng, d_lat, d_lng = key
+        key_dest_cells = neighbour_cells(d_lat, d_lng)
+        nearby_rows = (
+            row
+            for cell in neighbour_cells(o_lat, o_lng)
+            for row in by_origin_cell.get(cell, ())
+            if row.dest_cell in key_dest_cells
+        )
+        best, best_offset = None, None
+        for row in nearby_rows:
+            o_off = haversine_km(o_lat, o_lng, row.origin_lat, row.origin_lng)
+            if o_off > radius_km:
+                continue
+            d_off = haversine_km(d_lat, d_lng, row.dest_lat, row.dest_lng)
+            if d_off > radius_km:
+                continue
+            if best is None or o_off + d_off < best_offset:
+                best, best_offset = row, o_off + d_off
+        if best is None:
+            continue
+
+        distance = float(best.distance_km)
+        corrected = round(distance + best_offset, 2)
+        found[key] = {
+            "distance_km": corrected,
+            "duration_minutes": round(best.duration_minutes * corrected / distance) if distance else best.duration_minutes,
+            "cached_at": best.cached_at.timestamp(),
+            "offset_m": round(best_offset * 1000),
+        }
+    return found
+
+
+def lookup_cached_routes(keys):
+    """
+    Ambil rute yang sudah di-cache (LRU -> shared cache -> DB) untuk banyak lane.
+    Rute yang lebih tua dari ROUTE_CACHE_TTL dianggap tidak ada.
+    Return: {lane_key: route_data}
+    """
+    entries = route_cache.get_many(keys, loader=load_routes_from_db)
+    return {key: _route_data(entry) for key, entry in entries.items()}
+
+
+def store_routes(fetched, travel_modes='truck', overwrite=True):
+    """
+    Simpan hasil TomTom ke CachedDistance (upsert, sekaligus me-refresh baris
+    yang sudah kadaluarsa) lalu isi tingkat cache.
+    travel_modes: mode untuk semua lane, atau {lane_key: mode}.
+    overwrite=False: baris yang sudah ada dibiarkan (ON CONFLICT DO NOTHING).
+    """
+    if not fetched:
+        return
+    mode_of = travel_modes.get if isinstance(travel_modes, dict) else (lambda key: travel_modes)
+    conflict = (
+        {'update_conflicts': True,
+         'unique_fields': ['origin_lat', 'origin_lng', 'dest_lat', 'dest_lng'],
+         'update_fields': ['distance_km', 'duration_minutes', 'toll_fee_idr', 'cached_at',
+                           'origin_cell', 'dest_cell', 'travel_mode']}
+        if overwrite else {'ignore_conflicts': True}
+    )
+    CachedDistance.objects.bulk_create(
+        [
+            CachedDistance(
+                origin_lat=key[0], origin_lng=key[1],
+                dest_lat=key[2], dest_lng=key[3],
+                distance_km=data['distance_km'],
+                duration_minutes=data['duration_minutes'],
+                toll_fee_idr=0,
+                travel_mode=mode_of(key) or '',
+            ).fill_cells()
+            for key, data in fetched.items()
+        ],
+        batch_size=1000,
+        **conflict,
+    )
+    if overwrite:
+        now = time.time()
+        route_cache.set_many({key: {**_route_data(data), "cached_at": now} for key, data in fetched.items()})
+
+
+def fetch_route_once(key, travel_mode='truck'):
+    """
+    Panggil TomTom untuk satu lane dengan coalescing: satu panggilan upstream
+    per lane yang sedang in-flight, baik antar thread (SingleFlight) maupun antar
+    worker (lock di shared cache). Hasil langsung diisi ke tingkat cache supaya
+    penunggu di worker lain bisa memakainya.
+
+    Return: (route_data | None, is_owner) -> hanya owner yang perlu menyimpan ke DB.
+    """
+    def upstream():
+        data = get_tomtom_route(*key, travel_mode=travel_mode)
+        if data:
+            route_cache.set_many({key: {**_route_data(data), "cached_at": time.time()}})
+        return data
+
+    def recheck():
+        entry = route_cache.peek(key)
+        return _route_data(entry) if entry else None
+
+    skey = cache_key(key)
+    (data, executed), is_leader = route_flight.do(skey, cache_lock_do, f"lock:{skey}", upstream, recheck)
+    return data, is_leader and executed
+
+
+def fetch_missing_routes(lane_modes):
+    """
+    Panggil TomTom untuk lane yang belum ada di cache, paralel & tanpa duplikat,
+    lalu simpan hasilnya sekaligus.
+
+    lane_modes: {lane_key: travel_mode}
+    Return: {lane_key: route_data} (lane yang gagal tidak ikut)
+    """
+    if not lane_modes:
+        return {}
+
+    max_workers = min(getattr(settings, 'TOMTOM_MAX_CONCURRENCY', 8), len(lane_modes))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            key: pool.submit(fetch_route_once, key, mode)
+            for key, mode in lane_modes.items()
+        }
+        results = {key: f.result() for key, f in futures.items()}
+
+    fetched = {key: data for key, (data, _) in results.items() if data}
+    store_routes({key: data for key, (data, is_owner) in results.items() if data and is_owner}, lane_modes)
+    return fetched
+
+
+def get_route(key, travel_mode='truck'):
+    """
+    Rute untuk satu lane: cache dulu, TomTom jika belum ada.
+    Return: (route_data | None, is_cached)
+    """
+    cached = lookup_cached_routes([key])
+    if key in cached:
+        return cached[key], True
+
+    route_data, is_owner = fetch_route_once(key, travel_mode)
+    if not route_data:
+        return None, False
+    if is_owner:
+        store_routes({key: route_data}, travel_mode)
+    return route_data, False
+
+
+# ===========================================================
+# MATRIX ROUTING (ISI CACHE MASSAL)
+# ===========================================================
+
+def matrix_tiles(n_origins, n_destinations, max_cells):
+    """Potong matrix N x M jadi tile (slice origin, slice destination) dengan <= max_cells cell."""
+    cols = min(n_destinations, max_cells)
+    rows = max(1, min(n_origins, max_cells // cols))
+    for i in range(0, n_origins, rows):
+        for j in range(0, n_destinations, cols):
+            yield slice(i, i + rows), slice(j, j + cols)
+
+
+def fill_route_matrix(origins, destinations, travel_mode='truck', max_cells=None, concurrency=None,
+                      overwrite=True, on_tile=None):
+    """
+    Isi CachedDistance untuk semua pasangan origins x destinations lewat Matrix
+    Routing TomTom: dipotong per tile, paralel terbatas, hasil tiap tile langsung
+    di-bulk_create (memori konstan berapa pun ukuran matrix-nya).
+
+    origins/destinations: list (lat, lng). Pasangan dengan titik yang sama dilewati.
+    on_tile(done, total, stored): callback progres (opsional).
+    Return: ringkasan {"tiles", "cells", "stored", "failed_tiles", "failed_cells"}.
+    """
+    origins = [lane_key(lat, lng, 0, 0)[:2] for lat, lng in origins]
+    destinations = [lane_key(0, 0, lat, lng)[2:] for lat, lng in destinations]
+    max_cells = max_cells or getattr(settings, 'TOMTOM_MATRIX_MAX_CELLS', 200)
+    concurrency = concurrency or getattr(settings, 'TOMTOM_MAX_CONCURRENCY', 8)
+    tiles = list(matrix_tiles(len(origins), len(destinations), max_cells))
+    client = get_client()
+
+    def run(tile):
+        rows, cols = tile
+        tile_origins, tile_dests = origins[rows], destinations[cols]
+        cells = client.calculate_matrix(tile_origins, tile_dests, travel_mode=travel_mode)
+        routes = {
+            (*tile_origins[i], *tile_dests[j]): data
+            for (i, j), data in cells.items()
+            if tile_origins[i] != tile_dests[j]
+        }
+        return routes, len(tile_origins) * len(tile_dests), len(cells)
+
+    summary = {"tiles": len(tiles), "cells": 0, "stored": 0, "failed_tiles": 0, "failed_cells": 0}
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(tiles)))) as pool:
+        futures = [pool.submit(run, tile) for tile in tiles]
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                routes, requested, succeeded = future.result()
+            except Exception as e:
+                # Tile gagal (circuit terbuka, kuota, dst.) tidak menggagalkan tile lain
+                logger.error(f"Matrix tile gagal: {e}")
+                summary["failed_tiles"] += 1
+                continue
+            store_routes(routes, travel_mode, overwrite=overwrite)
+            summary["cells"] += requested
+            summary["stored"] += len(routes)
+            summary["failed_cells"] += requested - succeeded
+            if on_tile:
+                on_tile(done, len(tiles), len(routes))
+    return summary
+
+
+# ===========================================================
+# WARMING CACHE (LANE TERSIBUK DARI HISTORI ORDER)
+# ===========================================================
+
+WARM_BUDGET_KEY = "tomtom:warm:calls:{day}"
+
+
+def top_order_lanes(days=90, limit=500, min_orders=2):
+    """
+    Lane (origin, destination) tersering di Order N hari terakhir, dikelompokkan
+    per koordinat yang sudah dibulatkan seperti lane key (agregasi di database).
+    Return: [(lane_key, jumlah_order), ...] urut dari yang tersibuk.
+    """
+    rows = (
+        Order.objects
+        .filter(created_at__gte=timezone.now() - timedelta(days=days))
+        .exclude(origin_lat=None).exclude(origin_lng=None).exclude(dest_lat=None).exclude(dest_lng=None)
+        .values(
+            o_lat=Round('origin_lat', COORD_PRECISION), o_lng=Round('origin_lng', COORD_PRECISION),
+            d_lat=Round('dest_lat', COORD_PRECISION), d_lng=Round('dest_lng', COORD_PRECISION),
+        )
+        .annotate(orders=Count('id'))
+        .filter(orders__gte=min_orders)
+        .order_by('-orders')[:limit]
+    )
+    lanes = {}
+    for row in rows:
+        key = lane_key(row['o_lat'], row['o_lng'], row['d_lat'], row['d_lng'])
+        if key[:2] != key[2:]:
+            lanes[key] = lanes.get(key, 0) + row['orders']
+    return sorted(lanes.items(), key=lambda item: -item[1])
+
+
+def lanes_needing_refresh(keys, refresh_before=0):
+    """
+    Lane yang belum ada di CachedDistance, atau akan kadaluarsa (ROUTE_CACHE_TTL)
+    dalam refresh_before detik. Satu query, urutan keys dipertahankan.
+    """
+    keys = list(keys)
+    if not keys:
+        return []
+    fresh_after = timezone.now() - timedelta(seconds=route_cache.ttl - refresh_before)
+    fresh = {
+        row
+        for row in CachedDistance.objects.filter(
+            origin_lat__in={k[0] for k in keys},
+            origin_lng__in={k[1] for k in keys},
+            dest_lat__in={k[2] for k in keys},
+            dest_lng__in={k[3] for k in keys},
+            cached_at__gte=fresh_after,
+        ).values_list('origin_lat', 'origin_lng', 'dest_lat', 'dest_lng')
+    }
+    return [key for key in keys if key not in fresh]
+
+
+def reserve_warm_budget(wanted, daily_budget):
+    """
+    Ambil jatah panggilan TomTom harian untuk warming dari shared cache, agar
+    beberapa run terjadwal (atau beberapa server) bersama-sama tidak melewati
+    kuota. Return: jumlah panggilan yang boleh dipakai (0..wanted).
+    """
+    if wanted <= 0:
+        return 0
+    cache = route_cache.shared
+    key = WARM_BUDGET_KEY.format(day=timezone.now().date().isoformat())
+    cache.add(key, 0, timeout=2 * 24 * 3600)
+    used = cache.incr(key, wanted)
+    granted = max(0, min(wanted, daily_budget - (used - wanted)))
+    if granted < wanted:
+        cache.decr(key, wanted - granted)
+    return granted
+
+
+def release_warm_budget(unused):
+    """Kembalikan jatah yang tidak terpakai (mis. run berhenti karena circuit terbuka)."""
+    if unused > 0:
+        key = WARM_BUDGET_KEY.format(day=timezone.now().date().isoformat())
+        try:
+            route_cache.shared.decr(key, unused)
+        except ValueError:
+            pass  # Key sudah kadaluarsa / hari berganti
+
+
+def warm_routes(lane_modes, concurrency=None, batch_size=100, on_progress=None):
+    """
+    Fetch ulang rute dari TomTom untuk lane yang diberikan (menimpa baris lama),
+    paralel terbatas, disimpan per batch. Berhenti lebih awal begitu circuit
+    TomTom terbuka supaya tidak membuang kuota / membanjiri log.
+
+    lane_modes: {lane_key: travel_mode}
+    on_progress(done, total, stored): callback progres (opsional).
+    Return: {"requested", "called", "stored", "failed", "skipped"}.
+    """
+    lane_modes = dict(lane_modes)
+    concurrency = max(1, min(concurrency or getattr(settings, 'TOMTOM_MAX_CONCURRENCY', 8), len(lane_modes) or 1))
+    client = get_client()
+    circuit_open = threading.Event()
+
+    def run(key, mode):
+        if circuit_open.is_set():
+            return None, False
+        try:
+            return client.calculate_route(*key, travel_mode=mode), True
+        except CircuitOpenError:
+            circuit_open.set()
+            return None, False
+        except Exception as e:
+            logger.error(f"Warming rute gagal {key[0]},{key[1]} -> {key[2]},{key[3]}: {e}")
+            return None, True
+
+    summary = {"requested": len(lane_modes), "called": 0, "stored": 0, "failed": 0, "skipped": 0}
+    pending = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(run, key, mode): key for key, mode in lane_modes.items()}
+        for done, future in enumerate(as_completed(futures), start=1):
+            key = futures[future]
+            data, called = future.result()
+            summary["called"] += called
+            if data:
+                pending[key] = data
+            elif called:
+                summary["failed"] += 1
+            else:
+                summary["skipped"] += 1
+            if len(pending) >= batch_size or (done == len(futures) and pending):
+                store_routes(pending, lane_modes, overwrite=True)
+                summary["stored"] += len(pending)
+                pending = {}
+            if on_progress:
+                on_progress(done, len(futures), summary["stored"])
+
+    if circuit_open.is_set():
+        logger.warning(f"Warming rute dihentikan: circuit TomTom terbuka ({summary['skipped']} lane dilewati)")
+    return summary
+
+
+# ===========================================================
+# VERSI ASYNC (ASGI)
+# ===========================================================
+
+async def aget_tomtom_route(lat1, lon1, lat2, lon2, travel_mode='truck'):
+    try:
+        return await get_async_client().calculate_route(lat1, lon1, lat2, lon2, travel_mode=travel_mode)
+    except CircuitOpenError as e:
+        logger.warning(f"TomTom API dilewati: {e}")
+        return None
+    except Exception as e:
+        logger.error(f"TomTom API Error: {e}")
+        return None
+
+
+async def afetch_route_once(key, travel_mode='truck'):
+    """Padanan async fetch_route_once (coalescing per event loop & antar worker)."""
+    async def upstream():
+        data = await aget_tomtom_route(*key, travel_mode=travel_mode)
+        if data:
+            entry = {**_route_data(data), "cached_at": time.time()}
+            await sync_to_async(route_cache.set_many, thread_sensitive=False)({key: entry})
+        return data
+
+    async def recheck():
+        entry = await sync_to_async(route_cache.peek, thread_sensitive=False)(key)
+        return _route_data(entry) if entry else None
+
+    skey = cache_key(key)
+    (data, executed), is_leader = await async_route_flight.do(
+        skey, async_cache_lock_do, f"lock:{skey}", upstream, recheck
+    )
+    return data, is_leader and executed
+
+
+async def aget_route(key, travel_mode='truck'):
+    """
+    Padanan async get_route: lookup cache/DB berjalan di thread (cepat),
+    sedangkan panggilan TomTom yang lambat berjalan native di event loop.
+    """
+    cached = await sync_to_async(lookup_cached_routes)([key])
+    if key in cached:
+        return cached[key], True
+
+    route_data, is_owner = await afetch_route_once(key, travel_mode)
+    if not route_data:
+        return None, False
+    if is_owner:
+        await sync_to_async(store_routes)({key: route_data}, travel_mode)
+    return route_data, False
@@ -1,9 +1,12 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.db import transaction 
+from decimal import Decimal
 from .models import (
     Fleet, MasterPricingRule, MitraArmada, ArmadaKendaraan,
     Order, OrderCharge, Promo, CustomerProfile
 )
+from .quote_token import InvalidQuoteToken, load_quote_token
 
 # =================================================================
 # 1. MASTER DATA (FLEET & PROMO)
@@ -102,11 +105,45 @@ class OrderChargeSerializer(serializers.ModelSerializer):
         fields = ['id', 'order', 'category', 'charge_name', 'amount', 'proof_image', 'is_verified', 'admin_notes', 'created_at']
         read_only_fields = ['is_verified', 'admin_notes'] # Driver tidak bisa verifikasi sendiri
 
-class OrderSerializer(serializers.ModelSerializer):
+def requested_fields(request):
+    """Set nama field dari ?fields=a,b,c (None jika parameter tidak dikirim)."""
+    if request is None:
+        return None
+    raw = request.query_params.get('fields')
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldset: ?fields=id,status,final_total_price -> hanya field tersebut
+    yang diserialisasi. Nama field yang tidak dikenal diabaikan; jika tidak ada
+    satu pun yang dikenal, semua field ditampilkan.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = (requested_fields(self.context.get('request')) or set()) & set(self.fields)
+        if wanted:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+
+
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Serializer LENGKAP untuk Detail Order (Customer View).
     Menampilkan status, driver info, dan total biaya.
+    Mendukung ?fields=... (lihat SparseFieldsMixin).
     """
+    # Relasi yang perlu di-join / di-prefetch per field output (lihat eager_load)
+    SELECT_RELATED = {
+        'driver': ('driver_name', 'driver_phone'),
+        'vehicle': ('vehicle_nopol', 'vehicle_photo'),
+    }
+    PREFETCH_RELATED = {
+        'charges': ('charges',),
+    }
+
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     driver_name = serializers.CharField(source='driver.full_name_ktp', read_only=True)
     driver_phone = serializers.CharField(source='driver.phone_number', read_only=True)
@@ -118,7 +155,7 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = [
-            'id', 'status', 'status_display', 'service_type',
+            'id', 'tracking_code', 'status', 'status_display', 'service_type',
             'origin_city', 'origin_address', 'dest_city', 'dest_address',
             'total_distance_km', 'item_description',
             
@@ -136,24 +173,96 @@ class OrderSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at'
         ]
 
+    @classmethod
+    def eager_load(cls, queryset, fields=None):
+        """
+        select_related / prefetch_related hanya untuk relasi yang benar-benar
+        ditampilkan -> jumlah query tetap (1 + 1 prefetch charges) per halaman.
+        """
+        # Sama dengan SparseFieldsMixin: hanya nama yang dikenal, kosong = semua field
+        fields = set(fields or ()).intersection(cls.Meta.fields) or set(cls.Meta.fields)
+        joins = [rel for rel, names in cls.SELECT_RELATED.items() if fields.intersection(names)]
+        prefetches = [rel for rel, names in cls.PREFETCH_RELATED.items() if fields.intersection(names)]
+        if joins:
+            queryset = queryset.select_related(*joins)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
 class OrderCreateSerializer(serializers.ModelSerializer):
     """
     Serializer KHUSUS untuk Membuat Order Baru (Input User).
     Lebih ringkas, hanya field yang perlu diinput user.
     """
-    vehicle_type_id = serializers.IntegerField(write_only=True) # Input ID Armada dari Frontend
+    vehicle_type_id = serializers.IntegerField(write_only=True, required=False) # Input ID Armada dari Frontend
+    # Token dari /api/simulasi-harga/: jarak, armada & harga diambil dari sini (tanpa hitung ulang)
+    quote_token = serializers.CharField(write_only=True, required=False)
 
     class Meta:
         model = Order
         fields = [
-            'id', 
+            'id', 'tracking_code', # Kode resi asli (bisa lebih panjang dari 8 karakter jika tabrakan)
             'origin_city', 'origin_address', 'origin_lat', 'origin_lng',
             'dest_city', 'dest_address', 'dest_lat', 'dest_lng',
             'total_distance_km', 
             'vehicle_type_id', # Input
+            'quote_token', # Input (opsional, disarankan)
             'service_type', 'item_description', 
             'is_doc_return', 'is_labor_needed',
             'factory_do_photo'
         ]
-        read_only_fields = ['id', 'status']
+        read_only_fields = ['id', 'tracking_code', 'status']
+
+    def validate(self, attrs):
+        token = attrs.pop('quote_token', None)
+        if not token:
+            if attrs.get('vehicle_type_id') is None:
+                raise serializers.ValidationError({"vehicle_type_id": "Wajib diisi jika tanpa quote_token."})
+            return attrs
+
+        try:
+            quote = load_quote_token(token)
+        except InvalidQuoteToken as e:
+            raise serializers.ValidationError({"quote_token": str(e)})
+
+        if attrs.get('vehicle_type_id') not in (None, quote.fleet_id):
+            raise serializers.ValidationError({"vehicle_type_id": "Armada berbeda dengan hasil simulasi."})
+        # Koordinat order harus lane yang sama dengan simulasi; jika kosong diisi dari token
+        for name, value in zip(('origin_lat', 'origin_lng', 'dest_lat', 'dest_lng'), quote.lane):
+            given = attrs.get(name)
+            if given is None:
+                attrs[name] = float(value)
+            elif round(Decimal(given), 4) != value:
+                raise serializers.ValidationError({name: "Koordinat berbeda dengan hasil simulasi."})
+
+        attrs['vehicle_type_id'] = quote.fleet_id
+        attrs['total_distance_km'] = quote.distance_km
+        attrs['quote'] = quote
+        return attrs
+
+    def create(self, validated_data):
+        validated_data.pop('vehicle_type_id', None)
+        validated_data.pop('quote', None)
+        return super().create(validated_data)
+
+class OrderTransitionSerializer(serializers.Serializer):
+    """Input bulk transisi status order (OrderTransitionView), divalidasi state machine di order_lifecycle.py."""
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+    orders = serializers.ListField(child=serializers.UUIDField(), allow_empty=False)
+    driver_id = serializers.PrimaryKeyRelatedField(
+        queryset=MitraArmada.objects.all(), source='driver', required=False)
+    vehicle_id = serializers.PrimaryKeyRelatedField(
+        queryset=ArmadaKendaraan.objects.all(), source='vehicle', required=False)
+    cancellation_reason = serializers.CharField(required=False)
+
+    def validate_orders(self, value):
+        limit = getattr(settings, 'ORDER_TRANSITION_MAX_BATCH', 500)
+        if len(value) > limit:
+            raise serializers.ValidationError(f"Maksimal {limit} order per request.")
+        return value
 
+    def validate(self, attrs):
+        vehicle, driver = attrs.get('vehicle'), attrs.get('driver')
+        if vehicle is not None and (driver is None or vehicle.mitra_id != driver.pk):
+            raise serializers.ValidationError({"vehicle_id": "Wajib bersama driver_id pemilik kendaraan."})
+        return attrs
@@ -0,0 +1,61 @@
+# backend/logistics/signals.py
+
+"""Invalidasi cache/index saat master data atau order berubah."""
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from .dispatch import dispatch_index
+from .gazetteer import bump_version
+from .models import (
+    ArmadaKendaraan, GazetteerPlace, Fleet, MasterPricingRule, MitraArmada, Order, OrderCharge,
+    ORDER_OPEN_STATUSES, apply_charge_totals,
+)
+from .order_events import publish_order_event
+from .pricing_snapshot import pricing_snapshot
+from .tracking import invalidate_tracking
+
+
+@receiver([post_save, post_delete], sender=GazetteerPlace)
+def gazetteer_changed(sender, **kwargs):
+    bump_version()
+
+
+@receiver([post_save, post_delete], sender=Fleet)
+@receiver([post_save, post_delete], sender=MasterPricingRule)
+def pricing_master_changed(sender, **kwargs):
+    # Setelah commit: worker lain tidak boleh membangun snapshot dari data yang belum ter-commit
+    transaction.on_commit(pricing_snapshot.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Fleet)
+@receiver([post_save, post_delete], sender=ArmadaKendaraan)
+@receiver([post_save, post_delete], sender=MitraArmada)
+def dispatch_source_changed(sender, **kwargs):
+    transaction.on_commit(dispatch_index.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Order)
+def order_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_tracking(instance))
+
+
+@receiver(post_save, sender=Order)
+def order_status_changed(sender, instance, **kwargs):
+    if instance.status_changed:
+        instance._loaded_status = instance.status
+        transaction.on_commit(lambda: publish_order_event(instance))
+        if instance.driver_id and instance.status in ORDER_OPEN_STATUSES:
+            # Driver sibuk: keluarkan dari index dispatch proses ini (worker lain saat refresh berkala)
+            transaction.on_commit(lambda: dispatch_index.driver_busy(instance.driver_id))
+
+
+@receiver(pre_delete, sender=OrderCharge)
+def order_charge_deleted(sender, instance, **kwargs):
+    # Juga untuk queryset.delete() & cascade (save() ditangani OrderCharge.save). pre_delete
+    # berjalan di transaksi delete: kontribusi dibaca dari DB dengan lock yang sama seperti
+    # OrderCharge.save, bukan dari instance yang bisa sudah basi (mis. verifikasi di request lain)
+    before = OrderCharge.objects.select_for_update().filter(pk=instance.pk).values_list(
+        *OrderCharge.TOTAL_FIELDS).first()
+    apply_charge_totals(before, None)
@@ -0,0 +1,159 @@
+# backend/logistics/singleflight.py
+
+"""
+Request coalescing ("single-flight") untuk panggilan upstream yang mahal (TomTom).
+
+- SingleFlight  : antar thread dalam satu worker. Untuk satu key hanya ada satu
+                  panggilan yang berjalan; thread lain menunggu & memakai hasilnya.
+- cache_lock_do : antar worker/proses, lewat lock `cache.add()` di Django cache
+                  (butuh backend shared seperti Redis/Memcached agar efektif).
+
+AsyncSingleFlight & async_cache_lock_do adalah padanan untuk view async (ASGI).
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+import asyncio
+import threading
+import time
+import uuid
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Jalankan fn(*args, **kwargs) sekali per key yang sedang in-flight.
+        Return: (result, is_leader) -> is_leader False berarti hasil dipinjam
+        dari thread lain. Exception dari leader diteruskan ke semua penunggu.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result, True
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+def cache_lock_do(lock_key, fn, recheck, timeout=None, poll_interval=0.1):
+    """
+    Koordinasi antar worker: hanya pemegang lock yang menjalankan fn().
+    Worker lain mem-poll recheck() (mis. baca shared cache) sampai hasil muncul
+    atau lock dilepas; jika tetap kosong (pemegang lock gagal/timeout),
+    fn() dijalankan sendiri.
+
+    Return: (result, executed) -> executed True jika fn() dijalankan di sini.
+    """
+    cache = caches[getattr(settings, 'ROUTE_CACHE_ALIAS', 'default')]
+    timeout = timeout or getattr(settings, 'ROUTE_LOCK_TIMEOUT', 15)
+    token = uuid.uuid4().hex
+
+    if cache.add(lock_key, token, timeout):
+        try:
+            return fn(), True
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        result = recheck()
+        if result is not None:
+            return result, False
+        if cache.get(lock_key) is None:
+            break
+
+    result = recheck()
+    if result is not None:
+        return result, False
+    return fn(), True
+
+
+class AsyncSingleFlight:
+    """Padanan SingleFlight untuk coroutine dalam satu event loop."""
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, fn, *args, **kwargs):
+        future = self._calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn(*args, **kwargs)
+        except Exception as e:
+            future.set_exception(e)
+            # Exception sudah diteruskan ke penunggu; tandai sudah dibaca
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, True
+        finally:
+            self._calls.pop(key, None)
+            if not future.done():
+                future.cancel()
+
+
+async def async_cache_lock_do(lock_key, fn, recheck, timeout=None, poll_interval=0.1):
+    """Versi async cache_lock_do: fn & recheck berupa coroutine function."""
+    cache = caches[getattr(settings, 'ROUTE_CACHE_ALIAS', 'default')]
+    timeout = timeout or getattr(settings, 'ROUTE_LOCK_TIMEOUT', 15)
+    token = uuid.uuid4().hex
+
+    if await cache.aadd(lock_key, token, timeout):
+        try:
+            return await fn(), True
+        finally:
+            if await cache.aget(lock_key) == token:
+                await cache.adelete(lock_key)
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(poll_interval)
+        result = await recheck()
+        if result is not None:
+            return result, False
+        if await cache.aget(lock_key) is None:
+            break
+
+    result = await recheck()
+    if result is not None:
+        return result, False
+    return await fn(), True
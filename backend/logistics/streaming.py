@@ -0,0 +1,39 @@
+# backend/logistics/streaming.py
+
+"""
+StreamingHttpResponse dari generator sync yang tetap streaming di WSGI & ASGI.
+
+Di ASGI Django mengonsumsi iterator sync dengan sync_to_async(list): seluruh
+isi dibangun dulu di memori sebelum byte pertama dikirim. Untuk request ASGI
+generator dibungkus async iterator yang mengambil BATCH potong per pindah
+thread. thread_sensitive=True: semua potong dibaca di thread sync milik
+request, sama dengan view-nya, jadi koneksi DB / server-side cursor tetap satu.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+import itertools
+
+BATCH = 100  # Potong per hop ke thread sync
+
+
+def _next_batch(iterator):
+    return list(itertools.islice(iterator, BATCH))
+
+
+async def iterate_in_thread(iterator):
+    """Async iterator atas iterator sync; iterator dijalankan di thread sync request."""
+    iterator = iter(iterator)
+    while True:
+        parts = await sync_to_async(_next_batch, thread_sensitive=True)(iterator)
+        if not parts:
+            break
+        yield parts[0][:0].join(parts)  # str / bytes, satu pesan ASGI per batch
+
+
+def streaming_response(request, iterator, **kwargs):
+    """StreamingHttpResponse yang streaming di WSGI maupun ASGI (`request` dari view)."""
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        iterator = iterate_in_thread(iterator)
+    return StreamingHttpResponse(iterator, **kwargs)
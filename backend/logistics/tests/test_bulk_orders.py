@@ -0,0 +1,86 @@
+# backend/logistics/tests/test_bulk_orders.py
+
+"""Upload order massal: angka aneh dan error tak terduga jadi baris error, stream tidak putus (WSGI & ASGI)."""
+
+from decimal import Decimal
+from unittest import mock
+import json
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from logistics import bulk_orders
+from logistics.bulk_orders import import_orders, read_rows
+from logistics.models import Fleet, MasterPricingRule, Order
+from logistics.pricing_snapshot import pricing_snapshot
+
+HEADER = "origin_city,origin_address,dest_city,dest_address,item_description,total_distance_km,vehicle_type_id,dest_lat"
+
+
+class BulkOrderImportTests(TestCase):
+    def setUp(self):
+        self.fleet = Fleet.objects.create(name="CDE", fleet_type="ENGKEL")
+        MasterPricingRule.objects.create(
+            fleet_type="ENGKEL", base_fare=Decimal("150000.00"), base_rate_per_km=Decimal("4500.00"),
+        )
+        pricing_snapshot.invalidate()  # on_commit signal master data tidak jalan di TestCase
+        self.customer = User.objects.create_user("shipper", password="x")
+
+    def run_import(self, *lines):
+        upload = SimpleUploadedFile("orders.csv", "\n".join((HEADER,) + lines).encode())
+        return list(import_orders(read_rows(upload), self.customer))
+
+    def test_overflowing_numbers_are_row_errors(self):
+        results = self.run_import(
+            "A,a,B,b,x,inf,inf,1e400",
+            "A,a,B,b,x,1e400,1e400,",
+            f"A,a,B,b,x,10,{self.fleet.id},",
+        )
+        self.assertEqual(set(results[0]["errors"]), {"total_distance_km", "vehicle_type_id", "dest_lat"})
+        self.assertEqual(set(results[1]["errors"]), {"total_distance_km", "vehicle_type_id"})
+        self.assertTrue(results[2]["ok"])
+        self.assertEqual(results[-1]["summary"], {"rows": 3, "created": 1, "failed": 2, "truncated": False})
+
+    @override_settings(BULK_ORDER_CHUNK_SIZE=1)
+    def test_unexpected_chunk_error_does_not_stop_stream(self):
+        import_chunk = bulk_orders._import_chunk
+        calls = []
+
+        def flaky_chunk(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                raise RuntimeError("boom")
+            return import_chunk(*args)
+
+        with mock.patch.object(bulk_orders, "_import_chunk", flaky_chunk), self.assertLogs(bulk_orders.logger, "ERROR"):
+            results = self.run_import(f"A,a,B,b,x,10,{self.fleet.id},", f"A,a,B,b,x,12,{self.fleet.id},")
+        self.assertEqual(results[0], {"row": 2, "ok": False, "errors": {"row": "Gagal diproses, coba upload ulang baris ini."}})
+        self.assertTrue(results[1]["ok"])
+        self.assertEqual(results[-1]["summary"]["created"], 1)
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class BulkOrderUploadAsgiTests(TransactionTestCase):
+    def setUp(self):
+        fleet = Fleet.objects.create(name="CDE", fleet_type="ENGKEL")
+        MasterPricingRule.objects.create(
+            fleet_type="ENGKEL", base_fare=Decimal("150000.00"), base_rate_per_km=Decimal("4500.00"),
+        )
+        pricing_snapshot.invalidate()
+        self.fleet_id = fleet.id
+        self.token = str(RefreshToken.for_user(User.objects.create_user("shipper", password="x")).access_token)
+
+    async def test_asgi_response_streams_async(self):
+        lines = [f"A,a{i},B,b,x,10,{self.fleet_id}," for i in range(250)]
+        upload = SimpleUploadedFile("orders.csv", "\n".join([HEADER] + lines).encode())
+        response = await AsyncClient().post(
+            "/api/orders/bulk/", {"file": upload}, headers={"Authorization": f"Bearer {self.token}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)  # Bukan sync_to_async(list) atas generator sync
+        body = b"".join([part async for part in response.streaming_content]).decode()
+        results = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(results[-1]["summary"]["created"], 250)
+        self.assertEqual(await Order.objects.acount(), 250)
@@ -0,0 +1,32 @@
+# backend/logistics/tests/test_estimator.py
+
+"""Estimator offline: kalibrasi ulang tidak dijalankan di request yang sedang fallback."""
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from logistics import estimator as estimator_module
+from logistics.estimator import CACHE_KEY, DEFAULT_CIRCUITY, LOCK_KEY, EstimatorHolder
+
+
+class EstimatorHolderTests(SimpleTestCase):
+    def setUp(self):
+        self.holder = EstimatorHolder()
+        self.holder.cache.delete_many([CACHE_KEY, LOCK_KEY])
+        self.addCleanup(self.holder.cache.delete_many, [CACHE_KEY, LOCK_KEY])
+
+    @mock.patch.object(estimator_module, "calibrate_from_db", return_value=estimator_module.fit_calibration([], [], [], [], [], [], []))
+    def test_get_serves_default_while_calibrating_in_background(self, calibrate):
+        with mock.patch.object(estimator_module.threading, "Thread") as thread:
+            estimator = self.holder.get()
+            self.holder._next_check = 0  # Request berikutnya: lock masih dipegang, tidak memicu fit lagi
+            self.holder.get()
+        calibrate.assert_not_called()
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+        self.assertEqual(estimator.circuity[0, 0], DEFAULT_CIRCUITY)
+
+        thread.call_args.kwargs["target"]()  # Isi thread latar
+        calibrate.assert_called_once()
+        self.assertIsNone(self.holder.cache.get(LOCK_KEY))
@@ -0,0 +1,83 @@
+# backend/logistics/tests/test_gps_buffer.py
+
+"""Buffer GPS: timestamp / koordinat ngawur tidak masuk, flush yang gagal tidak menghilangkan titik."""
+
+from unittest import mock
+import time
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import OperationalError
+from django.test import TestCase
+
+from logistics.gps import MISSING, POINT_DTYPE, LocationBuffer, decode_batch, read_body
+from logistics.models import DriverLocation, DriverPosition, MitraArmada
+
+DAY_MS = 86_400_000
+
+
+def points(*timestamps):
+    batch = np.zeros(len(timestamps), dtype=POINT_DTYPE)
+    batch['t'] = timestamps
+    batch['lat'] = -6_200_000 + np.arange(len(timestamps)) * 1000
+    batch['lng'] = 106_816_600
+    batch['speed'] = batch['heading'] = -1
+    return batch
+
+
+class DecodeBatchClockTests(TestCase):
+    def test_timestamps_outside_clock_window_are_dropped(self):
+        now = int(time.time() * 1000)
+        decoded = decode_batch({
+            "t": [now - 2 * DAY_MS, now - 1000, now, now + 2 * DAY_MS, 2 ** 62],
+            "lat": [-6.2] * 5, "lng": [106.8] * 5,
+        })
+        self.assertEqual(decoded['t'].tolist(), [now - 1000, now])
+
+    def test_non_finite_values_are_rejected(self):
+        now = int(time.time() * 1000)
+        body = (
+            f'{{"t": [{now - 4000}, {now - 3000}, {now - 2000}, {now - 1000}, {now}], '
+            '"lat": [NaN, -6.2, 1e300, -6.2, -Infinity], "lng": [106.8, Infinity, 106.8, 106.8, 106.8], '
+            '"speed": [40, 40, 40, NaN, 40], "heading": [90, 90, 90, Infinity, 90]}'
+        ).encode()
+        decoded = decode_batch(read_body(body))
+        self.assertEqual(decoded['t'].tolist(), [now - 1000])
+        self.assertEqual((int(decoded['lat'][0]), int(decoded['speed'][0]), int(decoded['heading'][0])),
+                         (-6_200_000, MISSING, MISSING))
+
+
+class LocationBufferFlushTests(TestCase):
+    def setUp(self):
+        self.drivers = [
+            MitraArmada.objects.create(
+                user=User.objects.create_user(f"driver{i}", password="x"), full_name_ktp=f"Driver {i}",
+                phone_number=f"0812000{i}", emergency_name="X", emergency_phone="0813",
+            ).id
+            for i in range(2)
+        ]
+        self.buffer = LocationBuffer(auto_flush=False)
+        self.now = int(time.time() * 1000)
+
+    def test_failed_write_requeues_points(self):
+        with self.settings(GPS_SIMPLIFY_TOLERANCE_M=0):
+            for driver_id in self.drivers:
+                self.buffer.ingest(driver_id, points(self.now - 3000, self.now - 2000))
+            with mock.patch.object(DriverLocation.objects, "bulk_create", side_effect=OperationalError("db down")):
+                with self.assertRaises(OperationalError):
+                    self.buffer.flush()
+            self.assertEqual(self.buffer.stats()["pending"], 4)
+
+            self.buffer.ingest(self.drivers[0], points(self.now - 1000))
+            self.assertEqual(self.buffer.flush(), 5)
+        self.assertEqual(DriverLocation.objects.count(), 5)
+        self.assertEqual(DriverPosition.objects.count(), 2)
+        self.assertEqual(self.buffer.stats()["pending"], 0)
+
+    def test_unconvertible_timestamp_does_not_lose_other_drivers(self):
+        with self.settings(GPS_SIMPLIFY_TOLERANCE_M=0):
+            self.buffer.ingest(self.drivers[0], points(2 ** 62))  # Tidak lewat decode_batch
+            self.buffer.ingest(self.drivers[1], points(self.now - 1000, self.now))
+            with self.assertLogs("logistics.gps", "WARNING"):
+                self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(list(DriverLocation.objects.values_list("driver_id", flat=True).distinct()), [self.drivers[1]])
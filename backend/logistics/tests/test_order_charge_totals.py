@@ -0,0 +1,44 @@
+# backend/logistics/tests/test_order_charge_totals.py
+
+"""Total charge di Order tetap sesuai isi DB walau charge dihapus lewat instance yang basi."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from logistics.models import Order, OrderCharge
+
+
+class OrderChargeDeleteTests(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(
+            customer=User.objects.create_user("shipper", password="x"),
+            origin_city="Jakarta", origin_address="a", dest_city="Bandung", dest_address="b",
+            item_description="x", base_price=Decimal("1000.00"), final_total_price=Decimal("1000.00"),
+        )
+
+    def totals(self):
+        self.order.refresh_from_db()
+        return self.order.reimbursement_total, self.order.final_total_price
+
+    def test_delete_stale_unverified_instance_removes_verified_amount(self):
+        charge = OrderCharge.objects.create(order=self.order, charge_name="Tol", amount=Decimal("250.00"))
+        stale = OrderCharge.objects.get(pk=charge.pk)
+        charge.is_verified = True
+        charge.save()  # Diverifikasi admin di request lain
+        self.assertEqual(self.totals(), (Decimal("250.00"), Decimal("1250.00")))
+
+        stale.delete()
+        self.assertEqual(self.totals(), (Decimal("0.00"), Decimal("1000.00")))
+
+    def test_delete_stale_amount_and_queryset_delete(self):
+        charge = OrderCharge.objects.create(order=self.order, charge_name="Tol", amount=Decimal("250.00"), is_verified=True)
+        OrderCharge.objects.create(order=self.order, charge_name="Parkir", amount=Decimal("50.00"), is_verified=True)
+        OrderCharge.objects.filter(pk=charge.pk).update(amount=Decimal("300.00"))
+        Order.objects.filter(pk=self.order.pk).update(reimbursement_total=Decimal("350.00"), final_total_price=Decimal("1350.00"))
+
+        charge.delete()  # Instance masih berisi 250
+        self.assertEqual(self.totals(), (Decimal("50.00"), Decimal("1050.00")))
+        OrderCharge.objects.filter(order=self.order).delete()
+        self.assertEqual(self.totals(), (Decimal("0.00"), Decimal("1000.00")))
@@ -0,0 +1,63 @@
+# backend/logistics/tests/test_order_export.py
+
+"""Export order: sel formula CSV di-escape, response tetap streaming di ASGI."""
+
+from decimal import Decimal
+import csv
+import io
+
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from logistics.models import Order, OrderCharge
+from logistics.order_export import COLUMNS
+
+
+ORDER = dict(
+    origin_city="Jakarta", origin_address="a", dest_city="Bandung", dest_address="b",
+    item_description="x", base_price=Decimal("1000.00"), final_total_price=Decimal("1000.00"),
+)
+
+
+def read_csv(content):
+    return list(csv.DictReader(io.StringIO(content.decode("utf-8-sig"))))
+
+
+class OrderExportCsvTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("finance", password="x", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_formula_cells_are_escaped(self):
+        customer = User.objects.create_user("=HYPERLINK(\"http://x\")", password="x", email="+62@x.id")
+        order = Order.objects.create(**{**ORDER, "customer": customer, "origin_city": "@SUM(A1)", "cancellation_reason": "-1+1"})
+        OrderCharge.objects.create(order=order, charge_name="=cmd", amount=Decimal("2500.00"))
+
+        response = self.client.get("/api/orders/export/?type=csv")
+        row = read_csv(b"".join(response.streaming_content))[0]
+        self.assertEqual(row["customer"], "'=HYPERLINK(\"http://x\")")
+        self.assertEqual(row["customer_email"], "'+62@x.id")
+        self.assertEqual(row["origin_city"], "'@SUM(A1)")
+        self.assertEqual(row["cancellation_reason"], "'-1+1")
+        self.assertTrue(row["charge_details"].startswith("'=cmd"))
+        self.assertEqual(row["dest_city"], "Bandung")
+        self.assertEqual(row["base_price"], "1000.00")  # Angka tidak diubah
+
+
+class OrderExportAsgiTests(TransactionTestCase):
+    async def test_asgi_response_streams_async(self):
+        admin = await User.objects.acreate(username="finance", is_staff=True, is_superuser=True)
+        for _ in range(3):
+            await Order.objects.acreate(customer=admin, **ORDER)
+        client = AsyncClient()
+        await client.aforce_login(admin)
+        response = await client.post("/admin/logistics/order/", {
+            "action": "export_csv", "_selected_action": [str(pk) async for pk in Order.objects.values_list("pk", flat=True)],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        rows = read_csv(b"".join([part async for part in response.streaming_content]))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(tuple(rows[0]), COLUMNS)
@@ -0,0 +1,58 @@
+# backend/logistics/tests/test_order_serializers.py
+
+"""API order customer: kode resi asli di respons, sparse fieldset mengabaikan nama field yang tidak dikenal."""
+
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from logistics.models import Fleet, MasterPricingRule, Order
+from logistics.pricing_snapshot import pricing_snapshot
+
+ORDER = {
+    "origin_city": "Jakarta", "origin_address": "Jl. A", "dest_city": "Bandung", "dest_address": "Jl. B",
+    "item_description": "Kardus", "total_distance_km": "150",
+}
+
+
+class OrderApiTests(TestCase):
+    def setUp(self):
+        self.fleet = Fleet.objects.create(name="CDE", fleet_type="ENGKEL")
+        MasterPricingRule.objects.create(
+            fleet_type="ENGKEL", base_fare=Decimal("150000.00"), base_rate_per_km=Decimal("4500.00"),
+        )
+        pricing_snapshot.invalidate()  # on_commit signal master data tidak jalan di TestCase
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("shipper", password="x"))
+
+    def create_order(self):
+        response = self.client.post("/api/orders/", {**ORDER, "vehicle_type_id": self.fleet.id}, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def test_create_returns_real_tracking_code(self):
+        body = self.create_order()
+        order = Order.objects.get(pk=body["id"])
+        self.assertTrue(order.tracking_code)
+        self.assertEqual(body["tracking_code"], order.tracking_code)
+
+        detail = self.client.get(f"/api/orders/{order.pk}/").json()
+        self.assertEqual(detail["tracking_code"], order.tracking_code)
+
+    def test_tracking_code_is_read_only(self):
+        response = self.client.post(
+            "/api/orders/", {**ORDER, "vehicle_type_id": self.fleet.id, "tracking_code": "PALSU123"}, format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertNotEqual(response.json()["tracking_code"], "PALSU123")
+
+    def test_unknown_sparse_fields_are_ignored(self):
+        self.create_order()
+        full = self.client.get("/api/orders/").json()["results"]
+        rows = self.client.get("/api/orders/", {"fields": "bogus"}).json()["results"]
+        self.assertEqual(rows, full)
+
+        rows = self.client.get("/api/orders/", {"fields": "id,bogus"}).json()["results"]
+        self.assertEqual(set(rows[0]), {"id"})
@@ -0,0 +1,74 @@
+# backend/logistics/tests/test_order_streams.py
+
+"""Stream status order (WebSocket & SSE): snapshot dibaca setelah subscribe, order yang hilang tidak memutus stream."""
+
+from unittest import mock
+import asyncio
+import json
+
+from django.test import SimpleTestCase
+
+from logistics.async_views import event_stream, snapshot_loader
+from logistics.order_events import InProcessBroker
+from logistics.websocket import websocket_application
+
+TOPIC = "order:abc12345"
+
+
+class OrderStreamTests(SimpleTestCase):
+    def setUp(self):
+        self.broker = InProcessBroker()
+        patcher = mock.patch("logistics.async_views.get_broker", return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch("logistics.websocket.get_broker", return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def lookups(self, *bodies):
+        """tracking_snapshot palsu; lookup pertama diikuti transisi yang dipublish sebelum ada subscriber."""
+        bodies = iter(bodies)
+
+        async def tracking_snapshot(raw_code):
+            body = next(bodies)
+            if body == {"status": "Menunggu"}:
+                self.broker.publish(TOPIC, {"status": "Driver Ditugaskan"})
+            return (TOPIC, body) if body is not None else None
+
+        return (mock.patch("logistics.websocket.tracking_snapshot", tracking_snapshot),
+                mock.patch("logistics.async_views.tracking_snapshot", tracking_snapshot))
+
+    async def test_websocket_snapshot_read_after_subscribe(self):
+        sent, done = [], asyncio.Event()
+        messages = iter([{"type": "websocket.connect"}])
+
+        async def receive():
+            message = next(messages, None)
+            if message is None:
+                await done.wait()
+                return {"type": "websocket.disconnect"}
+            return message
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "websocket.send":
+                done.set()
+
+        ws_patch, views_patch = self.lookups({"status": "Menunggu"}, {"status": "Driver Ditugaskan"})
+        with ws_patch, views_patch:
+            scope = {"type": "websocket", "path": "/ws/tracking/abc12345/"}
+            await asyncio.wait_for(websocket_application(scope, receive, send), 5)
+
+        self.assertEqual(sent[0], {"type": "websocket.accept"})
+        self.assertEqual(json.loads(sent[1]["text"]), {"event": "snapshot", "data": {"status": "Driver Ditugaskan"}})
+
+    async def test_sse_skips_snapshot_when_order_is_gone(self):
+        _, views_patch = self.lookups(None)
+        with views_patch, self.settings(ORDER_EVENTS_HEARTBEAT=0.01):
+            stream = event_stream([TOPIC], snapshot_loader("abc12345"))
+            try:
+                first = await stream.__anext__()
+                second = await asyncio.wait_for(stream.__anext__(), 5)
+            finally:
+                await stream.aclose()
+        self.assertEqual((first, second), ("retry: 5000\n\n", ": ping\n\n"))
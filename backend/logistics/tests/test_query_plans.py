@@ -0,0 +1,18 @@
+# backend/logistics/tests/test_query_plans.py
+
+"""Query terpanas Order & CachedDistance harus memakai index yang disiapkan (query_plans.py)."""
+
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+from logistics.query_plans import SUPPORTED_VENDORS, check_plans
+
+
+@unittest.skipUnless(connection.vendor in SUPPORTED_VENDORS, "EXPLAIN hanya dicek di SQLite & PostgreSQL")
+class HotQueryPlanTests(TestCase):
+    def test_hot_queries_use_their_index(self):
+        for name, index, plan, ok in check_plans():
+            with self.subTest(query=name):
+                self.assertTrue(ok, f"{name} tidak memakai {index}:\n{plan}")
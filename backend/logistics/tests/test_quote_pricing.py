@@ -0,0 +1,74 @@
+# backend/logistics/tests/test_quote_pricing.py
+
+"""Harga order lewat quote token harus sama dengan harga simulasi (termasuk surcharge)."""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from logistics.models import CustomerProfile, Fleet, MasterPricingRule, Order
+from logistics.pricing import service_price
+from logistics.pricing_snapshot import pricing_snapshot
+
+ROUTE = ({"distance_km": 153.27, "duration_minutes": 187}, False)
+LANE = {"origin_lat": "-6.2000", "origin_lng": "106.8166", "dest_lat": "-6.9175", "dest_lng": "107.6191"}
+
+
+class QuoteTokenPriceTests(TestCase):
+    def setUp(self):
+        self.fleet = Fleet.objects.create(
+            name="CDE", fleet_type="PICKUP", max_weight_kg_limit=1000, max_volume_cbm_limit=5.0,
+            surcharge_weight_price=Decimal("750.00"), surcharge_volume_price=Decimal("50000.00"),
+        )
+        MasterPricingRule.objects.create(
+            fleet_type="PICKUP", base_fare=Decimal("150000.00"), base_rate_per_km=Decimal("1350.00"),
+            min_price_lumpsum=Decimal("250000.00"), sla_express_multiplier=Decimal("1.5"),
+        )
+        pricing_snapshot.invalidate()  # on_commit signal master data tidak jalan di TestCase
+        self.customer = User.objects.create_user("shipper", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def simulate(self, weight=2000, volume=7.5):
+        with mock.patch("logistics.views.get_route", return_value=ROUTE):
+            response = self.client.post(
+                "/api/simulasi-harga/", {**LANE, "fleet_id": self.fleet.id, "weight": weight, "volume": volume},
+                format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def book(self, simulation, service_type="STANDARD"):
+        response = self.client.post("/api/orders/", {
+            "quote_token": simulation["quote_token"], "service_type": service_type,
+            "origin_city": "Jakarta", "origin_address": "Jl. A", "dest_city": "Bandung", "dest_address": "Jl. B",
+            "item_description": "Semen",
+        }, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return Order.objects.get(pk=response.json()["id"])
+
+    def test_booked_price_equals_simulated_price_with_surcharges(self):
+        simulation = self.simulate()
+        self.assertGreater(simulation["details"]["surcharge_weight"], 0)
+        self.assertGreater(simulation["details"]["surcharge_volume"], 0)
+
+        order = self.book(simulation)
+        self.assertEqual(order.base_price, Decimal(simulation["estimated_price"]))
+        self.assertEqual(order.final_total_price, Decimal(simulation["estimated_price"]))
+
+    def test_express_price_matches_simulated_service_price(self):
+        simulation = self.simulate()
+        order = self.book(simulation, "EXPRESS")
+        self.assertEqual(order.base_price, Decimal(simulation["service_prices"]["EXPRESS"]))
+        self.assertGreater(order.base_price, Decimal(simulation["estimated_price"]))
+
+    def test_corporate_markup_applies_to_simulated_price(self):
+        CustomerProfile.objects.create(user=self.customer, risk_status="SAFE")
+        simulation = self.simulate()
+        order = self.book(simulation)
+        expected = service_price(simulation["estimated_price"], 150, express=False, corporate=True)
+        self.assertEqual(order.base_price, Decimal(expected))
+        self.assertGreater(expected, simulation["estimated_price"])
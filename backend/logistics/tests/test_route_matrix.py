@@ -0,0 +1,73 @@
+# backend/logistics/tests/test_route_matrix.py
+
+"""fill_route_matrix terhadap stub TomTom lokal: tiling, paralel terbatas, upsert lane yang tumpang tindih."""
+
+from unittest import mock
+import threading
+
+from django.test import TestCase
+
+from logistics.models import CachedDistance
+from logistics.routing import fill_route_matrix
+from logistics.tomtom import TomTomClient
+from logistics.tomtom_stub import start_stub_server
+
+DEPOTS = [(-6.1045, 106.8863), (-6.2615, 107.1529), (-6.9175, 107.6191), (-7.2575, 112.7521), (-6.9667, 110.4167)]
+DESTINATIONS = [(-6.1384 - i * 0.05, 106.8636 + i * 0.07) for i in range(6)] + [DEPOTS[0]]
+
+
+class FillRouteMatrixTests(TestCase):
+    def setUp(self):
+        self.server = start_stub_server(latency=0.05)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = TomTomClient(base_url=self.server.base_url, api_key="k", max_retries=0)
+        self.addCleanup(lambda: self.client._session and self.client._session.close())
+
+        # Catat ukuran tile & jumlah request matrix yang berjalan bersamaan
+        self.tiles, self.in_flight, self.max_in_flight = [], 0, 0
+        lock = threading.Lock()
+        calculate_matrix = self.client.calculate_matrix
+
+        def tracked(origins, destinations, **kwargs):
+            with lock:
+                self.tiles.append(len(origins) * len(destinations))
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                return calculate_matrix(origins, destinations, **kwargs)
+            finally:
+                with lock:
+                    self.in_flight -= 1
+
+        self.client.calculate_matrix = tracked
+        patcher = mock.patch("logistics.routing.get_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_tiles_larger_matrix_with_bounded_concurrency(self):
+        summary = fill_route_matrix(DEPOTS, DESTINATIONS, max_cells=10, concurrency=2)
+
+        # 5 x 7 = 35 cell, maksimal 10 per request -> 1 depot x 7 tujuan per tile
+        self.assertEqual(summary["tiles"], 5)
+        self.assertEqual(self.tiles, [7] * 5)
+        self.assertEqual(self.server.state.requests["matrix"], 5)
+        self.assertEqual(self.server.state.requests["matrix_cells"], 35)
+        self.assertEqual(self.max_in_flight, 2)
+        # Depot yang sama dengan tujuan (jarak 0) tidak disimpan
+        self.assertEqual(summary["stored"], 34)
+        self.assertEqual(CachedDistance.objects.count(), 34)
+
+    def test_overlapping_fills_upsert_without_conflict_errors(self):
+        fill_route_matrix(DEPOTS[:3], DESTINATIONS, max_cells=10, concurrency=3)
+        first = CachedDistance.objects.get(origin_lat="-6.2615", dest_lat="-6.1384")
+
+        self.server.state.circuity = 2.0  # Jarak baru untuk lane yang sudah ada
+        summary = fill_route_matrix(DEPOTS[1:], DESTINATIONS, max_cells=10, concurrency=3, overwrite=False)
+        self.assertEqual(summary["failed_tiles"], 0)
+        self.assertEqual(CachedDistance.objects.count(), 34)
+        self.assertEqual(CachedDistance.objects.get(pk=first.pk).distance_km, first.distance_km)
+
+        fill_route_matrix(DEPOTS[1:2], DESTINATIONS, max_cells=10)
+        self.assertEqual(CachedDistance.objects.count(), 34)
+        self.assertGreater(CachedDistance.objects.get(pk=first.pk).distance_km, first.distance_km)
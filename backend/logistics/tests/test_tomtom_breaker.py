@@ -0,0 +1,191 @@
+# backend/logistics/tests/test_tomtom_breaker.py
+
+"""
+Circuit breaker TomTom: open -> half-open -> closed, dan percobaan half-open tidak pernah tertahan.
+TomTomClientStubTests memakai stub server lokal (tomtom_stub.py) lewat requests.Session asli.
+"""
+
+from unittest import mock
+import time
+
+import requests
+from django.test import SimpleTestCase
+
+from logistics.routing import get_tomtom_route
+from logistics.tomtom import CircuitBreaker, CircuitOpenError, TomTomClient, TomTomError
+from logistics.tomtom_stub import StubState, start_stub_server
+
+ROUTE = (-6.2, 106.8166, -6.9175, 107.6191)
+
+
+def response(status=200, data=None):
+    result = mock.Mock(status_code=status, text="")
+    result.json.return_value = {} if data is None else data
+    return result
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = mock.patch("logistics.tomtom.time.monotonic", return_value=1000.0)
+        self.monotonic = self.clock.start()
+        self.addCleanup(self.clock.stop)
+        self.breaker = CircuitBreaker("routing", failure_threshold=2, reset_timeout=30)
+
+    def test_open_half_open_closed(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.monotonic.return_value = 1030.0
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())  # Satu request percobaan
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_trial_reopens(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.monotonic.return_value = 1030.0
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.monotonic.return_value = 1059.0
+        self.assertFalse(self.breaker.allow())
+
+
+class TomTomClientBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = mock.patch("logistics.tomtom.time.monotonic", return_value=1000.0)
+        self.monotonic = self.clock.start()
+        self.addCleanup(self.clock.stop)
+        self.client = TomTomClient(api_key="k", max_retries=0, failure_threshold=2, reset_timeout=30)
+        self.client._session = mock.Mock()
+        self.breaker = self.client.breakers["routing"]
+
+    def call(self):
+        return self.client.request("routing", "GET", "/routing")
+
+    def open_circuit(self, error=None, result=None):
+        self.client._session.request.side_effect = error
+        self.client._session.request.return_value = result
+        with self.assertLogs("logistics.tomtom", "WARNING"):
+            for _ in range(2):
+                with self.assertRaises(TomTomError):
+                    self.call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_any_requests_error_counts_as_failure(self):
+        for error in (requests.exceptions.ChunkedEncodingError(), requests.exceptions.SSLError()):
+            with self.subTest(error=type(error).__name__):
+                self.breaker.record_success()
+                self.open_circuit(error)
+
+    def test_invalid_json_counts_as_failure(self):
+        bad = response()
+        bad.json.side_effect = requests.exceptions.JSONDecodeError("x", "", 0)
+        self.open_circuit(result=bad)
+
+    def test_trial_recovers_after_unexpected_error(self):
+        self.open_circuit(requests.ConnectionError())
+        self.monotonic.return_value = 1030.0
+        self.client._session.request.side_effect = RuntimeError("bug")
+        with self.assertRaises(RuntimeError):
+            self.call()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)  # Percobaan dilepas, bukan tertahan
+
+        self.client._session.request.side_effect = None
+        self.client._session.request.return_value = response(data={"ok": True})
+        self.assertEqual(self.call(), {"ok": True})
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open_circuit_rejects_without_calling_upstream(self):
+        self.open_circuit(requests.Timeout())
+        self.client._session.request.reset_mock()
+        with self.assertRaises(CircuitOpenError):
+            self.call()
+        self.client._session.request.assert_not_called()
+
+
+class FirstRouteSlow(StubState):
+    """Hanya request route pertama yang lambat (melewati read timeout client)."""
+
+    @property
+    def latency(self):
+        return 0.5 if self.requests.get('route', 0) <= 1 else 0.0
+
+    @latency.setter
+    def latency(self, value):
+        pass
+
+
+class TomTomClientStubTests(SimpleTestCase):
+    def setUp(self):
+        self.server = start_stub_server()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = TomTomClient(
+            base_url=self.server.base_url, api_key="k", timeouts={'routing': (1, 0.2)},
+            max_retries=1, backoff_base=0.01, failure_threshold=2, reset_timeout=0.3,
+        )
+        self.addCleanup(lambda: self.client._session and self.client._session.close())
+        self.breaker = self.client.breakers['routing']
+
+    def hits(self):
+        return self.server.state.requests.get('route', 0)
+
+    def open_with_503(self):
+        self.server.state.failure_rate = 1.0
+        with self.assertLogs("logistics.tomtom", "WARNING"):
+            for _ in range(2):
+                with self.assertRaisesRegex(TomTomError, "HTTP 503"):
+                    self.client.calculate_route(*ROUTE)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.hits(), 4)  # 2 panggilan x (1 + 1 retry)
+
+    def test_latency_trips_timeout_then_retry_succeeds(self):
+        self.server.state = FirstRouteSlow()
+        route = self.client.calculate_route(*ROUTE)
+        self.assertGreater(route["distance_km"], 0)
+        self.assertEqual(self.hits(), 2)
+        self.assertEqual(self.breaker.snapshot(), {"state": CircuitBreaker.CLOSED, "consecutive_failures": 0})
+
+    def test_latency_on_every_attempt_counts_as_failure(self):
+        self.server.state.latency = 0.5
+        with self.assertRaisesRegex(TomTomError, "ReadTimeout"):
+            self.client.calculate_route(*ROUTE)
+        self.assertEqual(self.hits(), 2)
+        self.assertEqual(self.breaker.snapshot()["consecutive_failures"], 1)
+
+    def test_503_opens_circuit_and_fails_fast_to_fallback(self):
+        self.open_with_503()
+        start = time.perf_counter()
+        with self.assertRaises(CircuitOpenError):
+            self.client.calculate_route(*ROUTE)
+        with mock.patch("logistics.routing.get_client", return_value=self.client), \
+                self.assertLogs("logistics.routing", "WARNING"):
+            self.assertIsNone(get_tomtom_route(*ROUTE))  # Caller lanjut ke estimator offline
+        self.assertLess(time.perf_counter() - start, 0.1)
+        self.assertEqual(self.hits(), 4)  # Tidak ada request baru ke upstream
+
+    def test_half_open_trial_closes_circuit(self):
+        self.open_with_503()
+        self.server.state.failure_rate = 0.0
+        time.sleep(0.35)
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertGreater(self.client.calculate_route(*ROUTE)["distance_km"], 0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.hits(), 5)
+
+    def test_failed_half_open_trial_reopens(self):
+        self.open_with_503()
+        time.sleep(0.35)
+        with self.assertLogs("logistics.tomtom", "WARNING"), self.assertRaises(TomTomError):
+            self.client.calculate_route(*ROUTE)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.client.calculate_route(*ROUTE)
@@ -0,0 +1,415 @@
+# backend/logistics/tomtom.py
+
+"""
+Client HTTP tunggal untuk semua panggilan TomTom.
+
+- Satu requests.Session per proses (keep-alive + connection pool), jadi quote
+  berikutnya tidak membayar TCP+TLS handshake lagi.
+- Retry terbatas dengan exponential backoff + jitter untuk error jaringan,
+  429 dan 5xx (4xx lain tidak di-retry).
+- Timeout per endpoint (routing / search / matrix).
+- Circuit breaker per endpoint: setelah beberapa kegagalan beruntun, panggilan
+  langsung dialihkan ke fallback tanpa menunggu timeout.
+"""
+
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib.parse import quote
+import requests
+import asyncio
+import logging
+import random
+import threading
+import time
+import os
+
+try:
+    import httpx  # Hanya dibutuhkan oleh view async (ASGI)
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUTS = {
+    # (connect, read) dalam detik
+    'routing': (3.05, 10),
+    'search': (3.05, 5),
+    'matrix': (3.05, 30),
+}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def route_params(travel_mode):
+    params = {
+        'travelMode': travel_mode,
+        'traffic': 'true',
+        'routeType': 'fastest'
+    }
+    if travel_mode == 'truck':
+        params.update({
+            'vehicleWeight': 12000,
+            'vehicleLength': 12,
+            'vehicleWidth': 2.5
+        })
+    return params
+
+
+def parse_route(data):
+    summary = data['routes'][0]['summary']
+    return {
+        "distance_km": round(summary['lengthInMeters'] / 1000, 2),
+        "duration_minutes": round(summary['travelTimeInSeconds'] / 60),
+        "toll_fee_idr": 0
+    }
+
+
+def matrix_options(travel_mode):
+    options = {'travelMode': travel_mode, 'routeType': 'fastest', 'traffic': 'historical', 'departAt': 'now'}
+    if travel_mode == 'truck':
+        options.update({'vehicleWeight': 12000, 'vehicleLength': 12, 'vehicleWidth': 2.5})
+    return options
+
+
+def parse_matrix(data):
+    """Respons Matrix Routing v2 -> {(origin_index, destination_index): route_data} (cell gagal dilewati)."""
+    routes = {}
+    for cell in data.get('data', []):
+        summary = cell.get('routeSummary')
+        if not summary:
+            continue
+        routes[(cell['originIndex'], cell['destinationIndex'])] = {
+            "distance_km": round(summary['lengthInMeters'] / 1000, 2),
+            "duration_minutes": round(summary['travelTimeInSeconds'] / 60),
+            "toll_fee_idr": 0
+        }
+    return routes
+
+
+def parse_search(data):
+    return [
+        {
+            "label": item['address']['freeformAddress'],
+            "lat": item['position']['lat'],
+            "lng": item['position']['lon']
+        }
+        for item in data.get('results', [])
+    ]
+
+
+class TomTomError(Exception):
+    pass
+
+
+class CircuitOpenError(TomTomError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    CLOSED -> (failure_threshold gagal beruntun) -> OPEN -> (reset_timeout) ->
+    HALF_OPEN (1 request percobaan) -> CLOSED jika sukses / OPEN lagi jika gagal.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            # HALF_OPEN: hanya satu request percobaan
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"TomTom circuit '{self.name}' OPEN setelah {self._failures} kegagalan")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release(self):
+        """Akhiri request tanpa hasil (exception tak terduga / dibatalkan): slot percobaan HALF_OPEN dilepas."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def snapshot(self):
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+class TomTomClient:
+    def __init__(self, base_url=None, api_key=None, timeouts=None, max_retries=None,
+                 backoff_base=None, backoff_cap=None, pool_size=None,
+                 failure_threshold=None, reset_timeout=None):
+        self.base_url = (base_url or getattr(settings, 'TOMTOM_BASE_URL', 'https://api.tomtom.com')).rstrip('/')
+        self._api_key = api_key
+        self.timeouts = {**DEFAULT_TIMEOUTS, **getattr(settings, 'TOMTOM_TIMEOUTS', {}), **(timeouts or {})}
+        self.max_retries = max_retries if max_retries is not None else getattr(settings, 'TOMTOM_MAX_RETRIES', 2)
+        self.backoff_base = backoff_base if backoff_base is not None else getattr(settings, 'TOMTOM_BACKOFF_BASE', 0.2)
+        self.backoff_cap = backoff_cap if backoff_cap is not None else getattr(settings, 'TOMTOM_BACKOFF_CAP', 2.0)
+        self.pool_size = pool_size or getattr(settings, 'TOMTOM_MAX_CONCURRENCY', 8) * 2
+
+        threshold = failure_threshold or getattr(settings, 'TOMTOM_CIRCUIT_FAILURES', 5)
+        reset = reset_timeout or getattr(settings, 'TOMTOM_CIRCUIT_RESET', 30)
+        self.breakers = {name: CircuitBreaker(name, threshold, reset) for name in self.timeouts}
+
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def api_key(self):
+        return self._api_key or getattr(settings, 'TOMTOM_API_KEY', None) or os.getenv('TOMTOM_API_KEY')
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._session = session
+        return self._session
+
+    def _backoff(self, attempt):
+        """Full jitter: acak di antara 0 dan base * 2^attempt (dibatasi cap)."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def request(self, endpoint, method, path, params=None, json=None):
+        """
+        Kirim request dengan retry + circuit breaker. Return JSON (dict).
+        Raise CircuitOpenError jika circuit terbuka, TomTomError jika gagal.
+        """
+        if not self.api_key:
+            raise TomTomError("TOMTOM_API_KEY tidak ditemukan!")
+
+        breaker = self.breakers[endpoint]
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit TomTom '{endpoint}' sedang terbuka")
+
+        params = {**(params or {}), 'key': self.api_key}
+        try:
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    time.sleep(self._backoff(attempt - 1))
+                try:
+                    response = self.session.request(
+                        method, f"{self.base_url}{path}", params=params, json=json,
+                        timeout=self.timeouts[endpoint]
+                    )
+                except requests.RequestException as e:
+                    # ConnectionError, Timeout, ChunkedEncodingError, SSLError, ...
+                    # Jangan simpan str(e): berisi URL lengkap termasuk API key
+                    last_error = type(e).__name__
+                    continue
+
+                if response.status_code in RETRY_STATUS:
+                    last_error = f"HTTP {response.status_code}"
+                    continue
+                if response.status_code >= 400:
+                    # Error dari sisi request (mis. koordinat tidak bisa dirutekan): bukan tanda upstream down
+                    breaker.record_success()
+                    raise TomTomError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+                try:
+                    data = response.json()
+                except ValueError:
+                    last_error = "Respons bukan JSON"
+                    continue
+                breaker.record_success()
+                return data
+
+            breaker.record_failure()
+            raise TomTomError(f"TomTom '{endpoint}' gagal setelah {self.max_retries + 1} percobaan: {last_error}")
+        finally:
+            # No-op jika hasil sudah dicatat; selain itu percobaan HALF_OPEN tidak boleh tertahan selamanya
+            breaker.release()
+
+    # --- Endpoint ---
+    def calculate_route(self, lat1, lon1, lat2, lon2, travel_mode='truck'):
+        data = self.request(
+            'routing', 'GET', f"/routing/1/calculateRoute/{lat1},{lon1}:{lat2},{lon2}/json",
+            params=route_params(travel_mode)
+        )
+        return parse_route(data)
+
+    def search(self, query, limit=5):
+        data = self.request(
+            'search', 'GET', f"/search/2/search/{quote(query, safe='')}.json",
+            params={'countrySet': 'ID', 'limit': limit}
+        )
+        return parse_search(data)
+
+    def calculate_matrix(self, origins, destinations, travel_mode='truck'):
+        """
+        Matrix Routing v2 (sinkron). origins/destinations: list (lat, lng).
+        Ukuran origins x destinations harus <= batas cell per request (lihat TOMTOM_MATRIX_MAX_CELLS).
+        Return: {(i, j): route_data}
+        """
+        body = {
+            "origins": [{"point": {"latitude": float(lat), "longitude": float(lng)}} for lat, lng in origins],
+            "destinations": [{"point": {"latitude": float(lat), "longitude": float(lng)}} for lat, lng in destinations],
+            "options": matrix_options(travel_mode),
+        }
+        return parse_matrix(self.request('matrix', 'POST', "/routing/matrix/2", json=body))
+
+    def stats(self):
+        return {name: breaker.snapshot() for name, breaker in self.breakers.items()}
+
+
+class AsyncTomTomClient:
+    """
+    Versi async (httpx.AsyncClient) untuk view ASGI. Konfigurasi, retry policy
+    dan circuit breaker dipinjam dari TomTomClient sync, jadi status "TomTom
+    sedang down" sama untuk jalur WSGI maupun ASGI di satu proses.
+    """
+
+    def __init__(self, sync_client):
+        self.sync = sync_client
+        self._client = None
+        self._slots = None
+        self._loop = None
+
+    @property
+    def client(self):
+        # httpx.AsyncClient terikat ke event loop tempat ia dibuat
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            if httpx is None:
+                raise TomTomError("Paket 'httpx' belum terpasang (pip install httpx)")
+            # Pool besar justru lambat (httpcore memindai semua koneksi per request)
+            pool = getattr(settings, 'TOMTOM_ASYNC_MAX_CONNECTIONS', 100)
+            self._client = httpx.AsyncClient(
+                base_url=self.sync.base_url,
+                limits=httpx.Limits(max_connections=pool, max_keepalive_connections=pool),
+            )
+            # Antrian ditahan di semaphore, bukan di pool httpx (lebih murah)
+            self._slots = asyncio.Semaphore(pool)
+            self._loop = loop
+        return self._client
+
+    async def request(self, endpoint, method, path, params=None, json=None):
+        sync = self.sync
+        if not sync.api_key:
+            raise TomTomError("TOMTOM_API_KEY tidak ditemukan!")
+
+        breaker = sync.breakers[endpoint]
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit TomTom '{endpoint}' sedang terbuka")
+
+        try:
+            client = self.client
+            connect, read = sync.timeouts[endpoint]
+            timeout = httpx.Timeout(read, connect=connect)
+            params = {**(params or {}), 'key': sync.api_key}
+            last_error = None
+            for attempt in range(sync.max_retries + 1):
+                if attempt:
+                    await asyncio.sleep(sync._backoff(attempt - 1))
+                try:
+                    async with self._slots:
+                        response = await client.request(method, path, params=params, json=json, timeout=timeout)
+                except httpx.RequestError as e:
+                    last_error = type(e).__name__
+                    continue
+
+                if response.status_code in RETRY_STATUS:
+                    last_error = f"HTTP {response.status_code}"
+                    continue
+                if response.status_code >= 400:
+                    breaker.record_success()
+                    raise TomTomError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+                try:
+                    data = response.json()
+                except ValueError:
+                    last_error = "Respons bukan JSON"
+                    continue
+                breaker.record_success()
+                return data
+
+            breaker.record_failure()
+            raise TomTomError(f"TomTom '{endpoint}' gagal setelah {sync.max_retries + 1} percobaan: {last_error}")
+        finally:
+            breaker.release()  # Termasuk CancelledError (client menutup koneksi)
+
+    async def calculate_route(self, lat1, lon1, lat2, lon2, travel_mode='truck'):
+        data = await self.request(
+            'routing', 'GET', f"/routing/1/calculateRoute/{lat1},{lon1}:{lat2},{lon2}/json",
+            params=route_params(travel_mode)
+        )
+        return parse_route(data)
+
+    async def search(self, query, limit=5):
+        data = await self.request(
+            'search', 'GET', f"/search/2/search/{quote(query, safe='')}.json",
+            params={'countrySet': 'ID', 'limit': limit}
+        )
+        return parse_search(data)
+
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Client bersama per proses (Session & circuit breaker dipakai semua view)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TomTomClient()
+    return _client
+
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        sync_client = get_client()
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncTomTomClient(sync_client)
+    return _async_client
+
+
+def reset_clients():
+    """Buang client bersama (mis. setelah settings TOMTOM_* diubah saat benchmark)."""
+    global _client, _async_client
+    with _client_lock:
+        _client = None
+        _async_client = None
@@ -0,0 +1,179 @@
+# backend/logistics/tomtom_stub.py
+
+"""
+Stub server HTTP lokal yang meniru endpoint TomTom yang kita pakai
+(calculateRoute, search & Matrix Routing v2). Dipakai untuk development, uji ketahanan client
+(latency, error 5xx, koneksi putus) dan benchmark tanpa memakai kuota.
+
+Jalankan: python manage.py tomtom_stub --port 8765
+lalu set TOMTOM_BASE_URL=http://127.0.0.1:8765 (API key boleh isi apa saja).
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+import json
+import multiprocessing
+import random
+import re
+import sys
+import threading
+import time
+
+from .geo import haversine_km
+
+ROUTE_PATH = re.compile(r'^/routing/1/calculateRoute/([-\d.]+),([-\d.]+):([-\d.]+),([-\d.]+)/json$')
+SEARCH_PATH = re.compile(r'^/search/2/search/(.+)\.json$')
+MATRIX_PATH = '/routing/matrix/2'
+MATRIX_MAX_CELLS = 2500  # Batas request sinkron yang kita tiru
+
+SAMPLE_PLACES = [
+    ("Jakarta Utara, DKI Jakarta", -6.1384, 106.8636),
+    ("Jakarta Pusat, DKI Jakarta", -6.1805, 106.8284),
+    ("Cikarang, Bekasi, Jawa Barat", -6.2615, 107.1529),
+    ("Bandung, Jawa Barat", -6.9175, 107.6191),
+    ("Semarang, Jawa Tengah", -6.9667, 110.4167),
+    ("Surabaya, Jawa Timur", -7.2575, 112.7521),
+]
+
+
+class StubState:
+    """Konfigurasi perilaku stub + counter request (thread-safe)."""
+
+    def __init__(self, latency=0.0, failure_rate=0.0, circuity=1.3):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.circuity = circuity
+        self._lock = threading.Lock()
+        self.requests = {}
+
+    def hit(self, name, amount=1):
+        with self._lock:
+            self.requests[name] = self.requests.get(name, 0) + amount
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, sama seperti api.tomtom.com
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate(self, name):
+        state = self.server.state
+        state.hit(name)
+        if state.latency:
+            time.sleep(state.latency)
+        if state.failure_rate and random.random() < state.failure_rate:
+            self._send(503, {"error": "stub failure"})
+            return False
+        return True
+
+    def _route_summary(self, lat1, lon1, lat2, lon2):
+        meters = haversine_km(lat1, lon1, lat2, lon2) * 1000 * self.server.state.circuity
+        return {"lengthInMeters": round(meters), "travelTimeInSeconds": round(meters / 12.5)}  # ~45 km/jam
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if not parse_qs(url.query).get('key'):
+            return self._send(403, {"error": "missing key"})
+        if url.path != MATRIX_PATH:
+            return self._send(404, {"error": "not found"})
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+            origins = [(o['point']['latitude'], o['point']['longitude']) for o in body['origins']]
+            destinations = [(d['point']['latitude'], d['point']['longitude']) for d in body['destinations']]
+        except (ValueError, KeyError, TypeError):
+            return self._send(400, {"error": "invalid body"})
+        if len(origins) * len(destinations) > MATRIX_MAX_CELLS:
+            return self._send(400, {"error": f"matrix larger than {MATRIX_MAX_CELLS} cells"})
+
+        self.server.state.hit('matrix_cells', len(origins) * len(destinations))
+        if not self._simulate('matrix'):
+            return
+        return self._send(200, {
+            "data": [
+                {"originIndex": i, "destinationIndex": j, "routeSummary": self._route_summary(*o, *d)}
+                for i, o in enumerate(origins) for j, d in enumerate(destinations)
+            ],
+            "statistics": {"totalCount": len(origins) * len(destinations)},
+        })
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if not query.get('key'):
+            return self._send(403, {"error": "missing key"})
+
+        match = ROUTE_PATH.match(url.path)
+        if match:
+            if not self._simulate('route'):
+                return
+            lat1, lon1, lat2, lon2 = map(float, match.groups())
+            return self._send(200, {"routes": [{"summary": self._route_summary(lat1, lon1, lat2, lon2)}]})
+
+        match = SEARCH_PATH.match(url.path)
+        if match:
+            if not self._simulate('search'):
+                return
+            text = unquote(match.group(1)).lower()
+            limit = int(query.get('limit', ['5'])[0])
+            results = [
+                {"address": {"freeformAddress": label}, "position": {"lat": lat, "lon": lng}}
+                for label, lat, lng in SAMPLE_PLACES if text in label.lower()
+            ]
+            return self._send(200, {"results": results[:limit]})
+
+        self._send(404, {"error": "not found"})
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Backlog default (5) membuat koneksi paralel tertahan SYN retry
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return  # Client sudah menyerah (timeout) sebelum respons latency selesai dikirim
+        super().handle_error(request, client_address)
+
+
+def make_stub_server(host='127.0.0.1', port=0, **state_kwargs):
+    """Buat server stub (belum jalan). port=0 -> port bebas dipilih OS."""
+    server = StubServer((host, port), StubHandler)
+    server.state = StubState(**state_kwargs)
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    return server
+
+
+def start_stub_server(host='127.0.0.1', port=0, **state_kwargs):
+    """Jalankan stub di thread background. Hentikan dengan server.shutdown()."""
+    server = make_stub_server(host, port, **state_kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _serve_in_child(queue, host, state_kwargs):
+    server = make_stub_server(host, 0, **state_kwargs)
+    queue.put(server.base_url)
+    server.serve_forever()
+
+
+def start_stub_process(host='127.0.0.1', **state_kwargs):
+    """
+    Jalankan stub di proses terpisah (untuk benchmark: thread stub tidak ikut
+    berebut GIL dengan proses Django yang diukur). Return (process, base_url);
+    hentikan dengan process.terminate().
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_in_child, args=(queue, host, state_kwargs), daemon=True)
+    process.start()
+    return process, queue.get(timeout=10)
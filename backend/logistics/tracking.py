@@ -0,0 +1,84 @@
+# backend/logistics/tracking.py
+
+"""
+Lacak resi publik (PublicTrackingView), endpoint anonim tersibuk.
+
+- Resi dicari lewat Order.tracking_code (unique index), bukan prefix UUID.
+- Respons (body + ETag) disimpan di shared cache per kode resi, termasuk hasil
+  "tidak ditemukan", sehingga polling berulang tidak menyentuh database; klien
+  yang mengirim If-None-Match cukup dijawab 304 tanpa body.
+- Cache dihapus saat Order disimpan / dihapus (signals.py). Perubahan lewat
+  queryset.update() harus memanggil invalidate_tracking() sendiri; TTL pendek
+  TRACKING_CACHE_TTL membatasi umur data jika itu terlewat.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+import hashlib
+import json
+import re
+import uuid
+
+from .models import Order
+
+KEY_PREFIX = "tracking:v1:"
+CODE_RE = re.compile(r"^[0-9a-f]{8,32}$")
+NOT_FOUND = {"etag": None, "body": None}
+
+
+def _cache():
+    return caches[getattr(settings, 'TRACKING_CACHE_ALIAS', 'default')]
+
+
+def normalize_tracking_code(raw):
+    """'ORD-1A2B3C4D', ' 1a2b3c4d ', UUID lengkap -> kode hex huruf kecil, atau None jika formatnya salah."""
+    code = raw.strip().lower()
+    if code.startswith("ord-"):
+        code = code[4:]
+    code = code.replace("-", "")
+    return code if CODE_RE.match(code) else None
+
+
+def tracking_body(order):
+    return {
+        "order_id": str(order.id),
+        "tracking_code": order.tracking_code,
+        "status": order.get_status_display(),
+        "origin": order.origin_city,
+        "dest": order.dest_city,
+    }
+
+
+def _etag(body):
+    digest = hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def _load(code):
+    orders = Order.objects.only('id', 'tracking_code', 'status', 'origin_city', 'dest_city')
+    order = orders.filter(tracking_code=code).first()
+    if order is None and len(code) == 32:
+        # UUID lengkap (link lama) untuk order yang kode resinya lebih pendek
+        order = orders.filter(pk=uuid.UUID(code)).first()
+    if order is None:
+        return NOT_FOUND
+    body = tracking_body(order)
+    return {"etag": _etag(body), "body": body}
+
+
+def get_tracking(code):
+    """{"etag": ..., "body": {...}} untuk kode resi ternormalisasi, atau None jika tidak ada."""
+    key = KEY_PREFIX + code
+    entry = _cache().get(key)
+    if entry is None:
+        entry = _load(code)
+        _cache().set(key, entry, getattr(settings, 'TRACKING_CACHE_TTL', 60))
+    return entry if entry["etag"] else None
+
+
+def invalidate_tracking(*orders):
+    keys = set()
+    for order in orders:
+        keys.add(KEY_PREFIX + order.tracking_code)
+        keys.add(KEY_PREFIX + order.id.hex)
+    _cache().delete_many(list(keys))
@@ -5,7 +5,9 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     FleetListAPIView, PublicTrackingView, PromoListView,
     MitraRegistrationView, OrderViewSet, OrderChargeCreateView,
-    SimulasiHargaView, GeocodeLocationView, 
+    SimulasiHargaView, SimulasiHargaBatchView, GeocodeLocationView, 
+    CacheStatsView, DriverLocationIngestView, DispatchCandidatesView, OrderTransitionView,
+    BulkOrderUploadView, OrderExportView,
     
     # 🚨 PENTING: IMPORT SEMUA VIEW CUSTOMER/AUTH BARU 🚨
     CustomerRegistrationView, 
@@ -14,6 +16,9 @@ from .views import (
     PasswordResetRequestView,
     PasswordResetConfirmView,
 )
+from .async_views import (
+    AsyncSimulasiHargaView, AsyncGeocodeLocationView, OrderTrackingStreamView, CustomerOrderStreamView,
+)
 
 router = DefaultRouter()
 router.register(r'orders', OrderViewSet, basename='order') 
@@ -23,12 +28,25 @@ urlpatterns = [
     path('fleets/', FleetListAPIView.as_view(), name='public-fleets'), # Jadi /api/fleets/
     path('promos/', PromoListView.as_view(), name='public-promos'),
     path('simulasi-harga/', SimulasiHargaView.as_view(), name='simulasi-harga'), 
+    path('simulasi-harga/batch/', SimulasiHargaBatchView.as_view(), name='simulasi-harga-batch'),
+    path('cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
     path('geocode/', GeocodeLocationView.as_view(), name='geocode-autocomplete'), 
+    # Versi async (native ASGI) untuk dijalankan via uvicorn: logistik_core.asgi:application
+    path('simulasi-harga/async/', AsyncSimulasiHargaView.as_view(), name='simulasi-harga-async'),
+    path('geocode/async/', AsyncGeocodeLocationView.as_view(), name='geocode-autocomplete-async'),
     path('tracking/', PublicTrackingView.as_view(), name='public-tracking'),
+    # Push status order (SSE, hanya ASGI); WebSocket: /ws/tracking/<kode>/ & /ws/orders/?token=
+    path('tracking/stream/', OrderTrackingStreamView.as_view(), name='public-tracking-stream'),
+    path('orders/stream/', CustomerOrderStreamView.as_view(), name='order-stream'),
 
     # API MITRA & ORDER
     path('mitra/register/', MitraRegistrationView.as_view(), name='mitra-register'),
+    path('driver/locations/', DriverLocationIngestView.as_view(), name='driver-location-ingest'),
+    path('dispatch/candidates/', DispatchCandidatesView.as_view(), name='dispatch-candidates'),
     path('orders/charges/', OrderChargeCreateView.as_view(), name='upload-charge'),
+    path('orders/bulk/', BulkOrderUploadView.as_view(), name='order-bulk-upload'),
+    path('orders/export/', OrderExportView.as_view(), name='order-export'),
+    path('orders/transitions/', OrderTransitionView.as_view(), name='order-transitions'),
     
     # 🚨 ENDPOINT CUSTOMER BARU (SOLUSI 404 NOT FOUND)
     path('customer/register/', CustomerRegistrationView.as_view(), name='customer-register'),
@@ -12,21 +12,23 @@ from django.contrib.auth.models import User
 from django.db import transaction
 from django.core.mail import send_mail 
 from django.template.loader import render_to_string 
-from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.utils.http import parse_etags, urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import default_token_generator
 from django.db.models import Q
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.dateparse import parse_date
+from rest_framework.parsers import MultiPartParser
 from decimal import Decimal
-import requests
-import math
+import json
 import logging
-import os 
+import time
 import uuid 
 
 # 🚨 PERBAIKAN IMPORT: Aktifkan import model CustomerProfile
 from .models import (
-    Fleet, MasterPricingRule, MitraArmada,
-    Order, OrderCharge, Promo, CachedDistance,
+    Fleet, MitraArmada,
+    Order, OrderCharge, Promo,
     CustomerProfile  # <--- SUDAH DIAKTIFKAN
 )
 
@@ -34,80 +36,91 @@ from .models import (
 from .serializers import (
     FleetSerializer, MitraArmadaSerializer,
     OrderSerializer, OrderCreateSerializer,
-    OrderChargeSerializer, PromoSerializer
+    OrderChargeSerializer, OrderTransitionSerializer, PromoSerializer, requested_fields
 )
+from .routing import (
+    get_route, lane_key, lookup_cached_routes, fetch_missing_routes
+)
+from .pricing import order_price, quote, quote_matrix, service_price, stack_tariffs, units_to_rupiah
+from .estimator import estimate_routes
+from .pagination import OrderCursorPagination
+from .pricing_snapshot import pricing_snapshot
+from .quote_token import issue_quote_token
+from .tracking import get_tracking, normalize_tracking_code
+from .geocode_cache import geocode_cache, cached_search
+from .dispatch import dispatch_index
+from .order_lifecycle import TransitionError, transition_orders
+from .bulk_orders import BulkUploadError, import_orders, read_rows
+from .order_export import CONTENT_TYPES, export_response
+from .streaming import streaming_response
+from .gps import GPSBatchError, decode_batch, location_buffer, read_body
+from .route_cache import route_cache
+from .tomtom import get_client, CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
 # ===========================================================
 # 0. FUNGSI UTILITAS: TOMTOM & PRICING (Kode ini tetap sama)
 # ===========================================================
-def get_tomtom_route(lat1, lon1, lat2, lon2, travel_mode='truck'):
+def calculate_shipping_cost(distance_km, fleet_id, service_type="STANDARD", is_corporate=False):
     """
-    Mengambil jarak & waktu via TomTom API.
+    Logic hitung harga cadangan untuk OrderViewSet.
+    Return (harga jual dibulatkan ribuan, HPP, status) dalam Decimal; dihitung
+    integer oleh pricing.order_price dari tarif di snapshot.
     """
-    api_key = getattr(settings, 'TOMTOM_API_KEY', None) or os.getenv('TOMTOM_API_KEY')
-    if not api_key:
-        logger.error("TOMTOM_API_KEY tidak ditemukan!")
-        return None
+    tariff = pricing_snapshot.get().tariff(fleet_id)
+    if tariff is None:
+        return Decimal(0), Decimal(0), "ERROR_NO_RULE"
 
-    url = f"https://api.tomtom.com/routing/1/calculateRoute/{lat1},{lon1}:{lat2},{lon2}/json"
-    params = {
-        'key': api_key,
-        'travelMode': travel_mode,
-        'traffic': 'true',
-        'routeType': 'fastest'
-    }
+    price, hpp_units = order_price(
+        tariff, distance_km, express=service_type == "EXPRESS", corporate=is_corporate
+    )
+    return Decimal(price), units_to_rupiah(hpp_units), "OK"
 
-    if travel_mode == 'truck':
-        params.update({
-            'vehicleWeight': 12000, 
-            'vehicleLength': 12,    
-            'vehicleWidth': 2.5
-        })
 
-    try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        summary = data['routes'][0]['summary']
-        
-        return {
-            "distance_km": round(summary['lengthInMeters'] / 1000, 2),
-            "duration_minutes": round(summary['travelTimeInSeconds'] / 60),
-            "toll_fee_idr": 0 
-        }
-    except Exception as e:
-        logger.error(f"TomTom API Error: {e}")
-        return None
+def is_corporate_customer(user):
+    """Customer korporat (risk SAFE) mendapat harga corporate."""
+    return hasattr(user, "customer_profile") and user.customer_profile.risk_status == "SAFE"
 
 
-def calculate_shipping_cost(distance_km, fleet_id, service_type="STANDARD", is_corporate=False):
+def build_simulasi_result(fleet, tariff, route_data, is_cached, input_weight, input_volume,
+                          is_estimated=False, lane=None):
     """
-    Logic hitung harga cadangan untuk OrderViewSet.
+    Hitung harga simulasi 1 lane + susun payload respons.
+    Dipakai bersama oleh SimulasiHargaView (WSGI) dan versi async-nya.
+    tariff: pricing.Tariff armada (dari snapshot), rumus sama dengan endpoint batch.
+    is_estimated: jarak dari estimator offline (TomTom gagal), bukan rute asli.
+    lane: lane key; jika diisi, respons membawa quote_token untuk membuat order.
+    service_prices = harga order per service type (non-corporate) dari harga
+    simulasi, sama persis dengan harga order yang dibuat lewat quote_token.
     """
-    try:
-        fleet = Fleet.objects.get(id=fleet_id)
-        rule = MasterPricingRule.objects.get(fleet_type=fleet.fleet_type)
-    except Exception:
-        return Decimal(0), Decimal(0), "ERROR_NO_RULE"
-    
-    base_fare = rule.base_fare or Decimal(0)
-    base_rate_per_km = rule.base_rate_per_km or Decimal(0)
-    min_price_lumpsum = rule.min_price_lumpsum or Decimal(0)
-
-    distance_cost = Decimal(distance_km) * base_rate_per_km
-    raw_hpp = base_fare + distance_cost
-    final_hpp = max(raw_hpp, min_price_lumpsum)
-    selling_price = final_hpp / (1 - Decimal("0.20"))
-
-    if service_type == "EXPRESS":
-        selling_price *= (rule.sla_express_multiplier or Decimal('1.5'))
-
-    if is_corporate:
-        selling_price = selling_price / (1 - Decimal("0.02"))
+    price = quote(tariff, route_data['distance_km'], input_weight, input_volume)
+    service_prices = {
+        service: service_price(price["estimated_price"], tariff.express_multiplier, service == "EXPRESS")
+        for service in ("STANDARD", "EXPRESS")
+    }
 
-    return round(selling_price, -3), final_hpp, "OK"
+    result = {
+        "estimated_price": price["estimated_price"],
+        "distance_km": route_data['distance_km'],
+        "duration_minutes": route_data['duration_minutes'],
+        "duration_text": f"{route_data['duration_minutes'] // 60} jam {route_data['duration_minutes'] % 60} menit",
+        "service_prices": service_prices,
+        "details": {
+            "base_price": price["base_price"],
+            "surcharge_weight": price["surcharge_weight"],
+            "surcharge_volume": price["surcharge_volume"],
+            "is_cached": is_cached,
+            "is_estimated": is_estimated,
+            "travel_mode": fleet.tomtom_travel_mode
+        }
+    }
+    if lane is not None:
+        result["quote_token"] = issue_quote_token(
+            fleet.id, lane, route_data, tariff, price["estimated_price"], is_estimated
+        )
+        result["quote_expires_in"] = getattr(settings, 'QUOTE_TOKEN_MAX_AGE', 900)
+    return result
 
 
 # ===========================================================
@@ -128,76 +141,164 @@ class SimulasiHargaView(APIView):
         except (TypeError, ValueError):
             return Response({"error": "Data koordinat/input tidak valid"}, status=400)
 
-        try:
-            fleet = Fleet.objects.get(id=fleet_id)
-            pricing_rule = MasterPricingRule.objects.get(fleet_type=fleet.fleet_type)
-        except Exception:
+        snapshot = pricing_snapshot.get()
+        entry = snapshot.get(fleet_id)
+        if entry is None:
             return Response({"error": "Data Armada atau Rule Harga tidak ditemukan"}, status=500)
+        fleet, _ = entry
 
-        cache = CachedDistance.objects.filter(
-            origin_lat=o_lat, origin_lng=o_lng,
-            dest_lat=d_lat, dest_lng=d_lng
-        ).first()
+        key = (o_lat, o_lng, d_lat, d_lng)
+        route_data, is_cached = get_route(key, travel_mode=fleet.tomtom_travel_mode)
+        is_estimated = False
+        if not route_data:
+            # TomTom gagal: tetap beri harga dari estimator offline (ditandai is_estimated)
+            route_data = estimate_routes([key], fleet.tomtom_travel_mode).get(key)
+            is_estimated = route_data is not None
+        if not route_data:
+            return Response({"error": "Gagal menghitung rute (Cek API Key/Jarak)"}, status=500)
 
-        route_data = None
-        is_cached = False
+        return Response(build_simulasi_result(
+            fleet, snapshot.tariff(fleet.id), route_data, is_cached, input_weight, input_volume, is_estimated,
+            lane=key,
+        ))
 
-        if cache:
-            route_data = {
-                "distance_km": float(cache.distance_km),
-                "duration_minutes": cache.duration_minutes
-            }
-            is_cached = True
-        else:
-            route_data = get_tomtom_route(
-                o_lat, o_lng, d_lat, d_lng, 
-                travel_mode=fleet.tomtom_travel_mode 
-            )
 
-            if not route_data:
-                return Response({"error": "Gagal menghitung rute (Cek API Key/Jarak)"}, status=500)
+class SimulasiHargaBatchView(APIView):
+    """
+    Endpoint: /api/simulasi-harga/batch/
+    Simulasi harga massal untuk tender sheet corporate: N lane x M armada.
+
+    Body: {"fleet_ids": [1, 2], "lanes": [{"origin_lat", "origin_lng",
+           "dest_lat", "dest_lng", "weight", "volume", "ref"}, ...]}
 
-            CachedDistance.objects.create(
-                origin_lat=o_lat, origin_lng=o_lng,
-                dest_lat=d_lat, dest_lng=d_lng,
-                distance_km=route_data['distance_km'],
-                duration_minutes=route_data['duration_minutes'],
-                toll_fee_idr=0
+    - Jarak dari cache diambil dalam satu query.
+    - Lane yang belum ada di cache di-fetch ke TomTom secara paralel (tanpa duplikat).
+    - Lane yang gagal di-route diberi jarak estimasi (is_estimated) alih-alih error.
+    - Harga dihitung sekaligus untuk semua lane x armada (NumPy).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        lanes = request.data.get("lanes")
+        fleet_ids = request.data.get("fleet_ids")
+        max_lanes = getattr(settings, 'SIMULASI_BATCH_MAX_LANES', 1000)
+
+        if not isinstance(lanes, list) or not lanes:
+            return Response({"error": "Daftar lane wajib diisi"}, status=400)
+        if len(lanes) > max_lanes:
+            return Response({"error": f"Maksimal {max_lanes} lane per request"}, status=400)
+        if not isinstance(fleet_ids, list) or not fleet_ids:
+            return Response({"error": "Daftar fleet_ids wajib diisi"}, status=400)
+
+        # 1. Master data armada & rule harga (dari snapshot, tanpa query)
+        try:
+            snapshot = pricing_snapshot.get()
+            fleet_rules = snapshot.pairs(fleet_ids)
+        except (TypeError, ValueError):
+            return Response({"error": "fleet_ids tidak valid"}, status=400)
+        if not fleet_rules:
+            return Response({"error": "Data Armada atau Rule Harga tidak ditemukan"}, status=400)
+
+        # 2. Parsing lane
+        parsed = []
+        errors = {}
+        refs = {}
+        for index, lane in enumerate(lanes):
+            refs[index] = lane.get("ref") if isinstance(lane, dict) else None
+            try:
+                key = lane_key(lane["origin_lat"], lane["origin_lng"], lane["dest_lat"], lane["dest_lng"])
+                weight = float(lane.get("weight") or 0)
+                volume = float(lane.get("volume") or 0)
+            except (KeyError, TypeError, ValueError, AttributeError, ArithmeticError):
+                errors[index] = "Data koordinat/input tidak valid"
+                continue
+            parsed.append((index, refs[index], key, weight, volume))
+
+        # 3. Resolve jarak: cache dulu, sisanya ke TomTom.
+        # Cache jarak tidak dibedakan per travel mode, jadi lane di-fetch dengan mode
+        # 'truck' jika salah satu armada yang diminta adalah truk.
+        keys = {key for _, _, key, _, _ in parsed}
+        routes = lookup_cached_routes(keys)
+        cached_keys = set(routes)
+        modes = {f.tomtom_travel_mode for f, _ in fleet_rules}
+        travel_mode = 'truck' if 'truck' in modes else 'car'
+        routes.update(fetch_missing_routes({key: travel_mode for key in keys - cached_keys}))
+        # Lane yang tetap gagal (TomTom down / kuota habis) memakai estimator offline
+        estimated = estimate_routes(keys - set(routes), travel_mode)
+        routes.update(estimated)
+
+        priced = [item for item in parsed if item[2] in routes]
+        for index, _, key, _, _ in parsed:
+            if key not in routes:
+                errors[index] = "Gagal menghitung rute (Cek API Key/Jarak)"
+
+        # 4. Hitung semua harga dalam satu pass
+        matrix = None
+        if priced:
+            matrix = quote_matrix(
+                [routes[key]['distance_km'] for _, _, key, _, _ in priced],
+                [weight for _, _, _, weight, _ in priced],
+                [volume for _, _, _, _, volume in priced],
+                stack_tariffs([snapshot.tariff(f.id) for f, _ in fleet_rules]),
             )
 
-        distance = Decimal(route_data['distance_km'])
-        base_fare = pricing_rule.base_fare or Decimal(0)
-        base_rate_per_km = pricing_rule.base_rate_per_km or Decimal(0)
-        min_price_lumpsum = pricing_rule.min_price_lumpsum or Decimal(0)
-        base_cost = (distance * base_rate_per_km) + base_fare
-        final_base_price = max(base_cost, min_price_lumpsum)
+        results = {}
+        for row, (index, ref, key, _, _) in enumerate(priced):
+            route = routes[key]
+            results[index] = {
+                "index": index,
+                "ref": ref,
+                "distance_km": route['distance_km'],
+                "duration_minutes": route['duration_minutes'],
+                "duration_text": f"{route['duration_minutes'] // 60} jam {route['duration_minutes'] % 60} menit",
+                "is_cached": key in cached_keys,
+                "is_estimated": key in estimated,
+                "quotes": [
+                    {
+                        "fleet_id": fleet.id,
+                        "fleet_name": fleet.name,
+                        "travel_mode": fleet.tomtom_travel_mode,
+                        "estimated_price": int(matrix["estimated_price"][row, col]),
+                        "details": {
+                            "base_price": int(matrix["base_price"][row, col]),
+                            "surcharge_weight": int(matrix["surcharge_weight"][row, col]),
+                            "surcharge_volume": int(matrix["surcharge_volume"][row, col]),
+                        }
+                    }
+                    for col, (fleet, _) in enumerate(fleet_rules)
+                ]
+            }
+        for index, message in errors.items():
+            results[index] = {"index": index, "ref": refs[index], "error": message}
 
-        surcharge_weight = Decimal(0)
-        surcharge_volume = Decimal(0)
-        
-        if input_weight > fleet.max_weight_kg_limit:
-            over_kg = Decimal(input_weight - fleet.max_weight_kg_limit)
-            surcharge_weight = over_kg * (fleet.surcharge_weight_price or Decimal(0))
+        return Response({
+            "results": [results[i] for i in sorted(results)],
+            "summary": {
+                "lanes": len(lanes),
+                "fleets": len(fleet_rules),
+                "priced": len(priced),
+                "failed": len(errors),
+                "cached_routes": len(cached_keys),
+                "fetched_routes": len(routes) - len(cached_keys) - len(estimated),
+                "estimated_routes": len(estimated),
+            }
+        })
 
-        if input_volume > fleet.max_volume_cbm_limit:
-            over_cbm = Decimal(input_volume - fleet.max_volume_cbm_limit)
-            surcharge_volume = over_cbm * (fleet.surcharge_volume_price or Decimal(0))
 
-        total_hpp = final_base_price + surcharge_weight + surcharge_volume
-        selling_price = total_hpp / Decimal("0.8")
+class CacheStatsView(APIView):
+    """
+    Endpoint: /api/cache/stats/
+    Counter hit/miss cache rute & geocode (per proses worker) untuk sizing LRU & TTL.
+    """
+    permission_classes = [permissions.IsAdminUser]
 
+    def get(self, request):
         return Response({
-            "estimated_price": math.ceil(selling_price),
-            "distance_km": route_data['distance_km'],
-            "duration_minutes": route_data['duration_minutes'],
-            "duration_text": f"{route_data['duration_minutes'] // 60} jam {route_data['duration_minutes'] % 60} menit",
-            "details": {
-                "base_price": math.ceil(final_base_price / Decimal("0.8")),
-                "surcharge_weight": math.ceil(surcharge_weight / Decimal("0.8")),
-                "surcharge_volume": math.ceil(surcharge_volume / Decimal("0.8")),
-                "is_cached": is_cached,
-                "travel_mode": fleet.tomtom_travel_mode
-            }
+            "routes": route_cache.stats(),
+            "geocode": geocode_cache.stats(),
+            "tomtom": get_client().stats(),
+            "gps": location_buffer.stats(),
+            "dispatch": dispatch_index.stats(),
         })
 
 
@@ -210,21 +311,12 @@ class GeocodeLocationView(APIView):
         query = request.query_params.get("q", "")
         if len(query) < 3: return Response([])
 
-        api_key = getattr(settings, 'TOMTOM_API_KEY', None) or os.getenv('TOMTOM_API_KEY')
-        url = f"https://api.tomtom.com/search/2/search/{query}.json"
-        
         try:
-            r = requests.get(url, params={'key': api_key, 'countrySet': 'ID', 'limit': 5}, timeout=5)
-            data = r.json()
-            results = []
-            for item in data.get('results', []):
-                results.append({
-                    "label": item['address']['freeformAddress'],
-                    "lat": item['position']['lat'],
-                    "lng": item['position']['lon']
-                })
-            return Response(results)
-        except Exception: 
+            return Response(cached_search(get_client(), query, limit=5))
+        except CircuitOpenError:
+            return Response([])
+        except Exception as e:
+            logger.error(f"TomTom Search Error: {e}")
             return Response([])
 
 
@@ -502,17 +594,106 @@ class FleetListAPIView(generics.ListAPIView):
     permission_classes = [AllowAny]
 
 class PublicTrackingView(APIView):
+    """
+    Lacak resi publik: ?id=<kode resi> (format "ORD-1a2b3c4d" / UUID lengkap juga diterima).
+    Respons diambil dari cache per resi; kirim If-None-Match untuk mendapat 304.
+    """
     permission_classes = [AllowAny]
     def get(self, request):
         short_id = request.query_params.get("id")
         if not short_id: return Response({"error": "ID Kosong"}, 400)
-        order = Order.objects.filter(id__startswith=short_id).first()
-        if not order: return Response({"error": "Resi tidak ditemukan"}, 404)
+        code = normalize_tracking_code(short_id)
+        entry = get_tracking(code) if code else None
+        if not entry: return Response({"error": "Resi tidak ditemukan"}, 404)
+
+        client_etags = [etag.removeprefix("W/") for etag in parse_etags(request.headers.get("If-None-Match", ""))]
+        if entry["etag"] in client_etags or "*" in client_etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(entry["body"])
+        response["ETag"] = entry["etag"]
+        response["Cache-Control"] = "no-cache"  # Boleh disimpan klien, tapi wajib revalidasi (murah lewat 304)
+        return response
+
+class DriverLocationIngestView(APIView):
+    """
+    Endpoint: /api/driver/locations/ (POST, token JWT driver)
+    Batch titik GPS dalam array kolom, opsional Content-Encoding: gzip (format di
+    logistics/gps.py). Titik hanya masuk buffer memori; penulisan ke DB berkala.
+    """
+    permission_classes = [IsAuthenticated]
+    def post(self, request):
+        driver_id = location_buffer.driver_id_for(request.user)
+        if driver_id is None:
+            return Response({"error": "Akun ini bukan mitra driver"}, status=403)
+        try:
+            payload = read_body(request.body, request.headers.get("Content-Encoding", "").lower())
+            points = decode_batch(payload)
+        except GPSBatchError as e:
+            return Response({"error": str(e)}, status=400)
+        accepted = location_buffer.ingest(driver_id, points)
+        return Response({"received": len(points), "accepted": accepted}, status=status.HTTP_202_ACCEPTED)
+
+class DispatchCandidatesView(APIView):
+    """
+    Endpoint: /api/dispatch/candidates/?order=<id> (atau ?lat=&lng=)
+    k kendaraan tersedia terdekat dari titik muat. Filter opsional: k, fleet_type,
+    fleet_id, weight (kg), volume (m3), radius_km. Penugasan tetap oleh admin.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    def get(self, request):
+        params = request.query_params
+        try:
+            if params.get("order"):
+                order = Order.objects.only("origin_lat", "origin_lng").filter(pk=params["order"]).first()
+                if order is None: return Response({"error": "Order tidak ditemukan"}, 404)
+                if order.origin_lat is None or order.origin_lng is None:
+                    return Response({"error": "Order belum punya koordinat muat"}, 400)
+                lat, lng = order.origin_lat, order.origin_lng
+            else:
+                lat, lng = float(params["lat"]), float(params["lng"])
+            k = min(max(int(params.get("k", 5)), 1), 50)
+            fleet_id = int(params["fleet_id"]) if params.get("fleet_id") else None
+            weight = float(params.get("weight") or 0)
+            volume = float(params.get("volume") or 0)
+            radius = float(params["radius_km"]) if params.get("radius_km") else None
+        except (KeyError, TypeError, ValueError, DjangoValidationError):
+            return Response({"error": "Parameter tidak valid (order atau lat & lng wajib)"}, 400)
+
+        start = time.perf_counter()
+        candidates = dispatch_index.candidates(
+            lat, lng, k, fleet_type=params.get("fleet_type") or None, fleet_id=fleet_id,
+            weight_kg=weight, volume_cbm=volume, max_km=radius,
+        )
+        return Response({
+            "candidates": [c._asdict() for c in candidates],
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+            "index": dispatch_index.stats(),
+        })
+
+class OrderTransitionView(APIView):
+    """
+    Endpoint: /api/orders/transitions/ (POST, admin)
+    Pindahkan banyak order sekaligus: {"status": "IN_TRANSIT", "orders": [id, ...]}
+    (+ driver_id / vehicle_id untuk DRIVER_ASSIGNED, cancellation_reason untuk CANCELLED).
+    Order yang status saat ini tidak boleh ke status tujuan dikembalikan di "rejected".
+    """
+    permission_classes = [permissions.IsAdminUser]
+    def post(self, request):
+        serializer = OrderTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            result = transition_orders(
+                data["orders"], data["status"], driver=data.get("driver"), vehicle=data.get("vehicle"),
+                cancellation_reason=data.get("cancellation_reason"),
+            )
+        except TransitionError as e:
+            return Response({"error": str(e)}, status=400)
         return Response({
-            "order_id": str(order.id),
-            "status": order.get_status_display(),
-            "origin": order.origin_city,
-            "dest": order.dest_city
+            "status": data["status"],
+            "updated": [str(pk) for pk in result.updated],
+            "rejected": [{"id": str(pk), "status": current} for pk, current in result.rejected.items()],
         })
 
 class PromoListView(generics.ListAPIView):
@@ -521,24 +702,85 @@ class PromoListView(generics.ListAPIView):
     permission_classes = [AllowAny]
 
 class OrderViewSet(viewsets.ModelViewSet):
+    """
+    Order milik customer. List: cursor pagination (?cursor=, ?page_size=) dan
+    sparse fieldset (?fields=id,status,...), query tetap per halaman.
+    """
     permission_classes = [IsAuthenticated]
+    pagination_class = OrderCursorPagination
     def get_serializer_class(self): return OrderCreateSerializer if self.action == "create" else OrderSerializer
-    def get_queryset(self): return Order.objects.filter(customer=self.request.user).order_by("-created_at")
+
+    def get_queryset(self):
+        queryset = Order.objects.filter(customer=self.request.user).order_by("-created_at", "-id")
+        if self.action in ("list", "retrieve"):
+            queryset = OrderSerializer.eager_load(queryset, requested_fields(self.request))
+        return queryset
 
     def perform_create(self, serializer):
         data = serializer.validated_data
-        is_corp = False
-        if hasattr(self.request.user, "customer_profile"):
-            is_corp = self.request.user.customer_profile.risk_status == "SAFE"
-        
-        price, _, _ = calculate_shipping_cost(
-            data["total_distance_km"], 
-            self.request.data.get("vehicle_type_id"), 
-            data.get("service_type", "STANDARD"), 
-            is_corp
-        )
+        is_corp = is_corporate_customer(self.request.user)
+
+        quote = data.get("quote")
+        if quote is not None:
+            # Harga simulasi di quote token (termasuk surcharge) + express/corporate via pricing.service_price
+            price = quote.price(data.get("service_type", "STANDARD"), is_corp)
+        else:
+            price, _, _ = calculate_shipping_cost(
+                data["total_distance_km"],
+                data.get("vehicle_type_id"),
+                data.get("service_type", "STANDARD"),
+                is_corp
+            )
         serializer.save(customer=self.request.user, base_price=price, final_total_price=price, status="PENDING")
 
+class BulkOrderUploadView(APIView):
+    """
+    Endpoint: /api/orders/bulk/ (POST multipart, field "file": .csv atau .xlsx)
+    Kolom wajib: origin_city, origin_address, dest_city, dest_address, item_description,
+    total_distance_km, vehicle_type_id (opsional: koordinat, service_type, is_doc_return,
+    is_labor_needed, reference). Respons NDJSON streaming, satu baris JSON per baris file.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "File wajib diupload di field 'file'"}, status=400)
+        try:
+            records = read_rows(upload)
+        except BulkUploadError as e:
+            return Response({"error": str(e)}, status=400)
+        results = import_orders(records, request.user, is_corporate_customer(request.user))
+        return streaming_response(
+            request, (json.dumps(result) + "\n" for result in results), content_type="application/x-ndjson"
+        )
+
+class OrderExportView(APIView):
+    """
+    Endpoint: /api/orders/export/?type=csv|xlsx (GET, admin / finance)
+    Filter opsional: status, created_from & created_to (YYYY-MM-DD, inklusif).
+    Satu baris per order + ringkasan charge, dikirim streaming.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    def get(self, request):
+        params = request.query_params
+        file_type = params.get("type", "csv")
+        if file_type not in CONTENT_TYPES:
+            return Response({"error": "type harus csv atau xlsx"}, status=400)
+        queryset = Order.objects.all()
+        if params.get("status"):
+            queryset = queryset.filter(status=params["status"])
+        for name, lookup in (("created_from", "created_at__date__gte"), ("created_to", "created_at__date__lte")):
+            if params.get(name):
+                try:
+                    day = parse_date(params[name])
+                except ValueError:
+                    day = None
+                if day is None:
+                    return Response({"error": f"{name} harus tanggal YYYY-MM-DD"}, status=400)
+                queryset = queryset.filter(**{lookup: day})
+        return export_response(request, queryset, file_type)
+
 class OrderChargeCreateView(generics.CreateAPIView):
     queryset = OrderCharge.objects.all()
     serializer_class = OrderChargeSerializer
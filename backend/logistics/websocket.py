@@ -0,0 +1,73 @@
+# backend/logistics/websocket.py
+
+"""
+WebSocket status order langsung di atas ASGI (tanpa Channels), dipasang oleh
+logistik_core/asgi.py. Kanal satu arah server -> klien, isi event sama dengan
+SSE di async_views.py:
+
+  /ws/tracking/<kode resi>/   publik: {"event": "snapshot"|"status", "data": {...}}
+  /ws/orders/?token=<access>  semua order milik customer pemilik token JWT
+
+Ping/pong ditangani server ASGI (uvicorn butuh paket 'websockets' atau 'wsproto').
+"""
+
+from urllib.parse import parse_qs
+import asyncio
+import json
+import re
+
+from .async_views import jwt_user, snapshot_loader, tracking_snapshot
+from .order_events import customer_topic, get_broker
+
+TRACKING_PATH = re.compile(r"^/ws/tracking/(?P<code>[^/]+)/?$")
+ORDERS_PATH = re.compile(r"^/ws/orders/?$")
+
+CLOSE_NOT_FOUND = 4404
+CLOSE_UNAUTHORIZED = 4401
+
+
+async def _resolve(scope):
+    """(topik, loader snapshot | None) untuk koneksi ini, atau kode close jika ditolak."""
+    match = TRACKING_PATH.match(scope["path"])
+    if match:
+        # Hanya topik; snapshot dibaca ulang setelah subscribe (lihat pump)
+        found = await tracking_snapshot(match["code"])
+        return (found[0], snapshot_loader(match["code"])) if found else CLOSE_NOT_FOUND
+    if ORDERS_PATH.match(scope["path"]):
+        token = parse_qs(scope.get("query_string", b"").decode()).get("token", [None])[0]
+        user = await jwt_user(token)
+        return (customer_topic(user.id), None) if user else CLOSE_UNAUTHORIZED
+    return CLOSE_NOT_FOUND
+
+
+async def websocket_application(scope, receive, send):
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+    resolved = await _resolve(scope)
+    if isinstance(resolved, int):
+        await send({"type": "websocket.close", "code": resolved})
+        return
+    topic, snapshot = resolved
+
+    async with get_broker().listen([topic]) as subscription:
+        await send({"type": "websocket.accept"})
+
+        async def pump():
+            # Subscribe dulu baru kirim snapshot: transisi di antara keduanya tidak terlewat
+            body = await snapshot() if snapshot is not None else None
+            if body is not None:
+                await send({"type": "websocket.send", "text": json.dumps({"event": "snapshot", "data": body})})
+            while True:
+                event = await subscription.get()
+                await send({"type": "websocket.send", "text": json.dumps({"event": "status", "data": event})})
+
+        sender = asyncio.ensure_future(pump())
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                # Pesan dari klien diabaikan (kanal satu arah)
+        finally:
+            sender.cancel()
@@ -2,6 +2,7 @@
 ASGI config for logistik_core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+HTTP diteruskan ke Django; koneksi WebSocket (/ws/...) ke logistics.websocket.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -13,4 +14,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'logistik_core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from logistics.websocket import websocket_application  # noqa: E402 (butuh django.setup())
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
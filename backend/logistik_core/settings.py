@@ -105,6 +105,19 @@ DATABASES = {
     }
 }
 
+# ==========================================================
+# CACHE (Shared antar worker)
+# ==========================================================
+# Default LocMem (per proses). Production: set CACHE_BACKEND ke Redis/Memcached,
+# contoh: django.core.cache.backends.redis.RedisCache + CACHE_LOCATION=redis://...
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'logistik-kita'),
+    }
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     { 'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator', },
@@ -165,6 +178,67 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 TOMTOM_API_KEY = os.environ.get('TOMTOM_API_KEY')  # ← NAMA SESUAI .env
+TOMTOM_BASE_URL = os.environ.get('TOMTOM_BASE_URL', 'https://api.tomtom.com')  # Bisa diarahkan ke stub lokal (manage.py tomtom_stub)
+TOMTOM_MAX_CONCURRENCY = int(os.environ.get('TOMTOM_MAX_CONCURRENCY', '8'))  # Paralel request ke TomTom
+TOMTOM_ASYNC_MAX_CONNECTIONS = int(os.environ.get('TOMTOM_ASYNC_MAX_CONNECTIONS', '100'))  # Pool koneksi view async (ASGI)
+TOMTOM_MAX_RETRIES = int(os.environ.get('TOMTOM_MAX_RETRIES', '2'))  # Retry untuk error jaringan / 429 / 5xx
+TOMTOM_CIRCUIT_FAILURES = int(os.environ.get('TOMTOM_CIRCUIT_FAILURES', '5'))  # Gagal beruntun sebelum circuit terbuka
+TOMTOM_CIRCUIT_RESET = int(os.environ.get('TOMTOM_CIRCUIT_RESET', '30'))  # Detik sebelum mencoba lagi
+TOMTOM_MATRIX_MAX_CELLS = int(os.environ.get('TOMTOM_MATRIX_MAX_CELLS', '200'))  # Batas origin x destination per request Matrix Routing
+SIMULASI_BATCH_MAX_LANES = int(os.environ.get('SIMULASI_BATCH_MAX_LANES', '1000'))
+MASTER_DATA_REFRESH = int(os.environ.get('MASTER_DATA_REFRESH', '5'))  # Detik antar cek versi snapshot Fleet & rule harga
+QUOTE_TOKEN_MAX_AGE = int(os.environ.get('QUOTE_TOKEN_MAX_AGE', '900'))  # Detik, masa berlaku quote token hasil simulasi harga
+TRACKING_CACHE_ALIAS = os.environ.get('TRACKING_CACHE_ALIAS', 'default')
+TRACKING_CACHE_TTL = int(os.environ.get('TRACKING_CACHE_TTL', '60'))  # Detik, batas umur respons lacak resi di cache
+
+# Push status order (SSE / WebSocket, hanya ASGI). Lebih dari 1 worker: logistics.order_events.RedisBroker
+ORDER_EVENTS_BROKER = os.environ.get('ORDER_EVENTS_BROKER', 'logistics.order_events.InProcessBroker')
+ORDER_EVENTS_REDIS_URL = os.environ.get('ORDER_EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+ORDER_EVENTS_HEARTBEAT = int(os.environ.get('ORDER_EVENTS_HEARTBEAT', '20'))  # Detik antar komentar ping SSE
+ORDER_EVENTS_QUEUE_SIZE = int(os.environ.get('ORDER_EVENTS_QUEUE_SIZE', '16'))  # Event tertahan per klien lambat
+
+# Ingest GPS driver: ring buffer per driver di memori, flush berkala ke DriverLocation
+GPS_BUFFER_SIZE = int(os.environ.get('GPS_BUFFER_SIZE', '256'))  # Titik pending maksimal per driver sebelum yang terlama ditimpa
+GPS_FLUSH_INTERVAL = int(os.environ.get('GPS_FLUSH_INTERVAL', '30'))  # Detik antar flush ke database
+GPS_SIMPLIFY_TOLERANCE_M = float(os.environ.get('GPS_SIMPLIFY_TOLERANCE_M', '10'))  # Toleransi Douglas-Peucker (meter, 0 = simpan semua)
+GPS_MAX_BATCH_POINTS = int(os.environ.get('GPS_MAX_BATCH_POINTS', '1000'))
+GPS_MAX_CLOCK_SKEW = int(os.environ.get('GPS_MAX_CLOCK_SKEW', '86400'))  # Detik; titik dengan timestamp di luar jam server ± nilai ini dibuang
+
+# Dispatch: index spasial kendaraan tersedia per proses (logistics/dispatch.py)
+DISPATCH_INDEX_REFRESH = int(os.environ.get('DISPATCH_INDEX_REFRESH', '15'))  # Detik antar rebuild index dari database
+DISPATCH_POSITION_MAX_AGE = int(os.environ.get('DISPATCH_POSITION_MAX_AGE', '900'))  # Detik, posisi driver lebih tua dari ini tidak di-dispatch
+DISPATCH_MAX_RADIUS_KM = float(os.environ.get('DISPATCH_MAX_RADIUS_KM', '100'))
+
+# Bulk transisi status order (/api/orders/transitions/, logistics/order_lifecycle.py)
+ORDER_TRANSITION_MAX_BATCH = int(os.environ.get('ORDER_TRANSITION_MAX_BATCH', '500'))  # Order per request (1 UPDATE)
+
+# Upload order massal CSV/XLSX (/api/orders/bulk/, logistics/bulk_orders.py)
+BULK_ORDER_CHUNK_SIZE = int(os.environ.get('BULK_ORDER_CHUNK_SIZE', '500'))  # Baris per validasi + transaksi bulk_create
+BULK_ORDER_MAX_ROWS = int(os.environ.get('BULK_ORDER_MAX_ROWS', '5000'))  # Baris per file, sisanya ditolak
+
+# Export order + charge finance (/api/orders/export/ & action OrderAdmin, logistics/order_export.py)
+ORDER_EXPORT_CHUNK_SIZE = int(os.environ.get('ORDER_EXPORT_CHUNK_SIZE', '2000'))  # Order per fetch cursor + 1 query prefetch charges
+
+# Cache rute 2 tingkat (LRU lokal + shared cache) di depan tabel CachedDistance
+ROUTE_CACHE_ALIAS = os.environ.get('ROUTE_CACHE_ALIAS', 'default')
+ROUTE_CACHE_LRU_SIZE = int(os.environ.get('ROUTE_CACHE_LRU_SIZE', '10000'))
+ROUTE_CACHE_TTL = int(os.environ.get('ROUTE_CACHE_TTL', str(7 * 24 * 3600)))  # Detik, data traffic dianggap basi setelah ini
+ROUTE_LOCK_TIMEOUT = int(os.environ.get('ROUTE_LOCK_TIMEOUT', '15'))  # Detik, lock antar worker saat fetch TomTom
+ROUTE_MATCH_RADIUS_M = int(os.environ.get('ROUTE_MATCH_RADIUS_M', '250'))  # Pakai rute cache terdekat dalam radius ini (0 = nonaktif, maks 1000)
+ROUTE_WARM_DAILY_BUDGET = int(os.environ.get('ROUTE_WARM_DAILY_BUDGET', '1000'))  # Maks panggilan TomTom/hari untuk manage.py warm_route_cache
+ROUTE_WARM_REFRESH_BEFORE = int(os.environ.get('ROUTE_WARM_REFRESH_BEFORE', str(24 * 3600)))  # Detik, refresh lane yang akan kadaluarsa dalam rentang ini
+
+# Estimator jarak offline (haversine x circuity) saat TomTom gagal
+ESTIMATOR_ENABLED = os.environ.get('ESTIMATOR_ENABLED', 'True').lower() in ('true', '1', 'yes', 't')
+ESTIMATOR_RECALIBRATE = int(os.environ.get('ESTIMATOR_RECALIBRATE', str(24 * 3600)))  # Detik antar fit ulang dari CachedDistance
+ESTIMATOR_MIN_SAMPLES = int(os.environ.get('ESTIMATOR_MIN_SAMPLES', '30'))  # Minimal rute per grup region/mode
+
+# Cache autocomplete geocode (query ternormalisasi + prefix)
+GEOCODE_CACHE_ALIAS = os.environ.get('GEOCODE_CACHE_ALIAS', 'default')
+GEOCODE_CACHE_LRU_SIZE = int(os.environ.get('GEOCODE_CACHE_LRU_SIZE', '5000'))
+GEOCODE_CACHE_TTL = int(os.environ.get('GEOCODE_CACHE_TTL', str(24 * 3600)))  # Detik, hasil autocomplete
+GAZETTEER_ENABLED = os.environ.get('GAZETTEER_ENABLED', 'True').lower() in ('true', '1', 'yes', 't')  # Autocomplete lokal sebelum TomTom
+GAZETTEER_REFRESH = int(os.environ.get('GAZETTEER_REFRESH', '60'))  # Detik antar cek versi index gazetteer
 
 # ==========================================================
 # KONFIGURASI EMAIL
@@ -247,6 +321,12 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # httpx me-log URL lengkap (termasuk API key TomTom) di level INFO
+        'httpx': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
 